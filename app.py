@@ -8,7 +8,7 @@ import json
 import logging
 import os
 import re
-import shutil
+import signal
 import subprocess
 import sys
 import threading
@@ -24,26 +24,52 @@ from flask import (
     request,
     send_from_directory,
 )
+from flask.json.provider import DefaultJSONProvider
+import orjson
+import requests
 from werkzeug.utils import secure_filename as werkzeug_secure_filename
 
 import db
 import models
 from config import ALLOWED_CONFIG_KEYS, load_config, save_config
-from downloader import get_ytdlp_version
+from downloader import (
+    build_ydl_audio_opts,
+    close_download_pool,
+    get_ytdlp_version,
+)
 from fingerprint import fingerprint_track
-from lidarr import get_missing_albums, lidarr_request
+from lidarr import (
+    MISSING_ALBUMS_TTL,
+    get_album_cover_url,
+    get_albums,
+    get_missing_albums,
+    invalidate_missing_albums,
+    lidarr_request,
+)
 from metadata import create_xml_metadata, get_itunes_tracks, tag_mp3
 from notifications import send_notifications
 from processing import (
+    claim_download_slot,
     download_process,
+    freeze_download_slot,
     get_download_status,
     process_album_download,
     process_download_queue,
     queue_lock,
+    release_download_slot,
     stop_download,
+    unfreeze_download_slot,
+    wake_queue_processor,
+)
+from scheduler import SCHEDULER_CONFIG_KEYS, run_scheduler, setup_scheduler
+from utils import (
+    TTLCache,
+    check_rate_limit,
+    format_bytes,
+    http_session,
+    sanitize_filename,
+    set_permissions,
 )
-from scheduler import run_scheduler, setup_scheduler
-from utils import check_rate_limit, format_bytes, sanitize_filename, set_permissions
 
 logging.basicConfig(
     level=logging.INFO, format="%(message)s", handlers=[logging.StreamHandler()]
@@ -53,14 +79,42 @@ logger = logging.getLogger(__name__)
 log = logging.getLogger("werkzeug")
 log.setLevel(logging.ERROR)
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    Missing-album and queue payloads are large lists of Lidarr dicts;
+    orjson serializes them several times faster than the stdlib
+    encoder. Types orjson doesn't know fall back to Flask's default.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(
+            obj, default=self.default, option=orjson.OPT_NON_STR_KEYS
+        ).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 VERSION = "1.5.8"
 DOWNLOAD_DIR = os.getenv("DOWNLOAD_PATH", "")
 
 rate_limit_store = {}
-album_cache = {}
 ALBUM_CACHE_TTL = 300
+album_cache = TTLCache(maxsize=512, ttl=ALBUM_CACHE_TTL)
+MAX_BULK_ALBUMS = 200
+# (albums list, encoded JSON) for the last list get_missing_albums()
+# returned; replaced as one tuple so readers never see a mismatched pair.
+_missing_albums_payload = (None, b"")
+TRACKS_CACHE_TTL = 30
+tracks_cache = TTLCache(maxsize=256, ttl=TRACKS_CACHE_TTL)
+SSE_KEEPALIVE_INTERVAL = 15
+# How long a manual download waits for the active album to finish.
+MANUAL_DOWNLOAD_SLOT_TIMEOUT = 300
 
 
 @app.context_processor
@@ -108,6 +162,16 @@ def favicon():
 # --- Config routes ---
 
 
+def _scheduler_settings(config):
+    """Pick the settings that decide when the next scheduled check runs.
+
+    The settings page posts every field on each save; rescheduling only
+    when these actually change keeps unrelated saves from pushing the
+    next check back by a full interval.
+    """
+    return {key: config.get(key) for key in SCHEDULER_CONFIG_KEYS}
+
+
 @app.route("/api/config", methods=["GET", "POST"])
 def api_config():
     if request.method == "GET":
@@ -118,11 +182,14 @@ def api_config():
     ):
         return jsonify({"success": False, "message": "Too many requests"}), 429
     current = load_config()
+    previous = _scheduler_settings(current)
     incoming = request.json or {}
     for key, value in incoming.items():
         if key in ALLOWED_CONFIG_KEYS:
             current[key] = value
     save_config(current)
+    if _scheduler_settings(current) != previous:
+        setup_scheduler()
     return jsonify({"success": True})
 
 
@@ -159,6 +226,7 @@ def api_config_import():
             {"success": False, "message": "Config must be a JSON object"}
         ), 400
     current = load_config()
+    previous = _scheduler_settings(current)
     applied_keys = []
     skipped_keys = []
     for key, value in incoming.items():
@@ -168,6 +236,8 @@ def api_config_import():
         else:
             skipped_keys.append(key)
     save_config(current)
+    if _scheduler_settings(current) != previous:
+        setup_scheduler()
     return jsonify(
         {
             "success": True,
@@ -199,12 +269,30 @@ def api_test_connection():
 
 @app.route("/api/missing-albums")
 def api_missing_albums():
-    return jsonify(get_missing_albums())
+    """Missing albums as JSON, with an ETag so repeat polls can get 304.
+
+    get_missing_albums() returns the same list object while its cache is
+    fresh; the serialized payload is reused for as long as that holds,
+    so polling clients hit neither Lidarr nor the JSON encoder.
+    """
+    global _missing_albums_payload
+    albums = get_missing_albums()
+    cached_albums, payload = _missing_albums_payload
+    if cached_albums is not albums:
+        payload = app.json.dumps(albums).encode("utf-8")
+        _missing_albums_payload = (albums, payload)
+    resp = Response(payload, mimetype="application/json")
+    resp.cache_control.private = True
+    resp.cache_control.max_age = MISSING_ALBUMS_TTL
+    resp.add_etag()
+    return resp.make_conditional(request)
 
 
 @app.route("/api/album/<int:album_id>")
 def api_album_details(album_id):
-    album = lidarr_request(f"album/{album_id}")
+    album = dict(_get_album_cached(album_id))
+    if "error" in album:
+        return jsonify(album), 502
     if not album.get("tracks"):
         album["tracks"] = get_itunes_tracks(
             album["artist"]["artistName"], album["title"]
@@ -212,6 +300,22 @@ def api_album_details(album_id):
     return jsonify(album)
 
 
+@app.route("/api/albums/bulk")
+def api_albums_bulk():
+    """Return several albums in one response: ?ids=1,2,3."""
+    raw_ids = request.args.get("ids", "")
+    try:
+        album_ids = [int(i) for i in raw_ids.split(",") if i.strip()]
+    except ValueError:
+        return jsonify({"error": "ids must be comma-separated integers"}), 400
+    if len(album_ids) > MAX_BULK_ALBUMS:
+        return jsonify(
+            {"error": f"At most {MAX_BULK_ALBUMS} ids per request"}
+        ), 400
+    albums = _get_albums_cached(album_ids)
+    return jsonify([albums[i] for i in album_ids if i in albums])
+
+
 # --- yt-dlp routes ---
 
 
@@ -270,6 +374,23 @@ def api_ytdlp_update():
 
 
 def _exec_restart():
+    """Replace this process with a fresh one.
+
+    Callers freeze the download slot first, so no album is mid-download
+    when the process goes away. Under gunicorn the old worker keeps
+    running until graceful_timeout after the HUP; the freeze also stops
+    its queue processor and scheduler from starting an album meanwhile.
+    """
+    if _gunicorn_master_pid:
+        # Re-exec'ing a gunicorn worker would orphan it from the master;
+        # a HUP makes the master replace the worker with a fresh import.
+        try:
+            os.kill(_gunicorn_master_pid, signal.SIGHUP)
+        except OSError as e:
+            logger.error("Restart failed: %s", e)
+            unfreeze_download_slot()
+        return
+    close_download_pool()
     try:
         os.closerange(3, 65536)
     except Exception:
@@ -279,7 +400,7 @@ def _exec_restart():
 
 @app.route("/api/restart", methods=["POST"])
 def api_restart():
-    if download_process.get("active"):
+    if not freeze_download_slot():
         return jsonify(
             {
                 "success": False,
@@ -314,6 +435,7 @@ def api_download(album_id):
         return jsonify({"success": False, "message": "Already in queue or downloading"})
     added = models.enqueue_album(album_id)
     if added:
+        wake_queue_processor()
         return jsonify({"success": True, "queued": True})
     return jsonify({"success": False, "message": "Already in queue or downloading"})
 
@@ -357,48 +479,73 @@ def api_skip_track():
 
 @app.route("/api/download/status")
 def api_download_status():
-    return jsonify(get_download_status())
+    """Current download state, with an ETag so unchanged polls get 304.
+
+    The settings and logs pages poll this every couple of seconds; most
+    of those polls see an idle or unchanged slot.
+    """
+    resp = Response(
+        orjson.dumps(get_download_status()), mimetype="application/json",
+    )
+    resp.cache_control.no_cache = True
+    resp.add_etag()
+    return resp.make_conditional(request)
 
 
 @app.route("/api/download/stream")
 def api_download_stream():
+    """Push download and queue state to the page over SSE.
+
+    State is sampled every second but only sent when it changed; idle
+    connections get a comment line every SSE_KEEPALIVE_INTERVAL seconds
+    so proxies do not drop them.
+    """
     sse_timeout = 3600
 
     def generate():
         start_time = time.time()
+        last_payload = None
+        last_sent = 0.0
         try:
             while True:
                 if time.time() - start_time > sse_timeout:
                     break
-                with queue_lock:
-                    queue_rows = models.get_queue()
-                    queue_data = []
-                    for row in queue_rows:
-                        album = _get_album_cached(row["album_id"])
-                        if "error" not in album:
-                            cover_url = ""
-                            for img in album.get("images", []):
-                                if img.get("coverType") == "cover":
-                                    cover_url = img.get("remoteUrl", "")
-                                    break
-                            queue_data.append(
-                                {
-                                    "id": row["album_id"],
-                                    "title": album.get("title", ""),
-                                    "artist": album.get("artist", {}).get(
-                                        "artistName", ""
-                                    ),
-                                    "cover_url": cover_url,
-                                    "track_count": album.get("statistics", {}).get(
-                                        "trackCount", 0
-                                    ),
-                                }
-                            )
+                # Album lookups can hit Lidarr, so they run without
+                # queue_lock; only the status snapshot takes it.
+                queue_rows = models.get_queue()
+                albums = _get_albums_cached(
+                    row["album_id"] for row in queue_rows
+                )
+                queue_data = []
+                for row in queue_rows:
+                    album = albums.get(row["album_id"])
+                    if album is not None:
+                        queue_data.append(
+                            {
+                                "id": row["album_id"],
+                                "title": album.get("title", ""),
+                                "artist": album.get("artist", {}).get(
+                                    "artistName", ""
+                                ),
+                                "cover_url": get_album_cover_url(album),
+                                "track_count": album.get("statistics", {}).get(
+                                    "trackCount", 0
+                                ),
+                            }
+                        )
                 data = {
-                    "status": dict(download_process),
+                    "status": get_download_status(),
                     "queue": queue_data,
                 }
-                yield f"data: {json.dumps(data)}\n\n"
+                payload = orjson.dumps(data)
+                now = time.monotonic()
+                if payload != last_payload:
+                    yield b"data: " + payload + b"\n\n"
+                    last_payload = payload
+                    last_sent = now
+                elif now - last_sent >= SSE_KEEPALIVE_INTERVAL:
+                    yield b": keepalive\n\n"
+                    last_sent = now
                 time.sleep(1)
         except GeneratorExit:
             return
@@ -416,23 +563,17 @@ def api_download_stream():
 @app.route("/api/download/queue", methods=["GET"])
 def api_get_queue():
     queue_rows = models.get_queue()
+    albums = _get_albums_cached(row["album_id"] for row in queue_rows)
     queue_with_details = []
     for row in queue_rows:
-        album = _get_album_cached(row["album_id"])
-        if "error" not in album:
+        album = albums.get(row["album_id"])
+        if album is not None:
             queue_with_details.append(
                 {
                     "id": row["album_id"],
                     "title": album.get("title", ""),
                     "artist": album.get("artist", {}).get("artistName", ""),
-                    "cover": next(
-                        (
-                            img["remoteUrl"]
-                            for img in album.get("images", [])
-                            if img["coverType"] == "cover"
-                        ),
-                        "",
-                    ),
+                    "cover": get_album_cover_url(album),
                     "track_count": album.get("statistics", {}).get("trackCount", 0),
                 }
             )
@@ -441,9 +582,7 @@ def api_get_queue():
 
 @app.route("/api/download/queue/<int:album_id>/tracks")
 def api_queue_tracks(album_id):
-    tracks = lidarr_request(f"track?albumId={album_id}")
-    if isinstance(tracks, dict) and "error" in tracks:
-        tracks = []
+    tracks = _get_tracks_cached(album_id) or []
     if not tracks:
         album = _get_album_cached(album_id)
         if "error" not in album:
@@ -475,8 +614,8 @@ def api_add_to_queue():
     album_id = (request.json or {}).get("album_id")
     with queue_lock:
         current_id = download_process.get("album_id")
-    if current_id != album_id:
-        models.enqueue_album(album_id)
+    if current_id != album_id and models.enqueue_album(album_id):
+        wake_queue_processor()
     return jsonify({"success": True, "queue_length": models.get_queue_length()})
 
 
@@ -495,13 +634,14 @@ def api_add_to_queue_bulk():
     album_ids = (request.json or {}).get("album_ids", [])
     if not isinstance(album_ids, list):
         return jsonify({"success": False, "message": "album_ids must be a list"}), 400
-    added = 0
     with queue_lock:
         current_id = download_process.get("album_id")
-    for album_id in album_ids:
-        if isinstance(album_id, int) and album_id != current_id:
-            if models.enqueue_album(album_id):
-                added += 1
+    added = models.enqueue_albums(
+        album_id for album_id in album_ids
+        if isinstance(album_id, int) and album_id != current_id
+    )
+    if added:
+        wake_queue_processor()
     return jsonify(
         {
             "success": True,
@@ -660,22 +800,31 @@ _TRACK_LOG_TYPES = {"track_failure", "track_download"}
 
 
 def _enrich_track_logs(items):
-    """Attach candidate attempts and ban status to track logs."""
+    """Attach candidate attempts and ban status to track logs.
+
+    Attempts for the whole page are loaded with one query rather than
+    one per log entry.
+    """
+    track_items = [
+        item for item in items if item.get("type") in _TRACK_LOG_TYPES
+    ]
+    td_ids = [
+        item["track_download_id"] for item in track_items
+        if item.get("track_download_id")
+    ]
+    try:
+        attempts = models.get_candidate_attempts_for_downloads(td_ids)
+    except Exception:
+        logger.warning(
+            "Failed to fetch candidates for track_downloads %s",
+            td_ids, exc_info=True,
+        )
+        attempts = {}
     banned_cache = {}
-    for item in items:
-        if item.get("type") not in _TRACK_LOG_TYPES:
-            continue
+    for item in track_items:
         td_id = item.get("track_download_id")
-        if not td_id:
-            item["candidates"] = []
-            continue
-        try:
-            candidates = models.get_candidate_attempts(td_id)
-        except Exception:
-            logger.warning(
-                "Failed to fetch candidates for track_download %s",
-                td_id, exc_info=True,
-            )
+        candidates = attempts.get(td_id) if td_id else None
+        if not candidates:
             item["candidates"] = []
             continue
         album_id = item.get("album_id")
@@ -858,13 +1007,15 @@ def api_youtube_search():
 # --- YouTube audio stream proxy ---
 
 
-_audio_stream_cache = {}
+# Resolved googlevideo URLs expire upstream after a few hours; keep
+# them for five minutes and cap the entry count so previewing many
+# candidates can't grow the cache without bound.
+AUDIO_STREAM_CACHE_TTL = 300
+_audio_stream_cache = TTLCache(maxsize=128, ttl=AUDIO_STREAM_CACHE_TTL)
 
 
 @app.route("/api/youtube/stream", methods=["GET"])
 def api_youtube_stream():
-    import requests as http_requests
-
     client_ip = request.remote_addr or "unknown"
     if not check_rate_limit(
         f"yt_stream:{client_ip}", rate_limit_store, window=5, max_requests=6
@@ -880,14 +1031,13 @@ def api_youtube_stream():
 
     import yt_dlp
 
-    now = time.time()
     cached = _audio_stream_cache.get(url)
-    if cached and now - cached["ts"] < 300:
+    if cached:
         audio_url = cached["audio_url"]
         http_headers = cached["http_headers"]
         if not _is_safe_stream_url(audio_url):
             logger.error("Cached stream URL failed safety check: %s", audio_url[:100])
-            del _audio_stream_cache[url]
+            _audio_stream_cache.pop(url)
             return "Unsafe audio stream URL", 403
     else:
         config = load_config()
@@ -928,14 +1078,10 @@ def api_youtube_stream():
                 logger.warning("Blocked unsafe audio URL: %s", audio_url[:100])
                 return "Unsafe audio stream URL", 403
             audio_url = _sanitize_stream_url(audio_url)
-            _audio_stream_cache[url] = {
+            _audio_stream_cache.set(url, {
                 "audio_url": audio_url,
                 "http_headers": http_headers,
-                "ts": now,
-            }
-            for k in list(_audio_stream_cache):
-                if now - _audio_stream_cache[k]["ts"] > 600:
-                    del _audio_stream_cache[k]
+            })
         except Exception as e:
             logger.warning("Stream extraction failed: %s", e)
             return str(e)[:200], 500
@@ -950,8 +1096,6 @@ def _proxy_audio_stream(sanitized_url, http_headers, range_header):
     The caller MUST validate via _is_safe_stream_url() and sanitize
     via _sanitize_stream_url() before calling this function.
     """
-    import requests as http_requests
-
     proxy_headers = {
         "User-Agent": http_headers.get("User-Agent", ""),
         "Referer": http_headers.get("Referer", ""),
@@ -961,7 +1105,7 @@ def _proxy_audio_stream(sanitized_url, http_headers, range_header):
         proxy_headers["Range"] = range_header
 
     try:
-        upstream = http_requests.get(
+        upstream = http_session.get(
             sanitized_url,  # nosemgrep
             headers=proxy_headers,
             stream=True,
@@ -1018,7 +1162,7 @@ def api_download_manual():
             }
         ), 400
 
-    album_data = lidarr_request(f"album/{album_id_ctx}")
+    album_data = _get_album_cached(album_id_ctx)
     if "error" in album_data:
         return jsonify(
             {
@@ -1061,18 +1205,86 @@ def api_download_manual():
 
 
 def _get_album_cached(album_id):
-    """Fetch album from Lidarr with a short TTL cache."""
-    now = time.time()
-    if album_id in album_cache:
-        cached, ts = album_cache[album_id]
-        if now - ts < ALBUM_CACHE_TTL:
-            return cached
+    """Fetch album from Lidarr with a short TTL cache.
+
+    If Lidarr is unreachable, the last known (expired) entry is served
+    instead of the error so the queue UI keeps its titles and covers.
+    """
+    cached = album_cache.get(album_id)
+    if cached is not None:
+        return cached
     album = lidarr_request(f"album/{album_id}")
     if "error" not in album:
-        album_cache[album_id] = (album, now)
+        album_cache.set(album_id, album)
+        return album
+    stale = album_cache.get_stale(album_id)
+    if stale is not None:
+        logger.debug("Serving stale album %s: %s", album_id, album["error"])
+        return stale
     return album
 
 
+def _get_tracks_cached(album_id):
+    """Fetch an album's track list from Lidarr with a short TTL cache.
+
+    Kept short because hasFile flips as tracks are imported. Like
+    _get_album_cached, an expired entry is served if Lidarr fails.
+
+    Returns:
+        List of track dicts, or None if Lidarr failed and nothing is
+        cached. Treat the list as read-only; it is shared.
+    """
+    cached = tracks_cache.get(album_id)
+    if cached is not None:
+        return cached
+    tracks = lidarr_request(f"track?albumId={album_id}")
+    if isinstance(tracks, list):
+        # An empty list usually means Lidarr hasn't refreshed the album
+        # yet; don't pin that for the whole TTL.
+        if tracks:
+            tracks_cache.set(album_id, tracks)
+        return tracks
+    stale = tracks_cache.get_stale(album_id)
+    if stale is not None:
+        logger.debug("Serving stale tracks for album %s", album_id)
+    return stale
+
+
+def _get_albums_cached(album_ids):
+    """Fetch many albums, hitting Lidarr once for all cache misses.
+
+    Returns:
+        Dict mapping album ID to album dict. IDs Lidarr could not
+        return (and that have no stale cache entry) are omitted.
+    """
+    albums = {}
+    missing = []
+    for album_id in dict.fromkeys(album_ids):
+        cached = album_cache.get(album_id)
+        if cached is not None:
+            albums[album_id] = cached
+        else:
+            missing.append(album_id)
+    if not missing:
+        return albums
+    fetched = get_albums(missing)
+    if isinstance(fetched, list):
+        wanted = set(missing)
+        for album in fetched:
+            album_id = album.get("id")
+            if album_id in wanted:
+                album_cache.set(album_id, album)
+                albums[album_id] = album
+    else:
+        logger.debug("Bulk album fetch failed: %s", fetched.get("error"))
+    for album_id in missing:
+        if album_id not in albums:
+            stale = album_cache.get_stale(album_id)
+            if stale is not None:
+                albums[album_id] = stale
+    return albums
+
+
 def _sanitize_stream_url(stream_url):
     """Reconstruct a validated stream URL from its parsed components.
 
@@ -1114,10 +1326,13 @@ def _is_safe_stream_url(stream_url):
     )
 
 
+_YOUTUBE_VIDEO_ID_RE = re.compile(r"[a-zA-Z0-9_-]{11}")
+
+
 def _validate_youtube_url(youtube_url):
     """Validate and normalize a YouTube URL. Returns URL or None."""
     if not youtube_url.startswith("http"):
-        if not re.match(r"^[a-zA-Z0-9_-]{11}$", youtube_url):
+        if not _YOUTUBE_VIDEO_ID_RE.fullmatch(youtube_url):
             return None
         return f"https://www.youtube.com/watch?v={youtube_url}"  # nosemgrep
     parsed = urllib.parse.urlparse(youtube_url)
@@ -1263,17 +1478,14 @@ def api_manual_track_download(album_id):
 
 def _build_ydl_opts(config, temp_file):
     """Build yt-dlp options dict from config."""
+    audio_opts = build_ydl_audio_opts(
+        "mp3", config.get("mp3_quality", "320")
+    )
     opts = {
         "quiet": True,
         "no_warnings": True,
-        "format": "bestaudio/best",
-        "postprocessors": [
-            {
-                "key": "FFmpegExtractAudio",
-                "preferredcodec": "mp3",
-                "preferredquality": "320",
-            }
-        ],
+        "format": audio_opts["format"],
+        "postprocessors": audio_opts["postprocessors"],
         "outtmpl": temp_file,
         "noplaylist": True,
     }
@@ -1320,39 +1532,32 @@ def _execute_manual_dl_with_progress(
     download_process so the track appears in Current Download via SSE.
     Runs in a background thread.
     """
-    for _ in range(300):
-        if not download_process["active"]:
-            break
-        time.sleep(1)
-    else:
+    track_state = {
+        "track_title": track_title,
+        "track_number": int(track_num),
+        "status": "downloading",
+        "youtube_url": youtube_url,
+        "youtube_title": "",
+        "progress_percent": "",
+        "progress_speed": "",
+        "error_message": "",
+        "skip": False,
+    }
+    if not claim_download_slot(
+        album_id,
+        timeout=MANUAL_DOWNLOAD_SLOT_TIMEOUT,
+        album_title=album_title,
+        artist_name=artist_name,
+        cover_url=cover_url,
+        current_track_index=0,
+        tracks=[track_state],
+    ):
         logger.warning(
             "Manual download timed out waiting for active download: %s",
             track_title,
         )
         return
 
-    with queue_lock:
-        download_process["active"] = True
-        download_process["stop"] = False
-        download_process["album_id"] = album_id
-        download_process["album_title"] = album_title
-        download_process["artist_name"] = artist_name
-        download_process["cover_url"] = cover_url
-        download_process["current_track_index"] = 0
-        download_process["tracks"] = [
-            {
-                "track_title": track_title,
-                "track_number": int(track_num),
-                "status": "downloading",
-                "youtube_url": youtube_url,
-                "youtube_title": "",
-                "progress_percent": "",
-                "progress_speed": "",
-                "error_message": "",
-                "skip": False,
-            }
-        ]
-
     try:
         os.makedirs(target_path, exist_ok=True)
         _do_manual_dl(
@@ -1370,14 +1575,7 @@ def _execute_manual_dl_with_progress(
             cover_url=cover_url,
         )
     finally:
-        with queue_lock:
-            download_process["active"] = False
-            download_process["tracks"] = []
-            download_process["current_track_index"] = -1
-            download_process["album_id"] = None
-            download_process["album_title"] = ""
-            download_process["artist_name"] = ""
-            download_process["cover_url"] = ""
+        release_download_slot()
 
 
 def _do_manual_dl(
@@ -1476,7 +1674,7 @@ def _do_manual_dl(
             fp_data = _run_manual_acoustid(config, actual_file)
 
         file_size = os.path.getsize(actual_file)
-        shutil.move(actual_file, final_file)
+        os.replace(actual_file, final_file)
         set_permissions(final_file)
     except Exception as e:
         logger.error(
@@ -1599,7 +1797,7 @@ def _execute_manual_dl(
             fp_data = _run_manual_acoustid(config, actual_file)
 
         file_size = os.path.getsize(actual_file)
-        shutil.move(actual_file, final_file)
+        os.replace(actual_file, final_file)
         set_permissions(final_file)
     except Exception as e:
         logger.error(
@@ -1801,8 +1999,8 @@ def _resolve_track_info(track_title, track_num, album_data, album_id):
     track_info = {"title": track_title, "trackNumber": track_num}
     tracks = album_data.get("tracks", [])
     if not tracks:
-        tracks_res = lidarr_request(f"track?albumId={album_id}")
-        if isinstance(tracks_res, list):
+        tracks_res = _get_tracks_cached(album_id)
+        if tracks_res is not None:
             tracks = tracks_res
         else:
             logger.warning(
@@ -1826,7 +2024,16 @@ def _run_manual_acoustid(config, filepath):
 
 
 def _refresh_lidarr_artist(album_data, track_title):
-    """Trigger a Lidarr RefreshArtist command, logging on failure."""
+    """Trigger a Lidarr RefreshArtist command, logging on failure.
+
+    The new track file changes the album's hasFile flags and missing
+    counts, so the cached copies are dropped first.
+    """
+    album_id = album_data.get("id")
+    if album_id is not None:
+        album_cache.pop(album_id)
+        tracks_cache.pop(album_id)
+    invalidate_missing_albums()
     artist_id = album_data.get("artist", {}).get("id")
     if not artist_id:
         logger.warning(
@@ -1851,13 +2058,9 @@ def _refresh_lidarr_artist(album_data, track_title):
 
 
 def _get_ytdlp_pypi_version():
-    import requests as http_requests
-
     try:
-        resp = http_requests.get(
-            "https://pypi.org/pypi/yt-dlp/json",
-            headers={"User-Agent": "lidarr-yt-downloader"},
-            timeout=10,
+        resp = http_session.get(
+            "https://pypi.org/pypi/yt-dlp/json", timeout=10,
         )
         resp.raise_for_status()
         return resp.json()["info"]["version"]
@@ -1885,10 +2088,31 @@ def _startup_ytdlp_update():
         logger.warning("yt-dlp update failed: %s", error)
         return
     logger.info("yt-dlp updated %s -> %s, restarting...", current, new_version)
+    if download_process.get("active"):
+        logger.info("Restart waits for the current download to finish")
+    freeze_download_slot(timeout=None)
     _exec_restart()
 
 
-if __name__ == "__main__":
+_services_started = False
+_gunicorn_master_pid = None
+
+
+def start_background_services(gunicorn_master_pid=None):
+    """Initialize the database and start the background worker threads.
+
+    Called once per process: from ``__main__`` for the development
+    server, or from the gunicorn ``post_worker_init`` hook.
+
+    Args:
+        gunicorn_master_pid: PID of the gunicorn master when running
+            under gunicorn, used to restart via SIGHUP.
+    """
+    global _services_started, _gunicorn_master_pid
+    if _services_started:
+        return
+    _services_started = True
+    _gunicorn_master_pid = gunicorn_master_pid
     db.init_db()
     models.reset_downloading_to_queued()
     logger.info("Starting Lidarr YouTube Downloader...")
@@ -1901,9 +2125,16 @@ if __name__ == "__main__":
     threading.Thread(target=run_scheduler, daemon=True).start()
     threading.Thread(target=process_download_queue, daemon=True).start()
     threading.Thread(target=_startup_ytdlp_update, daemon=True).start()
+
+
+if __name__ == "__main__":
+    start_background_services()
     flask_host = os.environ.get("FLASK_HOST", "0.0.0.0")  # 0.0.0.0 required for Docker
     flask_port = int(os.environ.get("FLASK_PORT", "5000"))
     logger.info(
         "Application started successfully on http://%s:%d", flask_host, flask_port
     )
-    app.run(host=flask_host, port=flask_port, debug=False, use_reloader=False)
+    app.run(
+        host=flask_host, port=flask_port, debug=False, use_reloader=False,
+        threaded=True,
+    )
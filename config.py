@@ -3,17 +3,24 @@
 Loads defaults from environment variables, overlays with config.json.
 """
 
-import json
+import copy
 import logging
 import os
 import threading
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
 CONFIG_FILE = "/config/config.json"
 
 _file_write_lock = threading.Lock()
 
+# Parsed config keyed by the config file's (path, mtime_ns, size)
+# signature, so repeated load_config() calls cost one stat().
+_config_cache = {"signature": None, "data": None}
+_config_cache_lock = threading.Lock()
+
 ALLOWED_CONFIG_KEYS = {
     "scheduler_interval", "telegram_bot_token", "telegram_chat_id",
     "telegram_enabled", "telegram_log_types", "download_path",
@@ -25,11 +32,21 @@ ALLOWED_CONFIG_KEYS = {
     "discord_enabled", "discord_webhook_url", "discord_log_types",
     "acoustid_enabled", "acoustid_api_key",
     "min_match_score",
-    "audio_format",
+    "audio_format", "mp3_quality",
 }
 
 SUPPORTED_AUDIO_FORMATS = ("mp3", "m4a", "opus")
 
+# "320" is LAME CBR 320 kbps; "V0" is LAME's top VBR preset, which is
+# transparent at ~245 kbps and encodes noticeably faster.
+SUPPORTED_MP3_QUALITIES = ("320", "V0")
+
+DEFAULT_FORBIDDEN_WORDS = (
+    "remix", "cover", "mashup", "bootleg", "live", "dj mix",
+    "karaoke", "slowed", "reverb", "nightcore", "sped up",
+    "instrumental", "acapella", "tribute",
+)
+
 MIN_MATCH_SCORE_DEFAULT = 0.8
 
 
@@ -49,6 +66,22 @@ def _normalize_audio_format(value):
     return "mp3"
 
 
+def _normalize_mp3_quality(value):
+    """Normalize an mp3_quality value to one of the supported presets.
+
+    Falls back to '320' for unrecognized or empty input.
+    """
+    if not value:
+        return "320"
+    normalized = str(value).strip().upper()
+    if normalized in SUPPORTED_MP3_QUALITIES:
+        return normalized
+    logger.warning(
+        "Unsupported mp3_quality=%r; falling back to '320'", value,
+    )
+    return "320"
+
+
 def _parse_min_match_score(value):
     """Parse min_match_score from any input, falling back to default with a warning.
 
@@ -73,8 +106,71 @@ def _parse_min_match_score(value):
     return parsed
 
 
+def _config_file_signature():
+    """Return a tuple that changes whenever CONFIG_FILE is rewritten."""
+    try:
+        st = os.stat(CONFIG_FILE)
+    except OSError:
+        return (CONFIG_FILE, None)
+    return (CONFIG_FILE, st.st_mtime_ns, st.st_size)
+
+
+def config_signature():
+    """Return a token that changes whenever the config file changes.
+
+    Lets callers cache values derived from the config without taking
+    a load_config() copy on every call.
+    """
+    return _config_file_signature()
+
+
+def _prime_config_cache():
+    """Re-read CONFIG_FILE into the cache right after it was written.
+
+    Called with _file_write_lock held, so the signature and the parsed
+    data are guaranteed to describe the same file contents and the next
+    load_config() is served from memory.
+    """
+    signature = _config_file_signature()
+    config = _read_config()
+    with _config_cache_lock:
+        _config_cache["signature"] = signature
+        _config_cache["data"] = config
+
+
 def load_config():
-    """Load config with env var defaults, overlaid by config.json."""
+    """Load config with env var defaults, overlaid by config.json.
+
+    The parsed result is cached until the file's mtime or size changes
+    (or save_config() runs). Callers get a copy they may mutate.
+    """
+    signature = _config_file_signature()
+    with _config_cache_lock:
+        if _config_cache["signature"] == signature:
+            return _copy_config(_config_cache["data"])
+    config = _read_config()
+    with _config_cache_lock:
+        _config_cache["signature"] = signature
+        _config_cache["data"] = config
+    return _copy_config(config)
+
+
+def _copy_config(config):
+    """Copy a cached config so callers cannot mutate the cache.
+
+    Most values are immutable scalars and can be shared; only list or
+    dict values are deep-copied, which is far cheaper than deepcopy()
+    of the whole mapping on every load_config() call.
+    """
+    return {
+        key: copy.deepcopy(value)
+        if isinstance(value, (list, dict)) else value
+        for key, value in config.items()
+    }
+
+
+def _read_config():
+    """Build config from env var defaults overlaid by config.json."""
     config = {
         "lidarr_url": os.getenv("LIDARR_URL", ""),
         "lidarr_api_key": os.getenv("LIDARR_API_KEY", ""),
@@ -101,11 +197,7 @@ def load_config():
         "xml_metadata_enabled": (
             os.getenv("XML_METADATA_ENABLED", "true").lower() == "true"
         ),
-        "forbidden_words": [
-            "remix", "cover", "mashup", "bootleg", "live", "dj mix",
-            "karaoke", "slowed", "reverb", "nightcore", "sped up",
-            "instrumental", "acapella", "tribute",
-        ],
+        "forbidden_words": list(DEFAULT_FORBIDDEN_WORDS),
         "duration_tolerance": int(os.getenv("DURATION_TOLERANCE", "10")),
         "concurrent_tracks": int(os.getenv("CONCURRENT_TRACKS", "2")),
         "yt_cookies_file": os.getenv("YT_COOKIES_FILE", ""),
@@ -140,13 +232,16 @@ def load_config():
         "audio_format": _normalize_audio_format(
             os.getenv("AUDIO_FORMAT", "mp3"),
         ),
+        "mp3_quality": _normalize_mp3_quality(
+            os.getenv("MP3_QUALITY", "320"),
+        ),
         "path_conflict": False,
     }
 
     if os.path.exists(CONFIG_FILE):
         try:
-            with open(CONFIG_FILE, "r") as f:
-                file_config = json.load(f)
+            with open(CONFIG_FILE, "rb") as f:
+                file_config = orjson.loads(f.read())
                 for key in config.keys():
                     if key in file_config:
                         config[key] = file_config[key]
@@ -166,7 +261,11 @@ def load_config():
                 config["audio_format"] = _normalize_audio_format(
                     config["audio_format"]
                 )
-        except (json.JSONDecodeError, OSError, ValueError) as e:
+            if "mp3_quality" in config:
+                config["mp3_quality"] = _normalize_mp3_quality(
+                    config["mp3_quality"]
+                )
+        except (orjson.JSONDecodeError, OSError, ValueError) as e:
             logger.warning("Failed to load config file %s: %s", CONFIG_FILE, e)
 
     def norm(p):
@@ -196,8 +295,9 @@ def save_config(config):
         config["duration_tolerance"] = int(config["duration_tolerance"])
     try:
         with _file_write_lock:
-            with open(CONFIG_FILE, "w") as f:
-                json.dump(config, f, indent=2)
+            with open(CONFIG_FILE, "wb") as f:
+                f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+            _prime_config_cache()
     except OSError as e:
         logger.error("Failed to save config to %s: %s", CONFIG_FILE, e)
         raise
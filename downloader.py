@@ -10,16 +10,20 @@ Public API:
     download_track_youtube()    -- thin wrapper combining both
 """
 
+import atexit
+import contextlib
+import functools
 import glob
 import logging
 import math
 import os
 import re
+import threading
 from difflib import SequenceMatcher
 
 import yt_dlp
 
-from config import load_config
+from config import DEFAULT_FORBIDDEN_WORDS, load_config
 
 logger = logging.getLogger(__name__)
 
@@ -31,12 +35,14 @@ _KNOWN_AUDIO_EXTENSIONS = (
 )
 
 
-def build_ydl_audio_opts(fmt):
+def build_ydl_audio_opts(fmt, mp3_quality="320"):
     """Return yt-dlp postprocessor/format options for an output audio format.
 
     Args:
         fmt: One of 'mp3', 'm4a', 'opus'. Unrecognized values fall back
             to mp3. Note: m4a and opus are re-muxed without transcoding.
+        mp3_quality: '320' for CBR 320 kbps or 'V0' for LAME VBR V0.
+            Only used for mp3.
 
     Returns:
         Dict with keys:
@@ -45,9 +51,12 @@ def build_ydl_audio_opts(fmt):
             suffix: expected output file extension (including leading dot).
     """
     fmt = (fmt or "mp3").lower()
+    # The passthrough formats select a stream already in the target codec
+    # first, so FFmpegExtractAudio can stream-copy instead of re-encoding.
     if fmt == "m4a":
         return {
-            "format": "bestaudio[ext=m4a]/bestaudio/best",
+            "format": "bestaudio[acodec^=mp4a]/bestaudio[ext=m4a]"
+                      "/bestaudio/best",
             "postprocessors": [
                 {"key": "FFmpegExtractAudio", "preferredcodec": "m4a"},
             ],
@@ -55,7 +64,8 @@ def build_ydl_audio_opts(fmt):
         }
     if fmt == "opus":
         return {
-            "format": "bestaudio[ext=webm]/bestaudio/best",
+            "format": "bestaudio[acodec=opus]/bestaudio[ext=webm]"
+                      "/bestaudio/best",
             "postprocessors": [
                 {"key": "FFmpegExtractAudio", "preferredcodec": "opus"},
             ],
@@ -67,7 +77,8 @@ def build_ydl_audio_opts(fmt):
             {
                 "key": "FFmpegExtractAudio",
                 "preferredcodec": "mp3",
-                "preferredquality": "320",
+                # yt-dlp treats values below 10 as a LAME VBR level.
+                "preferredquality": "0" if mp3_quality == "V0" else "320",
             },
         ],
         "suffix": ".mp3",
@@ -115,11 +126,14 @@ def get_ytdlp_version():
         return "unknown"
 
 
+@functools.lru_cache(maxsize=1024)
 def _title_similarity(yt_title, track_title, artist_name):
     """Score how well a YouTube title matches the expected track.
 
     Combines SequenceMatcher ratio with bonuses for containing
-    the track title and artist name.
+    the track title and artist name. Memoized: fallback queries and
+    retries of a track keep returning the same videos, and the ratio
+    is the costliest step in candidate scoring.
 
     Returns:
         Float between 0.0 and 1.0.
@@ -152,40 +166,90 @@ def _is_official_channel(channel_name, artist_name):
     return False
 
 
+@functools.lru_cache(maxsize=32)
+def _forbidden_pattern(forbidden_words):
+    """Compile a tuple of forbidden words into one alternation regex.
+
+    Single words are matched on word boundaries, multi-word terms as
+    plain substrings. Longer terms come first so a term that extends
+    another wins the match. Returns None for an empty list. Cached
+    because the same configured list is checked against every result.
+    """
+    words = {w for w in forbidden_words if w}
+    singles = sorted((w for w in words if " " not in w), key=len, reverse=True)
+    multis = sorted((w for w in words if " " in w), key=len, reverse=True)
+    parts = []
+    if multis:
+        parts.append("|".join(map(re.escape, multis)))
+    if singles:
+        parts.append(r"\b(?:" + "|".join(map(re.escape, singles)) + r")\b")
+    return re.compile("|".join(parts)) if parts else None
+
+
+@functools.lru_cache(maxsize=32)
+def _allowed_terms(pattern, track_title_lower):
+    """Forbidden terms that the track's own title contains.
+
+    Every search result for a track is checked against the same title,
+    so this is scanned once per track rather than once per result.
+    """
+    return frozenset(pattern.findall(track_title_lower))
+
+
 def _check_forbidden(yt_title_lower, track_title_lower, forbidden_list):
     """Check if a YouTube title contains a forbidden word.
 
     Multi-word forbidden terms use substring matching. Single words
     use word-boundary regex. Terms present in the original track
-    title are allowed.
+    title are allowed. All terms are scanned in a single regex pass.
 
     Returns:
         The matched forbidden word, or None if clean.
     """
-    for word in forbidden_list:
-        if " " in word:
-            if word in yt_title_lower and word not in track_title_lower:
-                return word
-        else:
-            pattern = r'\b' + re.escape(word) + r'\b'
-            if (
-                re.search(pattern, yt_title_lower)
-                and not re.search(pattern, track_title_lower)
-            ):
-                return word
+    pattern = _forbidden_pattern(tuple(forbidden_list))
+    if pattern is None:
+        return None
+    yt_hits = pattern.findall(yt_title_lower)
+    if not yt_hits:
+        return None
+    allowed = _allowed_terms(pattern, track_title_lower)
+    for word in yt_hits:
+        if word not in allowed:
+            return word
     return None
 
 
-def _build_common_opts(player_client=None):
-    """Build yt-dlp options dict from current config.
+# Flat search entries already carry these fields; candidates matching
+# them fail only after a full format extraction, so drop them up front.
+# The login-gated ones are kept when a cookies file is configured.
+_UNAVAILABLE_ALWAYS = frozenset({"private", "is_live", "is_upcoming"})
+_UNAVAILABLE_WITHOUT_LOGIN = frozenset({
+    "premium_only", "subscriber_only", "needs_auth",
+})
+
+
+def _unavailable_reason(entry, logged_in=False):
+    """Return why a flat search entry can't be downloaded, or None."""
+    for status in (entry.get("availability"), entry.get("live_status")):
+        if status in _UNAVAILABLE_ALWAYS:
+            return status
+        if not logged_in and status in _UNAVAILABLE_WITHOUT_LOGIN:
+            return status
+    if not logged_in and (entry.get("age_limit") or 0) >= 18:
+        return "age restricted"
+    return None
+
+
+def _build_common_opts(cfg, player_client=None):
+    """Build yt-dlp options dict from a config dict.
 
     Args:
+        cfg: Config dict from load_config().
         player_client: YouTube player client override (e.g. "android").
 
     Returns:
         Dict of yt-dlp options.
     """
-    cfg = load_config()
     opts = {
         "quiet": True,
         "no_warnings": True,
@@ -213,9 +277,30 @@ def _build_common_opts(player_client=None):
 MAX_CANDIDATES = 10
 
 
+def new_search_ydl(config=None):
+    """Create a YoutubeDL configured for search_youtube_candidates().
+
+    Lets a caller searching for many tracks reuse one instance (its
+    extractors, cookie jar and caches) instead of building one per
+    track. YoutubeDL is not thread-safe, so use one per thread, and
+    close() it when done.
+
+    Args:
+        config: Config dict, or None to load the current config.
+    """
+    config = config or load_config()
+    first_client = config.get("yt_player_client", "android") or None
+    return yt_dlp.YoutubeDL({
+        **_build_common_opts(config, player_client=first_client),
+        "format": "bestaudio/best",
+        "extract_flat": True,
+    })
+
+
 def search_youtube_candidates(
     query, track_title_original,
     expected_duration_ms=None, skip_check=None, banned_urls=None,
+    search_ydl=None, config=None,
 ):
     """Search YouTube and return scored, ranked candidates (up to MAX_CANDIDATES).
 
@@ -226,6 +311,9 @@ def search_youtube_candidates(
         skip_check: Optional callable; if it returns True, abort early and
             return an empty list.
         banned_urls: Optional set of YouTube URLs to exclude.
+        search_ydl: Optional YoutubeDL from new_search_ydl() to reuse.
+            When None, a temporary instance is created and closed here.
+        config: Config dict, or None to load the current config.
 
     Returns:
         List of candidate dicts sorted by score descending, each with keys:
@@ -234,24 +322,21 @@ def search_youtube_candidates(
     if skip_check and skip_check():
         return []
 
-    config = load_config()
-    first_client = config.get("yt_player_client", "android") or None
-    ydl_opts_search = {
-        **_build_common_opts(player_client=first_client),
-        "format": "bestaudio/best",
-        "extract_flat": True,
-    }
+    config = config or load_config()
 
-    forbidden_words = config.get("forbidden_words", [
-        "remix", "cover", "mashup", "bootleg", "live", "dj mix",
-        "karaoke", "slowed", "reverb", "nightcore", "sped up",
-        "instrumental", "acapella", "tribute",
-    ])
+    forbidden_words = tuple(
+        config.get("forbidden_words", DEFAULT_FORBIDDEN_WORDS)
+    )
+    track_title_lower = track_title_original.lower()
+    logged_in = bool((config.get("yt_cookies_file") or "").strip())
     duration_tolerance = config.get("duration_tolerance", 10)
 
     expected_duration_sec = None
+    min_dur, max_dur = 15, 7200
     if expected_duration_ms:
         expected_duration_sec = expected_duration_ms / 1000.0
+        min_dur = max(15, expected_duration_sec - duration_tolerance)
+        max_dur = expected_duration_sec + duration_tolerance
         mins = int(expected_duration_sec // 60)
         secs = int(expected_duration_sec % 60)
         logger.info(
@@ -279,24 +364,41 @@ def search_youtube_candidates(
         search_queries.append(alt_q3)
 
     candidates = []
-    for qi, sq in enumerate(search_queries):
-        if skip_check and skip_check():
-            return []
-        if candidates:
-            break
-        if qi > 0:
-            logger.info(
-                f"   Fallback search ({qi+1}/{len(search_queries)}):"
-                f' "{sq}"'
-            )
-        try:
-            with yt_dlp.YoutubeDL(ydl_opts_search) as ydl:
+    # One YoutubeDL serves every fallback query for this track instead
+    # of rebuilding extractors, cookie jar and caches per query.
+    if search_ydl is not None:
+        ydl_context = contextlib.nullcontext(search_ydl)
+    else:
+        ydl_context = new_search_ydl(config)
+    with ydl_context as ydl:
+        for qi, sq in enumerate(search_queries):
+            if skip_check and skip_check():
+                return []
+            if candidates:
+                break
+            if qi > 0:
+                logger.info(
+                    f"   Fallback search ({qi+1}/{len(search_queries)}):"
+                    f' "{sq}"'
+                )
+            try:
                 search_results = ydl.extract_info(
                     f"ytsearch15:{sq}", download=False
                 )
                 for entry in search_results.get("entries", []):
-                    title = entry.get("title", "").lower()
+                    if not entry:
+                        continue
                     url = entry.get("url")
+                    if not url:
+                        continue
+                    unavailable = _unavailable_reason(entry, logged_in)
+                    if unavailable:
+                        logger.debug(
+                            "   Rejected '%s' - %s",
+                            entry.get("title", ""), unavailable,
+                        )
+                        continue
+                    title = entry.get("title", "").lower()
                     duration = entry.get("duration", 0)
                     channel = (
                         entry.get("channel", "")
@@ -306,34 +408,30 @@ def search_youtube_candidates(
                     view_count = entry.get("view_count", 0) or 0
 
                     blocked = _check_forbidden(
-                        title, track_title_original.lower(), forbidden_words,
+                        title, track_title_lower, forbidden_words,
                     )
                     if blocked:
                         logger.debug(
-                            f"   Rejected '{entry.get('title', '')}'"
-                            f" - forbidden word '{blocked}'"
+                            "   Rejected '%s' - forbidden word '%s'",
+                            entry.get("title", ""), blocked,
                         )
                         continue
 
-                    if expected_duration_sec:
-                        min_dur = max(
-                            15, expected_duration_sec - duration_tolerance
-                        )
-                        max_dur = expected_duration_sec + duration_tolerance
-                        if duration < min_dur or duration > max_dur:
+                    if duration < min_dur or duration > max_dur:
+                        if expected_duration_sec:
                             logger.debug(
-                                f"   Rejected '{entry.get('title', '')}'"
-                                f" - duration {int(duration)}s outside"
-                                f" [{int(min_dur)}s - {int(max_dur)}s]"
+                                "   Rejected '%s' - duration %ds outside"
+                                " [%ds - %ds]",
+                                entry.get("title", ""), duration,
+                                min_dur, max_dur,
                             )
-                            continue
+                        continue
+                    if expected_duration_sec:
                         dur_diff = abs(duration - expected_duration_sec)
                         duration_score = max(
                             0, 1.0 - (dur_diff / max(duration_tolerance, 1))
                         )
                     else:
-                        if duration < 15 or duration > 7200:
-                            continue
                         duration_score = 0.5
 
                     if banned_urls and url in banned_urls:
@@ -363,31 +461,118 @@ def search_youtube_candidates(
                         + view_score
                     )
 
-                    if url:
-                        candidates.append({
-                            "url": url,
-                            "title": entry.get("title", ""),
-                            "duration": duration,
-                            "channel": channel,
-                            "score": total_score,
-                        })
-                        logger.debug(
-                            f"   Candidate '{entry.get('title', '')}'"
-                            f" -- score={total_score:.2f}"
-                            f" (dur={duration_score:.2f}"
-                            f" title={title_score:.2f}"
-                            f" official={official_bonus:.2f}"
-                            f" views={view_score:.3f})"
-                        )
-        except Exception as e:
-            logger.error(f'   Search failed for "{sq}": {e}')
+                    candidates.append({
+                        "url": url,
+                        "title": entry.get("title", ""),
+                        "duration": duration,
+                        "channel": channel,
+                        "score": total_score,
+                    })
+                    logger.debug(
+                        "   Candidate '%s' -- score=%.2f (dur=%.2f"
+                        " title=%.2f official=%.2f views=%.3f)",
+                        entry.get("title", ""), total_score,
+                        duration_score, title_score, official_bonus,
+                        view_score,
+                    )
+            except yt_dlp.utils.DownloadError as e:
+                logger.error(f'   Search failed for "{sq}": {e}')
+            except Exception:
+                # A malformed entry shouldn't fail the whole track, but it
+                # is a bug worth a traceback rather than a one-line error.
+                logger.exception(f'   Search failed for "{sq}"')
 
     candidates.sort(key=lambda x: x["score"], reverse=True)
     return candidates[:MAX_CANDIDATES]
 
 
+# Idle download YoutubeDLs keyed by the options they were built with.
+# Building one loads the extractor registry and parses the cookie jar,
+# so instances are checked out for a single download at a time (they are
+# not thread-safe) and handed back for the next track. Changed settings
+# produce new options and so a new key; the oldest keys are retired once
+# more than MAX_DOWNLOADER_KEYS are in use.
+MAX_IDLE_DOWNLOADERS = 8
+MAX_DOWNLOADER_KEYS = 8
+_download_pool = {}
+_download_pool_lock = threading.Lock()
+
+
+class _PooledDownloader:
+    """A download YoutubeDL whose output path and progress hook vary.
+
+    yt-dlp fixes progress hooks at construction, so the instance gets a
+    forwarding hook and each download swaps in its own callback and
+    output template.
+    """
+
+    def __init__(self, opts):
+        self.progress_hook = None
+        self.ydl = yt_dlp.YoutubeDL({
+            **opts, "progress_hooks": [self._forward_progress],
+        })
+
+    def _forward_progress(self, d):
+        if self.progress_hook:
+            self.progress_hook(d)
+
+    def download(self, url, outtmpl, progress_hook=None):
+        self.ydl.params["outtmpl"]["default"] = outtmpl
+        self.progress_hook = progress_hook
+        try:
+            self.ydl.download([url])
+        finally:
+            self.progress_hook = None
+
+
+def _checkout_downloader(opts):
+    """Take an idle downloader built from opts, or build a new one."""
+    key = repr(opts)
+    with _download_pool_lock:
+        idle = _download_pool.get(key)
+        downloader = idle.pop() if idle else None
+    if downloader is None:
+        downloader = _PooledDownloader(opts)
+    return key, downloader
+
+
+def _return_downloader(key, downloader):
+    retired = []
+    with _download_pool_lock:
+        if key not in _download_pool:
+            while len(_download_pool) >= MAX_DOWNLOADER_KEYS:
+                oldest = next(iter(_download_pool))
+                retired.extend(_download_pool.pop(oldest))
+            _download_pool[key] = []
+        idle = _download_pool[key]
+        if len(idle) < MAX_IDLE_DOWNLOADERS:
+            idle.append(downloader)
+        else:
+            retired.append(downloader)
+    for stale in retired:
+        stale.ydl.close()
+
+
+def close_download_pool():
+    """Close and forget every idle download YoutubeDL.
+
+    Closing lets yt-dlp write back its cookie jar. Runs at exit, and
+    before app.py re-execs the process for a restart (which skips
+    atexit).
+    """
+    with _download_pool_lock:
+        retired = [d for idle in _download_pool.values() for d in idle]
+        _download_pool.clear()
+    for downloader in retired:
+        downloader.ydl.close()
+
+
+atexit.register(close_download_pool)
+
+
 def download_youtube_candidate(
     candidate, output_path, progress_hook=None, skip_check=None,
+    config=None,
 ):
     """Download a single YouTube candidate as MP3, trying multiple player clients.
 
@@ -397,6 +582,7 @@ def download_youtube_candidate(
         progress_hook: Optional callback for yt-dlp progress events.
         skip_check: Optional callable; if it returns True, abort and return
             {"skipped": True}.
+        config: Config dict, or None to load the current config.
 
     Returns:
         Dict with result info on success/failure, or {"skipped": True}.
@@ -404,7 +590,7 @@ def download_youtube_candidate(
     if skip_check and skip_check():
         return {"skipped": True}
 
-    config = load_config()
+    config = config or load_config()
     first_client = config.get("yt_player_client", "android")
     clients_to_try = []
     if first_client:
@@ -414,49 +600,56 @@ def download_youtube_candidate(
             clients_to_try.append(alt)
     clients_to_try.append(None)
 
-    audio_opts = build_ydl_audio_opts(config.get("audio_format", "mp3"))
+    audio_opts = build_ydl_audio_opts(
+        config.get("audio_format", "mp3"), config.get("mp3_quality", "320"),
+    )
 
     last_err = None
     for pc in clients_to_try:
         if skip_check and skip_check():
             return {"skipped": True}
         ydl_opts_download = {
-            **_build_common_opts(player_client=pc),
+            **_build_common_opts(config, player_client=pc),
             "format": audio_opts["format"],
             "postprocessors": audio_opts["postprocessors"],
-            "outtmpl": output_path + ".%(ext)s",
         }
-        if progress_hook:
-            ydl_opts_download["progress_hooks"] = [progress_hook]
+        pool_key, downloader = _checkout_downloader(ydl_opts_download)
         try:
-            with yt_dlp.YoutubeDL(ydl_opts_download) as ydl_dl:
-                ydl_dl.download([candidate["url"]])
-            return {
-                "success": True,
-                "youtube_url": candidate["url"],
-                "youtube_title": candidate["title"],
-                "match_score": round(candidate["score"], 4),
-                "duration_seconds": int(candidate["duration"]),
-            }
+            downloader.download(
+                candidate["url"], output_path + ".%(ext)s", progress_hook,
+            )
         except Exception as e:
+            # A failed instance may hold half-torn-down state; drop it.
+            downloader.ydl.close()
             last_err = e
             msg = str(e)
             if "403" in msg:
                 logger.debug(
-                    f"   403 with player_client={pc or 'default'};"
+                    "   403 with player_client=%s;"
                     " ensure cookies are provided"
-                    " (YT_COOKIES_FILE) and try again"
+                    " (YT_COOKIES_FILE) and try again",
+                    pc or "default",
                 )
             else:
                 logger.debug(
-                    f"   Failed with player_client={pc or 'default'};"
-                    f" {msg[:180]}"
+                    "   Failed with player_client=%s; %s",
+                    pc or "default", msg[:180],
                 )
+        else:
+            _return_downloader(pool_key, downloader)
+            return {
+                "success": True,
+                "youtube_url": candidate["url"],
+                "youtube_title": candidate["title"],
+                "match_score": round(candidate["score"], 4),
+                "duration_seconds": int(candidate["duration"]),
+            }
 
     if last_err:
         logger.debug(
-            f"   Failed to download '{candidate['title']}'"
-            " after trying multiple client profiles."
+            "   Failed to download '%s'"
+            " after trying multiple client profiles.",
+            candidate["title"],
         )
 
     last_error_msg = str(last_err)[:120] if last_err else "Unknown error"
@@ -494,9 +687,10 @@ def download_track_youtube(
     Returns:
         Dict with result info on success/failure, or {"skipped": True}.
     """
+    config = load_config()
     candidates = search_youtube_candidates(
         query, track_title_original, expected_duration_ms, skip_check,
-        banned_urls,
+        banned_urls, config=config,
     )
     if not candidates:
         if skip_check and skip_check():
@@ -523,6 +717,7 @@ def download_track_youtube(
     for candidate in candidates:
         result = download_youtube_candidate(
             candidate, output_path, progress_hook, skip_check,
+            config=config,
         )
         if result.get("skipped"):
             return result
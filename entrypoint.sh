@@ -25,8 +25,8 @@ if [ "$PUID" != "0" ] && [ "$PGID" != "0" ]; then
     chown -R appuser:appgroup /config
 
     # Run as the app user
-    exec gosu appuser:appgroup python app.py
+    exec gosu appuser:appgroup gunicorn -c gunicorn.conf.py app:app
 else
     echo "Starting as root (PUID/PGID not set), UMASK=$UMASK"
-    exec python app.py
+    exec gunicorn -c gunicorn.conf.py app:app
 fi
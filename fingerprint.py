@@ -14,6 +14,8 @@ import time
 
 import requests
 
+from utils import http_session
+
 logger = logging.getLogger(__name__)
 
 ACOUSTID_API_URL = "https://api.acoustid.org/v2/lookup"
@@ -79,7 +81,7 @@ def _lookup_acoustid(api_key, duration, fingerprint):
     }
     try:
         _throttle()
-        r = requests.get(ACOUSTID_API_URL, params=params, timeout=15)
+        r = http_session.get(ACOUSTID_API_URL, params=params, timeout=15)
         r.raise_for_status()
         data = r.json()
         if data.get("status") != "ok":
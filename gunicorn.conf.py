@@ -0,0 +1,30 @@
+"""Gunicorn settings for Lidarr YouTube Downloader.
+
+Runs a single worker process: the download state, queue processor and
+scheduler live in-process, so extra workers would start duplicate
+downloaders and disagree about what is running. Request concurrency
+comes from gthread worker threads instead, which keeps status polls and
+the SSE stream responsive while Lidarr or Telegram calls block.
+"""
+
+import os
+
+bind = "{}:{}".format(
+    os.environ.get("FLASK_HOST", "0.0.0.0"),
+    os.environ.get("FLASK_PORT", "5000"),
+)
+workers = 1
+worker_class = "gthread"
+threads = int(os.environ.get("WEB_THREADS", "16"))
+# Long-lived SSE responses occupy a thread, not the worker heartbeat.
+timeout = 120
+graceful_timeout = 10
+keepalive = 5
+
+
+def post_worker_init(worker):
+    """Start the scheduler, queue processor and update check once."""
+    from app import start_background_services
+
+    start_background_services(gunicorn_master_pid=worker.ppid)
+    worker.log.info("Application started successfully on http://%s", bind)
@@ -5,13 +5,64 @@ fetching missing albums, and resolving release IDs.
 """
 
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
+import orjson
 import requests
 
-from config import load_config
+from config import config_signature, load_config
+from utils import TTLCache, http_session
 
 logger = logging.getLogger(__name__)
 
+LIDARR_MAX_CONCURRENT = 8
+LIDARR_REQUEST_TIMEOUT = 30
+LIDARR_FANOUT_WORKERS = LIDARR_MAX_CONCURRENT
+
+# Caps in-flight Lidarr calls across all threads (track workers, queue
+# UI, scheduler) below the HTTP pool size so requests never wait on, or
+# spill out of, the connection pool.
+_lidarr_slots = threading.BoundedSemaphore(LIDARR_MAX_CONCURRENT)
+
+# The wanted/missing walk pages through every missing album; the result
+# is shared by the dashboard and scheduler until it expires or an import
+# changes it (invalidate_missing_albums). If Lidarr is unreachable when
+# it expires, the last good list is served instead of an empty one.
+MISSING_ALBUMS_TTL = 30
+_missing_albums_cache = TTLCache(maxsize=1, ttl=MISSING_ALBUMS_TTL)
+
+# Base URL and auth headers derived from the config, rebuilt only when
+# the config file signature changes instead of on every API call.
+_endpoint_cache = {"signature": None, "base_url": "", "headers": {}}
+_endpoint_lock = threading.Lock()
+
+
+def _lidarr_endpoint():
+    """Return (base_url, headers) for the configured Lidarr instance."""
+    signature = config_signature()
+    with _endpoint_lock:
+        if _endpoint_cache["signature"] == signature:
+            return _endpoint_cache["base_url"], _endpoint_cache["headers"]
+    config = load_config()
+    base_url = f"{config['lidarr_url']}/api/v1/"
+    headers = {"X-Api-Key": config["lidarr_api_key"]}
+    with _endpoint_lock:
+        _endpoint_cache["signature"] = signature
+        _endpoint_cache["base_url"] = base_url
+        _endpoint_cache["headers"] = headers
+    return base_url, headers
+
+
+def _reset_lidarr_endpoint():
+    """Forget the cached URL and API key (test hook).
+
+    The app itself never needs this: any change to the config file
+    changes its signature, which already invalidates the entry.
+    """
+    with _endpoint_lock:
+        _endpoint_cache["signature"] = None
+
 
 def lidarr_request(endpoint, method="GET", data=None, params=None):
     """Make an authenticated request to the Lidarr API.
@@ -25,38 +76,90 @@ def lidarr_request(endpoint, method="GET", data=None, params=None):
     Returns:
         Parsed JSON response as a dict, or {"error": "..."} on failure.
     """
-    config = load_config()
-    url = f"{config['lidarr_url']}/api/v1/{endpoint}"
-    headers = {"X-Api-Key": config["lidarr_api_key"]}
+    if method not in ("GET", "POST"):
+        raise ValueError(f"Unsupported Lidarr method: {method}")
+    base_url, headers = _lidarr_endpoint()
+    url = f"{base_url}{endpoint}"
     try:
-        if method == "GET":
-            r = requests.get(
-                url, headers=headers, params=params, timeout=30
-            )
-        elif method == "POST":
-            r = requests.post(
-                url, headers=headers, json=data, timeout=30
-            )
-        r.raise_for_status()
-        return r.json()
+        with _lidarr_slots:
+            if method == "GET":
+                r = http_session.get(
+                    url, headers=headers, params=params,
+                    timeout=LIDARR_REQUEST_TIMEOUT,
+                )
+            else:
+                r = http_session.post(
+                    url, headers=headers, json=data,
+                    timeout=LIDARR_REQUEST_TIMEOUT,
+                )
+            r.raise_for_status()
+            # Album and wanted/missing payloads run to hundreds of KB;
+            # orjson parses the raw bytes without a str round trip.
+            return orjson.loads(r.content)
     except requests.exceptions.ConnectionError as e:
         logger.warning("Cannot connect to Lidarr at %s: %s", url, e)
         return {"error": f"Cannot connect to Lidarr: {e}"}
     except requests.exceptions.Timeout:
         logger.warning("Lidarr request timed out: %s", endpoint)
         return {"error": "Lidarr request timed out"}
-    except Exception as e:
-        logger.error("Unexpected error calling Lidarr %s: %s", endpoint, e)
+    except requests.exceptions.RequestException as e:
+        logger.error("Lidarr request failed %s: %s", endpoint, e)
         return {"error": str(e)}
+    except ValueError as e:
+        logger.error("Invalid JSON from Lidarr %s: %s", endpoint, e)
+        return {"error": f"Invalid response from Lidarr: {e}"}
+
+
+def lidarr_get_many(endpoints):
+    """Issue several independent Lidarr GETs concurrently.
+
+    The calls share the pooled HTTP session, so their round trips
+    overlap instead of running back to back.
+
+    Args:
+        endpoints: Iterable of endpoint paths (as for lidarr_request).
+
+    Returns:
+        List of lidarr_request results in the same order as endpoints.
+    """
+    endpoints = list(endpoints)
+    if len(endpoints) <= 1:
+        return [lidarr_request(endpoint) for endpoint in endpoints]
+    workers = min(LIDARR_FANOUT_WORKERS, len(endpoints))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lidarr_request, endpoints))
+
+
+def get_albums(album_ids):
+    """Fetch several albums from Lidarr in a single request.
+
+    Args:
+        album_ids: Iterable of Lidarr album IDs.
+
+    Returns:
+        List of album dicts (order not guaranteed), or {"error": "..."}
+        on failure.
+    """
+    album_ids = list(album_ids)
+    if not album_ids:
+        return []
+    return lidarr_request("album", params={"albumIds": album_ids})
 
 
 def get_missing_albums():
     """Fetch all missing albums from Lidarr with pagination.
 
+    Successful results are cached for MISSING_ALBUMS_TTL seconds and the
+    same list object is returned while cached; treat it as read-only.
+
     Returns:
         List of album dicts, each augmented with a missingTrackCount field.
-        Returns an empty list on error.
+        On error, the last successful (expired) list if there is one,
+        otherwise whatever was fetched before the failure.
     """
+    cached = _missing_albums_cache.get("albums")
+    if cached is not None:
+        return cached
     try:
         page = 1
         page_size = 500
@@ -73,14 +176,19 @@ def get_missing_albums():
                         "Lidarr returned error fetching missing albums"
                         " (page %d): %s", page, wanted["error"],
                     )
+                    return (
+                        _missing_albums_cache.get_stale("albums")
+                        or all_records
+                    )
                 break
             records = wanted.get("records", [])
             total_records = wanted.get("totalRecords", 0)
             for album in records:
-                stats = album.get("statistics", {})
-                total = stats.get("trackCount", 0)
-                files = stats.get("trackFileCount", 0)
-                album["missingTrackCount"] = total - files
+                stats = album.get("statistics") or {}
+                album["missingTrackCount"] = (
+                    stats.get("trackCount", 0)
+                    - stats.get("trackFileCount", 0)
+                )
             all_records.extend(records)
             if (
                 len(all_records) >= total_records
@@ -88,10 +196,24 @@ def get_missing_albums():
             ):
                 break
             page += 1
+        _missing_albums_cache.set("albums", all_records)
         return all_records
     except Exception as e:
         logger.warning(f"Failed to get missing albums: {e}")
-        return []
+        return _missing_albums_cache.get_stale("albums") or []
+
+
+def invalidate_missing_albums():
+    """Drop the cached missing-albums list so the next call refetches."""
+    _missing_albums_cache.clear()
+
+
+def get_album_cover_url(album):
+    """Return the remote URL of an album's cover image, or ""."""
+    for image in album.get("images", ()):
+        if image.get("coverType") == "cover":
+            return image.get("remoteUrl", "")
+    return ""
 
 
 def get_valid_release_id(album):
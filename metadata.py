@@ -6,15 +6,19 @@ album artwork.
 """
 
 import base64
+import contextlib
+import functools
 import logging
 import os
+import threading
+import time
 from xml.sax.saxutils import escape as xml_escape
 
-import requests
 from mutagen.flac import Picture
 from mutagen.id3 import (
     APIC,
     ID3,
+    ID3NoHeaderError,
     TALB,
     TDRC,
     TIT2,
@@ -29,12 +33,75 @@ from mutagen.mp4 import MP4, MP4Cover, MP4FreeForm, AtomDataType
 from mutagen.oggopus import OggOpus
 
 from lidarr import get_monitored_release
-from utils import sanitize_filename
+from utils import TTLCache, http_session, sanitize_filename
 
 logger = logging.getLogger(__name__)
 
+ITUNES_SEARCH_URL = "https://itunes.apple.com/search"
+ITUNES_LOOKUP_URL = "https://itunes.apple.com/lookup"
+ITUNES_MIN_INTERVAL = 3.0  # iTunes allows roughly 20 calls per minute
+# Apple's CDN renders artwork at the requested size. 1000px is plenty for
+# players and Lidarr, and is a fraction of the 3000px file that would
+# otherwise be embedded into every track of the album.
+ITUNES_ARTWORK_SIZE = 1000
+# Artwork is held in memory and embedded into every track; anything this
+# large is not a cover image.
+MAX_ARTWORK_BYTES = 10 * 1024 * 1024
+ARTWORK_CHUNK_SIZE = 64 * 1024
+
+ITUNES_SEARCH_LIMIT = 10
+# Catalogue data barely changes; a day-long cache means the track view
+# and the album download share one search instead of two throttled ones.
+ITUNES_CACHE_TTL = 24 * 60 * 60
+ITUNES_EMPTY_CACHE_TTL = 60 * 60
+
+_itunes_last_request = 0.0
+_itunes_throttle_lock = threading.Lock()
+# One lock per in-flight cache key, so concurrent lookups of the same
+# album share one request while lookups of other albums don't queue
+# behind it. Entries are dropped once nobody holds or waits on them.
+_itunes_key_locks = {}
+_itunes_key_locks_guard = threading.Lock()
+_itunes_cache = TTLCache(maxsize=512, ttl=ITUNES_CACHE_TTL)
+
+
+def album_tag_fields(album_info):
+    """Resolve the album-level tag values shared by every track.
+
+    Computed once per album and passed to tag_audio() so each track only
+    adds its own title, number, and recording ID.
 
-def tag_mp3(file_path, track_info, album_info, cover_data):
+    Args:
+        album_info: Lidarr album dict.
+
+    Returns:
+        Dict with artist, album, year, track_count, and musicbrainz — a
+        list of (value, TXXX description) pairs, or None when the album
+        has no releases.
+    """
+    artist = album_info.get("artist") or {}
+    release = get_monitored_release(album_info)
+    musicbrainz = None
+    if release:
+        musicbrainz = [
+            (release.get("foreignReleaseId"), "MusicBrainz Album Id"),
+            (artist.get("foreignArtistId"), "MusicBrainz Artist Id"),
+            (
+                album_info.get("foreignAlbumId"),
+                "MusicBrainz Album Release Group Id",
+            ),
+            (release.get("country"), "MusicBrainz Release Country"),
+        ]
+    return {
+        "artist": artist.get("artistName", ""),
+        "album": album_info.get("title", ""),
+        "year": str(album_info.get("releaseDate") or "")[:4],
+        "track_count": album_info.get("trackCount", 0),
+        "musicbrainz": musicbrainz,
+    }
+
+
+def tag_mp3(file_path, track_info, album_info, cover_data, album_fields=None):
     """Apply ID3 tags to an MP3 file including MusicBrainz metadata.
 
     Args:
@@ -43,59 +110,53 @@ def tag_mp3(file_path, track_info, album_info, cover_data):
         album_info: Dict with title, artist, releaseDate, trackCount,
             foreignAlbumId, and releases list.
         cover_data: Raw bytes of cover art image, or None.
+        album_fields: Precomputed album_tag_fields(album_info), or None
+            to derive them here.
 
     Returns:
         True on success, False on failure.
     """
     try:
+        fields = album_fields or album_tag_fields(album_info)
+        # Read only the ID3 header instead of parsing the MPEG stream;
+        # ffmpeg always writes one. Files without a tag are checked to
+        # really be MP3 before a fresh tag is attached.
         try:
-            audio = MP3(file_path, ID3=ID3)
-        except Exception as e:
-            logger.debug("MP3 load with ID3 failed for %s: %s, retrying", file_path, e)
-            audio = MP3(file_path)
-            audio.add_tags()
-        if audio.tags is None:
-            audio.add_tags()
-
-        audio.tags.add(TIT2(encoding=3, text=track_info["title"]))
-        audio.tags.add(
-            TPE1(encoding=3, text=album_info["artist"]["artistName"])
-        )
-        audio.tags.add(
-            TPE2(encoding=3, text=album_info["artist"]["artistName"])
-        )
-        audio.tags.add(TALB(encoding=3, text=album_info["title"]))
-        audio.tags.add(
-            TDRC(
-                encoding=3,
-                text=str(album_info.get("releaseDate", "")[:4]),
-            )
-        )
+            tags = ID3(file_path)
+        except ID3NoHeaderError:
+            MP3(file_path)
+            tags = ID3()
+
+        frames = [
+            TIT2(encoding=3, text=track_info["title"]),
+            TPE1(encoding=3, text=fields["artist"]),
+            TPE2(encoding=3, text=fields["artist"]),
+            TALB(encoding=3, text=fields["album"]),
+            TDRC(encoding=3, text=fields["year"]),
+        ]
 
         try:
             t_num = int(track_info["trackNumber"])
-            audio.tags.add(
-                TRCK(
-                    encoding=3,
-                    text=f"{t_num}/{album_info.get('trackCount', 0)}",
-                )
+            frames.append(
+                TRCK(encoding=3, text=f"{t_num}/{fields['track_count']}")
             )
         except (ValueError, KeyError):
             pass
 
-        release = get_monitored_release(album_info)
-        if release:
-            _add_musicbrainz_tags(audio, track_info, album_info, release)
+        if fields["musicbrainz"] is not None:
+            frames.extend(
+                _musicbrainz_frames(track_info, fields["musicbrainz"])
+            )
 
         if track_info.get("foreignRecordingId"):
-            audio.tags.add(
+            frames.append(
                 UFID(
                     owner="http://musicbrainz.org",
                     data=track_info["foreignRecordingId"].encode(),
                 )
             )
         if cover_data:
-            audio.tags.add(
+            frames.append(
                 APIC(
                     encoding=3,
                     mime="image/jpeg",
@@ -105,40 +166,59 @@ def tag_mp3(file_path, track_info, album_info, cover_data):
                 )
             )
 
-        audio.save(v2_version=3)
+        # Frames are built as plain objects and stored by key in one
+        # pass; setall() skips add()'s per-frame upgrade check and still
+        # replaces whatever a previous tagging run left under that key.
+        for frame in frames:
+            tags.setall(frame.HashKey, [frame])
+
+        tags.save(file_path, v2_version=3)
         return True
     except Exception as e:
         logger.warning(f"Failed to tag MP3 {file_path}: {e}")
         return False
 
 
-def _add_musicbrainz_tags(audio, track_info, album_info, release):
-    """Add MusicBrainz-specific TXXX frames to the audio tags."""
+def _musicbrainz_frames(track_info, album_mb_fields):
+    """Build the MusicBrainz-specific TXXX frames for an ID3 tag."""
     mb_fields = [
         (
             track_info.get("foreignRecordingId"),
             "MusicBrainz Release Track Id",
         ),
-        (
-            release.get("foreignReleaseId"),
-            "MusicBrainz Album Id",
-        ),
-        (
-            album_info["artist"].get("foreignArtistId"),
-            "MusicBrainz Artist Id",
-        ),
-        (
-            album_info.get("foreignAlbumId"),
-            "MusicBrainz Album Release Group Id",
-        ),
-        (
-            release.get("country"),
-            "MusicBrainz Release Country",
-        ),
+        *album_mb_fields,
+    ]
+    return [
+        TXXX(encoding=3, desc=desc, text=value)
+        for value, desc in mb_fields
+        if value
     ]
-    for value, desc in mb_fields:
-        if value:
-            audio.tags.add(TXXX(encoding=3, desc=desc, text=value))
+
+
+_XML_SONG_TEMPLATE = "<song>\n  <title>{title}</title>\n{album_block}</song>"
+
+
+@functools.lru_cache(maxsize=64)
+def _xml_album_block(artist, album, album_id, artist_id):
+    """Build the escaped album-level XML elements shared by every track."""
+    safe_artist = xml_escape(artist)
+    lines = [
+        f"  <artist>{safe_artist}</artist>\n",
+        f"  <performingartist>{safe_artist}</performingartist>\n",
+        f"  <albumartist>{safe_artist}</albumartist>\n",
+        f"  <album>{xml_escape(album)}</album>\n",
+    ]
+    if album_id:
+        lines.append(
+            f"  <musicbrainzalbumid>{xml_escape(str(album_id))}"
+            f"</musicbrainzalbumid>\n"
+        )
+    if artist_id:
+        lines.append(
+            f"  <musicbrainzartistid>{xml_escape(str(artist_id))}"
+            f"</musicbrainzartistid>\n"
+        )
+    return "".join(lines)
 
 
 def create_xml_metadata(
@@ -163,31 +243,9 @@ def create_xml_metadata(
         sanitized_title = sanitize_filename(title)
         filename = f"{track_num:02d} - {sanitized_title}.xml"
         file_path = os.path.join(output_dir, filename)
-        safe_title = xml_escape(title)
-        safe_artist = xml_escape(artist)
-        safe_album = xml_escape(album)
-        mb_album = (
-            f"  <musicbrainzalbumid>"
-            f"{xml_escape(str(album_id))}"
-            f"</musicbrainzalbumid>\n"
-            if album_id
-            else ""
-        )
-        mb_artist = (
-            f"  <musicbrainzartistid>"
-            f"{xml_escape(str(artist_id))}"
-            f"</musicbrainzartistid>\n"
-            if artist_id
-            else ""
-        )
-        content = (
-            f"<song>\n"
-            f"  <title>{safe_title}</title>\n"
-            f"  <artist>{safe_artist}</artist>\n"
-            f"  <performingartist>{safe_artist}</performingartist>\n"
-            f"  <albumartist>{safe_artist}</albumartist>\n"
-            f"  <album>{safe_album}</album>\n"
-            f"{mb_album}{mb_artist}</song>"
+        content = _XML_SONG_TEMPLATE.format(
+            title=xml_escape(title),
+            album_block=_xml_album_block(artist, album, album_id, artist_id),
         )
         with open(file_path, "w", encoding="utf-8") as f:
             f.write(content)
@@ -197,6 +255,75 @@ def create_xml_metadata(
         return False
 
 
+def _itunes_throttle():
+    """Space iTunes Search/Lookup calls to stay under Apple's rate limit."""
+    global _itunes_last_request
+    with _itunes_throttle_lock:
+        elapsed = time.monotonic() - _itunes_last_request
+        if elapsed < ITUNES_MIN_INTERVAL:
+            time.sleep(ITUNES_MIN_INTERVAL - elapsed)
+        _itunes_last_request = time.monotonic()
+
+
+@contextlib.contextmanager
+def _itunes_key_lock(key):
+    """Hold the fetch lock for one iTunes cache key."""
+    with _itunes_key_locks_guard:
+        entry = _itunes_key_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _itunes_key_locks_guard:
+            entry[1] -= 1
+            if not entry[1]:
+                del _itunes_key_locks[key]
+
+
+def _itunes_get(url, params):
+    """Throttled, cached GET against the iTunes API, returning parsed JSON.
+
+    Responses are cached for ITUNES_CACHE_TTL (ITUNES_EMPTY_CACHE_TTL
+    when there are no results). Failed requests raise and are not cached.
+    """
+    key = (url, tuple(sorted(params.items())))
+    cached = _itunes_cache.get(key)
+    if cached is not None:
+        return cached
+    with _itunes_key_lock(key):
+        # Another thread may have fetched this while we waited.
+        cached = _itunes_cache.get(key)
+        if cached is not None:
+            return cached
+        _itunes_throttle()
+        r = http_session.get(url, params=params, timeout=10)
+        # A 403/429 or 5xx body has no "results" and must not be cached
+        # as an album iTunes doesn't know.
+        r.raise_for_status()
+        data = r.json()
+        ttl = (
+            ITUNES_CACHE_TTL if data.get("results")
+            else ITUNES_EMPTY_CACHE_TTL
+        )
+        _itunes_cache.set(key, data, ttl=ttl)
+    return data
+
+
+def _itunes_album_search(artist, album):
+    """Search iTunes albums; shared by the track list and artwork lookups.
+
+    The search is case-insensitive, so the term is lowercased and its
+    whitespace collapsed to let spelling variants share a cache entry.
+    """
+    params = {
+        "term": " ".join(f"{artist} {album}".lower().split()),
+        "entity": "album",
+        "limit": ITUNES_SEARCH_LIMIT,
+    }
+    return _itunes_get(ITUNES_SEARCH_URL, params)
+
+
 def get_itunes_tracks(artist, album_name):
     """Look up album tracks from the iTunes Search API.
 
@@ -209,22 +336,11 @@ def get_itunes_tracks(artist, album_name):
         Returns an empty list on error or no results.
     """
     try:
-        url = "https://itunes.apple.com/search"
-        params = {
-            "term": f"{artist} {album_name}",
-            "entity": "album",
-            "limit": 1,
-        }
-        r = requests.get(url, params=params, timeout=10)
-        data = r.json()
+        data = _itunes_album_search(artist, album_name)
         if data.get("resultCount", 0) > 0:
             collection_id = data["results"][0]["collectionId"]
-            lookup_url = "https://itunes.apple.com/lookup"
             lookup_params = {"id": collection_id, "entity": "song"}
-            lookup_r = requests.get(
-                lookup_url, params=lookup_params, timeout=10
-            )
-            lookup_data = lookup_r.json()
+            lookup_data = _itunes_get(ITUNES_LOOKUP_URL, lookup_params)
             tracks = []
             for item in lookup_data.get("results", [])[1:]:
                 tracks.append(
@@ -247,7 +363,8 @@ def get_itunes_artwork(artist, album):
     Iterates the top 10 results and returns the artwork from the first
     album whose artist name matches (case-insensitive substring) the
     requested artist. Replaces both ``100x100bb`` and ``100x100`` URL
-    segments with ``3000x3000bb`` / ``3000x3000`` to fetch hi-res art.
+    segments with ``ITUNES_ARTWORK_SIZE`` so Apple's CDN serves the
+    image already scaled to the size that gets embedded.
 
     Args:
         artist: Artist name to search for.
@@ -257,14 +374,7 @@ def get_itunes_artwork(artist, album):
         Raw bytes of the artwork image, or None if not found.
     """
     try:
-        url = "https://itunes.apple.com/search"
-        params = {
-            "term": f"{artist} {album}",
-            "entity": "album",
-            "limit": 10,
-        }
-        r = requests.get(url, params=params, timeout=10)
-        data = r.json()
+        data = _itunes_album_search(artist, album)
         artist_lower = artist.lower()
         for result in data.get("results", []):
             result_artist = result.get("artistName", "").lower()
@@ -272,13 +382,14 @@ def get_itunes_artwork(artist, album):
                 artist_lower in result_artist
                 or result_artist in artist_lower
             ):
+                size = f"{ITUNES_ARTWORK_SIZE}x{ITUNES_ARTWORK_SIZE}"
                 artwork_url = (
                     result.get("artworkUrl100", "")
-                    .replace("100x100bb", "3000x3000bb")
-                    .replace("100x100", "3000x3000")
+                    .replace("100x100bb", f"{size}bb")
+                    .replace("100x100", size)
                 )
                 if artwork_url:
-                    return requests.get(artwork_url, timeout=15).content
+                    return _download_image(artwork_url)
     except Exception as e:
         logger.debug(f"iTunes artwork lookup failed: {e}")
     return None
@@ -300,16 +411,46 @@ def get_album_artwork(artist, album, lidarr_cover_url=""):
         return cover
     if lidarr_cover_url:
         try:
-            r = requests.get(lidarr_cover_url, timeout=15)
-            if r.status_code == 200 and r.content:
+            cover = _download_image(lidarr_cover_url)
+            if cover:
                 logger.debug("Using Lidarr cover URL as artwork fallback")
-                return r.content
+                return cover
         except Exception as e:
             logger.debug(f"Lidarr cover URL download failed: {e}")
     return None
 
 
-def tag_m4a(file_path, track_info, album_info, cover_data):
+def _download_image(url):
+    """Stream an image into memory, giving up past MAX_ARTWORK_BYTES.
+
+    A Content-Length over the limit is rejected before any of the body
+    is read; otherwise the limit is enforced while streaming.
+
+    Raises:
+        requests.HTTPError: If the server returns an error status.
+
+    Returns:
+        The image bytes, or None if the body is empty or too large.
+    """
+    with http_session.get(url, timeout=15, stream=True) as r:
+        r.raise_for_status()
+        try:
+            declared = int(r.headers.get("Content-Length") or 0)
+        except ValueError:
+            declared = 0
+        if declared > MAX_ARTWORK_BYTES:
+            logger.debug("Artwork at %s exceeds size limit", url)
+            return None
+        buf = bytearray()
+        for chunk in r.iter_content(ARTWORK_CHUNK_SIZE):
+            buf += chunk
+            if len(buf) > MAX_ARTWORK_BYTES:
+                logger.debug("Artwork at %s exceeds size limit", url)
+                return None
+    return bytes(buf) or None
+
+
+def tag_m4a(file_path, track_info, album_info, cover_data, album_fields=None):
     """Apply iTunes-style atom tags to an M4A file.
 
     Args:
@@ -317,23 +458,23 @@ def tag_m4a(file_path, track_info, album_info, cover_data):
         track_info: Dict with title, trackNumber, foreignRecordingId.
         album_info: Dict with title, artist, releaseDate.
         cover_data: Raw bytes of cover art image, or None.
+        album_fields: Precomputed album_tag_fields(album_info), or None.
 
     Returns:
         True on success, False on failure.
     """
     try:
+        fields = album_fields or album_tag_fields(album_info)
         audio = MP4(file_path)
         if audio.tags is None:
             audio.add_tags()
         tags = audio.tags
         tags["\u00a9nam"] = [track_info.get("title", "")]
-        artist = album_info.get("artist", {}).get("artistName", "")
-        tags["\u00a9ART"] = [artist]
-        tags["aART"] = [artist]
-        tags["\u00a9alb"] = [album_info.get("title", "")]
-        release_date = album_info.get("releaseDate", "")
-        if release_date:
-            tags["\u00a9day"] = [release_date[:4]]
+        tags["\u00a9ART"] = [fields["artist"]]
+        tags["aART"] = [fields["artist"]]
+        tags["\u00a9alb"] = [fields["album"]]
+        if fields["year"]:
+            tags["\u00a9day"] = [fields["year"]]
         try:
             track_num = int(track_info.get("trackNumber", 0))
             if track_num:
@@ -356,7 +497,7 @@ def tag_m4a(file_path, track_info, album_info, cover_data):
         return False
 
 
-def tag_opus(file_path, track_info, album_info, cover_data):
+def tag_opus(file_path, track_info, album_info, cover_data, album_fields=None):
     """Apply VorbisComment tags to an Opus file.
 
     Args:
@@ -364,20 +505,20 @@ def tag_opus(file_path, track_info, album_info, cover_data):
         track_info: Dict with title, trackNumber, foreignRecordingId.
         album_info: Dict with title, artist, releaseDate.
         cover_data: Raw bytes of cover art image, or None.
+        album_fields: Precomputed album_tag_fields(album_info), or None.
 
     Returns:
         True on success, False on failure.
     """
     try:
+        fields = album_fields or album_tag_fields(album_info)
         audio = OggOpus(file_path)
         audio["title"] = [track_info.get("title", "")]
-        artist = album_info.get("artist", {}).get("artistName", "")
-        audio["artist"] = [artist]
-        audio["albumartist"] = [artist]
-        audio["album"] = [album_info.get("title", "")]
-        release_date = album_info.get("releaseDate", "")
-        if release_date:
-            audio["date"] = [release_date[:4]]
+        audio["artist"] = [fields["artist"]]
+        audio["albumartist"] = [fields["artist"]]
+        audio["album"] = [fields["album"]]
+        if fields["year"]:
+            audio["date"] = [fields["year"]]
         try:
             track_num = int(track_info.get("trackNumber", 0))
             if track_num:
@@ -402,7 +543,7 @@ def tag_opus(file_path, track_info, album_info, cover_data):
         return False
 
 
-def tag_audio(file_path, track_info, album_info, cover_data):
+def tag_audio(file_path, track_info, album_info, cover_data, album_fields=None):
     """Dispatch audio tagging based on file extension.
 
     Routes to tag_mp3, tag_m4a, or tag_opus depending on the file's
@@ -413,17 +554,19 @@ def tag_audio(file_path, track_info, album_info, cover_data):
         track_info: Dict with track metadata.
         album_info: Dict with album metadata.
         cover_data: Raw bytes of cover art image, or None.
+        album_fields: Precomputed album_tag_fields(album_info), or None.
 
     Returns:
         True on success, False on failure or unsupported format.
     """
     ext = os.path.splitext(file_path)[1].lower()
+    args = (file_path, track_info, album_info, cover_data, album_fields)
     if ext == ".mp3":
-        return tag_mp3(file_path, track_info, album_info, cover_data)
+        return tag_mp3(*args)
     if ext == ".m4a":
-        return tag_m4a(file_path, track_info, album_info, cover_data)
+        return tag_m4a(*args)
     if ext == ".opus":
-        return tag_opus(file_path, track_info, album_info, cover_data)
+        return tag_opus(*args)
     logger.warning(
         "Tagging skipped — unsupported format: %s (%s)",
         ext or "unknown", file_path,
@@ -312,32 +312,75 @@ def mark_track_deleted(track_id):
 # --- Logs ---
 
 
-def add_log(
-    log_type, album_id, album_title, artist_name,
+def _log_row(
+    ts, log_type, album_id, album_title, artist_name,
     details="", total_file_size=0, track_number=None,
-    track_title="", track_download_id=None,
+    track_title="", track_download_id=None, seq=None,
 ):
-    """Create a download log entry. Returns the generated log ID."""
-    conn = db.get_db()
-    ts = int(time.time() * 1000)
+    log_id = f"{int(ts * 1000)}_{album_id}"
     if track_number is not None:
-        log_id = f"{ts}_{album_id}_{track_number}"
-    else:
-        log_id = f"{ts}_{album_id}"
-    conn.execute(
-        """INSERT INTO download_logs
+        log_id += f"_{track_number}"
+    if seq is not None:
+        log_id += f"_{seq}"
+    return (
+        log_id, log_type, album_id, album_title, artist_name,
+        ts, details, total_file_size,
+        track_title, track_number, track_download_id,
+    )
+
+
+_INSERT_LOG = """INSERT INTO download_logs
            (id, type, album_id, album_title, artist_name, timestamp,
             details, total_file_size,
             track_title, track_number, track_download_id)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        (
-            log_id, log_type, album_id, album_title, artist_name,
-            time.time(), details, total_file_size,
-            track_title, track_number, track_download_id,
-        ),
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+
+def add_log(
+    log_type, album_id, album_title, artist_name,
+    details="", total_file_size=0, track_number=None,
+    track_title="", track_download_id=None, seq=None,
+):
+    """Create a download log entry. Returns the generated log ID.
+
+    seq, if given, is appended to the ID to tell apart entries logged
+    for the same album and track number within one millisecond.
+    """
+    conn = db.get_db()
+    row = _log_row(
+        time.time(), log_type, album_id, album_title, artist_name,
+        details, total_file_size, track_number,
+        track_title, track_download_id, seq,
     )
+    conn.execute(_INSERT_LOG, row)
     conn.commit()
-    return log_id
+    return row[0]
+
+
+def add_logs(entries):
+    """Create several log entries in one transaction.
+
+    Args:
+        entries: Iterable of dicts of add_log() keyword arguments.
+
+    Returns:
+        List of generated log IDs. The rows share one timestamp, so
+        each ID ends in its index in the batch to keep it unique (two
+        discs can share a track number). Nothing is written if any
+        insert fails; the error is re-raised.
+    """
+    ts = time.time()
+    rows = [
+        _log_row(ts, **entry, seq=i) for i, entry in enumerate(entries)
+    ]
+    conn = db.get_db()
+    try:
+        conn.executemany(_INSERT_LOG, rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return [row[0] for row in rows]
 
 
 def get_logs(page=1, per_page=50, log_type=None):
@@ -434,6 +477,30 @@ def get_candidate_attempts(track_download_id):
     return [dict(row) for row in rows]
 
 
+def get_candidate_attempts_for_downloads(track_download_ids):
+    """Return candidate attempts for many track downloads in one query.
+
+    Returns:
+        Dict mapping each requested track_download_id to its attempts,
+        oldest first. IDs without attempts map to an empty list.
+    """
+    ids = list(dict.fromkeys(track_download_ids))
+    result = {td_id: [] for td_id in ids}
+    if not ids:
+        return result
+    conn = db.get_db()
+    placeholders = ",".join("?" * len(ids))
+    rows = conn.execute(
+        "SELECT * FROM candidate_attempts"
+        f" WHERE track_download_id IN ({placeholders})"
+        " ORDER BY timestamp ASC",
+        ids,
+    ).fetchall()
+    for row in rows:
+        result[row["track_download_id"]].append(dict(row))
+    return result
+
+
 def get_banned_urls_for_album(album_id):
     """Return list of {id, youtube_url} dicts for all banned URLs in an album."""
     conn = db.get_db()
@@ -467,14 +534,52 @@ def enqueue_album(album_id):
     return True
 
 
+def enqueue_albums(album_ids):
+    """Append several albums to the queue in one transaction.
+
+    Albums already queued (or repeated in ``album_ids``) are skipped.
+
+    Returns:
+        The number of albums added.
+    """
+    conn = db.get_db()
+    queued = {
+        row[0] for row in conn.execute(
+            "SELECT album_id FROM download_queue"
+        ).fetchall()
+    }
+    new_ids = [
+        album_id for album_id in dict.fromkeys(album_ids)
+        if album_id not in queued
+    ]
+    if not new_ids:
+        return 0
+    max_pos = conn.execute(
+        "SELECT COALESCE(MAX(position), 0) FROM download_queue"
+    ).fetchone()[0]
+    conn.executemany(
+        "INSERT INTO download_queue (album_id, position, status)"
+        " VALUES (?, ?, ?)",
+        [
+            (album_id, max_pos + i, QUEUE_STATUS_QUEUED)
+            for i, album_id in enumerate(new_ids, start=1)
+        ],
+    )
+    conn.commit()
+    return len(new_ids)
+
+
 def dequeue_album(album_id):
-    """Remove an album from the queue and reorder positions."""
+    """Remove an album from the queue.
+
+    Positions only need to sort correctly, so the gap left behind is
+    not renumbered; that would rewrite every remaining row.
+    """
     conn = db.get_db()
     conn.execute(
         "DELETE FROM download_queue WHERE album_id = ?", (album_id,)
     )
     conn.commit()
-    _reorder_queue(conn)
 
 
 def get_queue():
@@ -509,7 +614,6 @@ def pop_next_from_queue():
         "DELETE FROM download_queue WHERE album_id = ?", (album_id,)
     )
     conn.commit()
-    _reorder_queue(conn)
     return album_id
 
 
@@ -565,23 +669,12 @@ def reorder_queue(album_ids):
     reordered_set = set(reordered)
     tail = [aid for aid in existing if aid not in reordered_set]
     final_order = reordered + tail
-    for position, aid in enumerate(final_order, start=1):
-        conn.execute(
-            "UPDATE download_queue SET position = ? WHERE album_id = ?",
-            (position, aid),
-        )
+    conn.executemany(
+        "UPDATE download_queue SET position = ? WHERE album_id = ?",
+        [
+            (position, aid)
+            for position, aid in enumerate(final_order, start=1)
+        ],
+    )
     conn.commit()
     return final_order
-
-
-def _reorder_queue(conn):
-    """Renumber queue positions sequentially starting at 1."""
-    rows = conn.execute(
-        "SELECT id FROM download_queue ORDER BY position"
-    ).fetchall()
-    for i, row in enumerate(rows, 1):
-        conn.execute(
-            "UPDATE download_queue SET position = ? WHERE id = ?",
-            (i, row[0]),
-        )
-    conn.commit()
@@ -1,10 +1,13 @@
 """Telegram and Discord webhook notifications."""
 
+import atexit
 import logging
-
-import requests
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from config import load_config
+from utils import http_session
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +18,121 @@ logger = logging.getLogger(__name__)
 _MD2_SPECIALS = r"_*[]()~`>#+-=|{}.!"
 _TELEGRAM_CAPTION_LIMIT = 1024
 _TELEGRAM_TEXT_LIMIT = 4096
+NOTIFICATION_TIMEOUT = 10
+
+# Deliveries run on a single daemon thread so a slow Telegram or Discord
+# endpoint never holds up the download pipeline that raised the event.
+# Whatever piled up while a request was in flight is sent as one batch,
+# with consecutive plain Telegram messages merged into a single post.
+# Telegram and Discord posts in a batch go out side by side, each
+# channel keeping its own order.
+_delivery_queue = queue.SimpleQueue()
+_delivery_thread = None
+_delivery_lock = threading.Lock()
+_channel_pool = ThreadPoolExecutor(
+    max_workers=2, thread_name_prefix="notifications-channel",
+)
+
+
+def _delivery_worker():
+    while True:
+        batch = [_delivery_queue.get()]
+        while True:
+            try:
+                batch.append(_delivery_queue.get_nowait())
+            except queue.Empty:
+                break
+        _deliver_batch(_coalesce_telegram(batch))
+
+
+def _deliver_batch(calls):
+    """Run queued calls, overlapping the Telegram and Discord posts.
+
+    Anything else (such as a flush marker) runs once the posts that
+    were queued with it are done.
+    """
+    lanes = {_post_telegram: [], _post_discord: []}
+    rest = []
+    for func, args in calls:
+        lanes.get(func, rest).append((func, args))
+    busy = [lane for lane in lanes.values() if lane]
+    if len(busy) > 1:
+        futures = [_channel_pool.submit(_run_calls, lane) for lane in busy]
+        for future in futures:
+            future.result()
+    else:
+        for lane in busy:
+            _run_calls(lane)
+    _run_calls(rest)
+
+
+def _run_calls(calls):
+    for func, args in calls:
+        try:
+            func(*args)
+        except Exception:
+            logger.exception("Notification delivery crashed")
+
+
+def _coalesce_telegram(batch):
+    """Merge runs of compatible queued ``sendMessage`` posts into one.
+
+    Photos, differing chats, parse modes or silence flags, and merges
+    that would exceed Telegram's text limit are left as separate posts.
+    """
+    merged = []
+    for func, args in batch:
+        if (
+            merged
+            and func is _post_telegram
+            and merged[-1][0] is _post_telegram
+        ):
+            url, payload = args
+            prev_url, prev = merged[-1][1]
+            if (
+                url == prev_url
+                and "text" in payload and "text" in prev
+                and all(
+                    payload.get(k) == prev.get(k)
+                    for k in ("chat_id", "parse_mode", "disable_notification")
+                )
+            ):
+                text = prev["text"] + "\n\n" + payload["text"]
+                if len(text) <= _TELEGRAM_TEXT_LIMIT:
+                    merged[-1] = (func, (url, {**prev, "text": text}))
+                    continue
+        merged.append((func, args))
+    return merged
+
+
+def flush_notifications(timeout=NOTIFICATION_TIMEOUT):
+    """Wait up to ``timeout`` seconds for queued notifications to go out.
+
+    Returns:
+        True if the queue drained in time (or nothing was ever queued).
+    """
+    if _delivery_thread is None:
+        return True
+    drained = threading.Event()
+    _delivery_queue.put((drained.set, ()))
+    return drained.wait(timeout)
+
+
+def _enqueue(func, *args):
+    """Hand ``func(*args)`` to the background delivery thread."""
+    global _delivery_thread
+    if _delivery_thread is None:
+        with _delivery_lock:
+            if _delivery_thread is None:
+                _delivery_thread = threading.Thread(
+                    target=_delivery_worker,
+                    name="notifications", daemon=True,
+                )
+                _delivery_thread.start()
+                # The thread is a daemon; give it a moment to send
+                # pending messages before the process goes away.
+                atexit.register(flush_notifications)
+    _delivery_queue.put((func, args))
 
 
 def md2_escape(text):
@@ -68,9 +186,9 @@ def _truncate_caption(text, limit):
 
 def send_telegram(
     message, log_type=None, *, parse_mode=None,
-    photo_url=None, disable_notification=False,
+    photo_url=None, disable_notification=False, config=None,
 ):
-    """Send a message via Telegram bot API.
+    """Queue a message for delivery via the Telegram bot API.
 
     Args:
         message: Text body. When ``parse_mode`` is ``"MarkdownV2"`` the
@@ -84,8 +202,9 @@ def send_telegram(
             truncated to Telegram's 1024-char limit.
         disable_notification: If true, the message arrives silently
             (no sound / vibration on the recipient device).
+        config: Config dict to use instead of calling load_config().
     """
-    config = load_config()
+    config = config or load_config()
     if not (
         config.get("telegram_enabled")
         and config.get("telegram_bot_token")
@@ -98,31 +217,37 @@ def send_telegram(
         if log_type not in allowed_types:
             return
 
+    token = config["telegram_bot_token"]
+    chat_id = config["telegram_chat_id"]
+    if photo_url:
+        url = f"https://api.telegram.org/bot{token}/sendPhoto"
+        payload = {
+            "chat_id": chat_id,
+            "photo": photo_url,
+            "caption": _truncate_caption(
+                message, _TELEGRAM_CAPTION_LIMIT,
+            ),
+            "disable_notification": disable_notification,
+        }
+    else:
+        url = f"https://api.telegram.org/bot{token}/sendMessage"
+        payload = {
+            "chat_id": chat_id,
+            "text": _truncate_caption(
+                message, _TELEGRAM_TEXT_LIMIT,
+            ),
+            "disable_notification": disable_notification,
+        }
+    if parse_mode:
+        payload["parse_mode"] = parse_mode
+    _enqueue(_post_telegram, url, payload)
+
+
+def _post_telegram(url, payload):
     try:
-        token = config["telegram_bot_token"]
-        chat_id = config["telegram_chat_id"]
-        if photo_url:
-            url = f"https://api.telegram.org/bot{token}/sendPhoto"
-            payload = {
-                "chat_id": chat_id,
-                "photo": photo_url,
-                "caption": _truncate_caption(
-                    message, _TELEGRAM_CAPTION_LIMIT,
-                ),
-                "disable_notification": disable_notification,
-            }
-        else:
-            url = f"https://api.telegram.org/bot{token}/sendMessage"
-            payload = {
-                "chat_id": chat_id,
-                "text": _truncate_caption(
-                    message, _TELEGRAM_TEXT_LIMIT,
-                ),
-                "disable_notification": disable_notification,
-            }
-        if parse_mode:
-            payload["parse_mode"] = parse_mode
-        response = requests.post(url, json=payload, timeout=10)
+        response = http_session.post(
+            url, json=payload, timeout=NOTIFICATION_TIMEOUT,
+        )
         if response.status_code != 200:
             logger.warning(
                 "Telegram API returned %d: %s",
@@ -132,8 +257,8 @@ def send_telegram(
         logger.warning(f"Telegram notification failed: {e}")
 
 
-def send_discord(message, log_type=None, embed_data=None):
-    """Send a message or embed via Discord webhook.
+def send_discord(message, log_type=None, embed_data=None, *, config=None):
+    """Queue a message or embed for delivery via Discord webhook.
 
     Args:
         message: Fallback text content.
@@ -141,8 +266,9 @@ def send_discord(message, log_type=None, embed_data=None):
             configured discord_log_types list.
         embed_data: Optional dict with title, description, color,
             thumbnail, and fields for a Discord embed.
+        config: Config dict to use instead of calling load_config().
     """
-    config = load_config()
+    config = config or load_config()
     if not config.get("discord_enabled"):
         return
     webhook_url = config.get("discord_webhook_url", "")
@@ -152,24 +278,30 @@ def send_discord(message, log_type=None, embed_data=None):
         allowed_types = config.get("discord_log_types", [])
         if log_type not in allowed_types:
             return
+    payload = {}
+    if embed_data:
+        embed = {
+            "title": embed_data.get("title", ""),
+            "description": embed_data.get("description", ""),
+            "color": embed_data.get("color", 0x10B981),
+        }
+        if embed_data.get("thumbnail"):
+            embed["thumbnail"] = {"url": embed_data["thumbnail"]}
+        if embed_data.get("fields"):
+            embed["fields"] = embed_data["fields"]
+        if embed_data.get("url"):
+            embed["url"] = embed_data["url"]
+        payload["embeds"] = [embed]
+    else:
+        payload["content"] = message
+    _enqueue(_post_discord, webhook_url, payload)
+
+
+def _post_discord(webhook_url, payload):
     try:
-        payload = {}
-        if embed_data:
-            embed = {
-                "title": embed_data.get("title", ""),
-                "description": embed_data.get("description", ""),
-                "color": embed_data.get("color", 0x10B981),
-            }
-            if embed_data.get("thumbnail"):
-                embed["thumbnail"] = {"url": embed_data["thumbnail"]}
-            if embed_data.get("fields"):
-                embed["fields"] = embed_data["fields"]
-            if embed_data.get("url"):
-                embed["url"] = embed_data["url"]
-            payload["embeds"] = [embed]
-        else:
-            payload["content"] = message
-        response = requests.post(webhook_url, json=payload, timeout=10)
+        response = http_session.post(
+            webhook_url, json=payload, timeout=NOTIFICATION_TIMEOUT,
+        )
         if response.status_code >= 300:
             logger.warning(
                 "Discord webhook returned %d: %s",
@@ -204,11 +336,15 @@ def send_notifications(
             when set by the caller.
         disable_notification: Telegram-only silent delivery flag.
     """
+    config = load_config()
     send_telegram(
         telegram_message if telegram_message is not None else message,
         log_type=log_type,
         parse_mode=telegram_parse_mode,
         photo_url=photo_url,
         disable_notification=disable_notification,
+        config=config,
+    )
+    send_discord(
+        message, log_type=log_type, embed_data=embed_data, config=config,
     )
-    send_discord(message, log_type=log_type, embed_data=embed_data)
@@ -5,13 +5,20 @@ downloads (search, download, tag, import to Lidarr), and processes
 the download queue.
 """
 
-import copy
+import errno
 import logging
 import os
 import shutil
+import sqlite3
 import threading
 import time
 import uuid
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
 
 import models
 from config import load_config
@@ -19,12 +26,20 @@ from models import CandidateOutcome
 from downloader import (
     build_ydl_audio_opts,
     download_youtube_candidate,
+    new_search_ydl,
     resolve_actual_file,
     search_youtube_candidates,
 )
 from fingerprint import fingerprint_track, verify_fingerprint
-from lidarr import get_valid_release_id, lidarr_request
+from lidarr import (
+    get_album_cover_url,
+    get_valid_release_id,
+    invalidate_missing_albums,
+    lidarr_get_many,
+    lidarr_request,
+)
 from metadata import (
+    album_tag_fields,
     create_xml_metadata,
     get_album_artwork,
     get_itunes_tracks,
@@ -54,6 +69,35 @@ download_process = {
 }
 
 queue_lock = threading.Lock()
+# Notified under queue_lock whenever the download slot is released, so
+# callers that must wait for it block instead of polling.
+_slot_released = threading.Condition(queue_lock)
+# While set (see freeze_download_slot), no new download may claim the slot.
+_slot_frozen = False
+
+# Set whenever an album is queued or the download slot frees up, so the
+# queue processor starts the next album at once instead of polling. The
+# timeout is only a safety net for wakeups nobody signalled.
+QUEUE_POLL_INTERVAL = 30
+_queue_wake = threading.Event()
+
+MAX_CONCURRENT_TRACKS = 5
+TRACK_STOP_POLL_INTERVAL = 1
+COVER_FETCH_TIMEOUT = 60
+# Cross-device transfers into LIDARR_PATH are copies; a few in flight
+# keep network mounts and NVMe queues busy. Renames finish immediately.
+LIDARR_TRANSFER_WORKERS = 4
+# Buffer for cross-device copies on platforms without os.sendfile, where
+# shutil would otherwise loop over 64 KiB reads.
+LIDARR_COPY_BUFSIZE = 1024 * 1024
+
+# Album artwork is fetched off the album thread so the iTunes search and
+# multi-MB image download overlap the first track's YouTube search.
+_artwork_executor = ThreadPoolExecutor(
+    max_workers=2, thread_name_prefix="artwork",
+)
+# Serializes the wait on a pending artwork Future in _album_cover.
+_album_cover_lock = threading.Lock()
 
 
 def _new_verify_stats():
@@ -157,13 +201,13 @@ def _make_progress_hook(idx):
         if d["status"] == "downloading":
             if 0 <= idx < len(download_process["tracks"]):
                 track = download_process["tracks"][idx]
-                track["status"] = "downloading"
-                track["progress_percent"] = (
-                    d.get("_percent_str", "0%").strip()
-                )
-                track["progress_speed"] = (
-                    d.get("_speed_str", "N/A").strip()
-                )
+                # One update() so a concurrent status snapshot never sees
+                # a new percentage next to the previous speed.
+                track.update({
+                    "status": "downloading",
+                    "progress_percent": d.get("_percent_str", "0%").strip(),
+                    "progress_speed": d.get("_speed_str", "N/A").strip(),
+                })
                 if track.get("skip"):
                     logger.debug(
                         "Skip flag detected for track %d: %s",
@@ -175,11 +219,18 @@ def _make_progress_hook(idx):
 
 
 def get_download_status():
-    """Return a snapshot of the current download process state."""
+    """Return a snapshot of the current download process state.
+
+    Track entries hold only scalars, so copying each dict is enough
+    to detach the snapshot; a deepcopy under queue_lock would make
+    every status poll hold up the download threads for longer.
+    """
     with queue_lock:
         snapshot = dict(download_process)
-        snapshot["tracks"] = copy.deepcopy(download_process["tracks"])
-        return snapshot
+        snapshot["tracks"] = [
+            dict(track) for track in download_process["tracks"]
+        ]
+    return snapshot
 
 
 def stop_download():
@@ -194,6 +245,120 @@ def stop_download():
         models.clear_queue()
 
 
+# Fields reset when the slot is released. Applied with one update() so
+# the critical section is a single dict merge and readers never observe
+# a half-reset state.
+_IDLE_SLOT_STATE = {
+    "active": False,
+    "tracks": [],
+    "current_track_index": -1,
+    "album_id": None,
+    "album_title": "",
+    "artist_name": "",
+    "cover_url": "",
+}
+
+
+def _start_download_locked(album_id, **state):
+    """Mark the download slot active for album_id. Caller holds queue_lock."""
+    started = dict(
+        _IDLE_SLOT_STATE,
+        active=True,
+        stop=False,
+        result_success=True,
+        result_partial=False,
+        tracks=[],
+        album_id=album_id,
+    )
+    started.update(state)
+    download_process.update(started)
+
+
+def claim_download_slot(album_id, timeout=0, **state):
+    """Atomically take the single download slot for album_id.
+
+    The check and the claim happen under one queue_lock acquisition, so
+    two callers can never both see the slot as free.
+
+    Args:
+        album_id: Lidarr album ID the slot is claimed for.
+        timeout: Seconds to wait for an active download to release the
+            slot. The default of 0 fails immediately when busy.
+        **state: Extra download_process fields to set with the claim.
+
+    Returns:
+        True if the slot was claimed, False if it stayed busy.
+    """
+    with _slot_released:
+        if not _slot_released.wait_for(
+            lambda: not download_process["active"] and not _slot_frozen,
+            timeout,
+        ):
+            return False
+        _start_download_locked(album_id, **state)
+        return True
+
+
+def release_download_slot():
+    """Mark the download slot free and wake everyone waiting for it."""
+    idle = dict(_IDLE_SLOT_STATE, tracks=[])
+    with _slot_released:
+        download_process.update(idle)
+        _slot_released.notify_all()
+    wake_queue_processor()
+
+
+def freeze_download_slot(timeout=0):
+    """Stop new downloads from starting, ahead of a process restart.
+
+    New claims are refused from the moment this is called, so neither
+    the queue processor nor a manual download can start an album while
+    an active one is waited for.
+
+    Args:
+        timeout: Seconds to wait for an active download to finish.
+            None waits as long as it takes; the default of 0 fails
+            immediately when busy.
+
+    Returns:
+        True if the slot is idle and stays frozen. False if a download
+        was still active at the timeout; the freeze is lifted then.
+    """
+    global _slot_frozen
+    with _slot_released:
+        _slot_frozen = True
+        if _slot_released.wait_for(
+            lambda: not download_process["active"], timeout,
+        ):
+            return True
+    unfreeze_download_slot()
+    return False
+
+
+def unfreeze_download_slot():
+    """Let downloads claim the slot again after freeze_download_slot()."""
+    global _slot_frozen
+    with _slot_released:
+        _slot_frozen = False
+        _slot_released.notify_all()
+    wake_queue_processor()
+
+
+def _claim_next_queued_album():
+    """Pop the next queued album and claim the slot for it atomically.
+
+    Returns:
+        The claimed album ID, or None if busy or the queue is empty.
+    """
+    with queue_lock:
+        if download_process["active"] or _slot_frozen:
+            return None
+        album_id = models.pop_next_from_queue()
+        if album_id is not None:
+            _start_download_locked(album_id)
+        return album_id
+
+
 def process_album_download(album_id, force=False):
     """Download all tracks for an album and import into Lidarr.
 
@@ -204,20 +369,13 @@ def process_album_download(album_id, force=False):
     Returns:
         Dict with "success", "error", or "stopped" key.
     """
-    with queue_lock:
-        if download_process["active"]:
-            return {"error": "Busy"}
-        download_process["active"] = True
-        download_process["stop"] = False
-        download_process["result_success"] = True
-        download_process["result_partial"] = False
-        download_process["tracks"] = []
-        download_process["current_track_index"] = -1
-        download_process["album_id"] = album_id
-        download_process["album_title"] = ""
-        download_process["artist_name"] = ""
-        download_process["cover_url"] = ""
+    if not claim_download_slot(album_id):
+        return {"error": "Busy"}
+    return _run_album_download(album_id, force)
 
+
+def _run_album_download(album_id, force):
+    """Body of process_album_download; the caller has claimed the slot."""
     failed_tracks = []
     album = {}
     album_title = ""
@@ -229,7 +387,10 @@ def process_album_download(album_id, force=False):
     album_mbid = ""
 
     try:
-        album = lidarr_request(f"album/{album_id}")
+        # The album resource rarely embeds tracks, so fetch both at once.
+        album, tracks_res = lidarr_get_many(
+            [f"album/{album_id}", f"track?albumId={album_id}"],
+        )
         if "error" in album:
             logger.error(
                 f"Error fetching album {album_id}: {album['error']}"
@@ -242,28 +403,6 @@ def process_album_download(album_id, force=False):
             f" - {album.get('artist', {}).get('artistName', 'Unknown')}"
         )
 
-        tracks = album.get("tracks", [])
-        if not tracks:
-            tracks_res = lidarr_request(f"track?albumId={album_id}")
-            if isinstance(tracks_res, dict) and "error" in tracks_res:
-                logger.warning(
-                    "Lidarr track fetch for album %s failed: %s",
-                    album_id, tracks_res["error"],
-                )
-            elif isinstance(tracks_res, list) and len(tracks_res) > 0:
-                tracks = tracks_res
-
-        if not tracks:
-            logger.info(
-                "No tracks from Lidarr for album %s, using iTunes fallback",
-                album_id,
-            )
-            tracks = get_itunes_tracks(
-                album["artist"]["artistName"], album["title"]
-            )
-
-        album["tracks"] = tracks
-
         artist_name = album["artist"]["artistName"]
         artist_id = album["artist"]["id"]
         artist_mbid = album["artist"].get("foreignArtistId", "")
@@ -273,14 +412,7 @@ def process_album_download(album_id, force=False):
 
         download_process["album_title"] = album_title
         download_process["artist_name"] = artist_name
-        download_process["cover_url"] = next(
-            (
-                img["remoteUrl"]
-                for img in album.get("images", [])
-                if img.get("coverType") == "cover"
-            ),
-            "",
-        )
+        download_process["cover_url"] = get_album_cover_url(album)
 
         release_id = get_valid_release_id(album)
         if release_id == 0:
@@ -301,17 +433,36 @@ def process_album_download(album_id, force=False):
         album_path = os.path.join(artist_path, album_folder_name)
         os.makedirs(album_path, exist_ok=True)
 
-        # Fetch cover art before sending the download_started
-        # notification so the artwork can render in Telegram (sendPhoto)
-        # and Discord (embed thumbnail). iTunes is tried first; if it
-        # can't find a matching artist, fall back to Lidarr's own URL.
+        # Start fetching cover art (iTunes first, then Lidarr's own URL)
+        # in the background; tracks resolve it when they are tagged. The
+        # notifications below only need Lidarr's cover URL.
         cover_url = download_process.get("cover_url", "")
-        cover_data = get_album_artwork(
-            artist_name, album_title, cover_url,
-        )
-        if cover_data:
-            with open(os.path.join(album_path, "cover.jpg"), "wb") as f:
-                f.write(cover_data)
+        cover_data = _load_album_cover(album_path)
+        if cover_data is None:
+            cover_data = _artwork_executor.submit(
+                get_album_artwork, artist_name, album_title, cover_url,
+            )
+
+        # Resolved after the artwork fetch has started, so an iTunes
+        # track lookup overlaps with the cover download.
+        tracks = album.get("tracks", [])
+        if not tracks:
+            if isinstance(tracks_res, dict) and "error" in tracks_res:
+                logger.warning(
+                    "Lidarr track fetch for album %s failed: %s",
+                    album_id, tracks_res["error"],
+                )
+            elif isinstance(tracks_res, list) and len(tracks_res) > 0:
+                tracks = tracks_res
+
+        if not tracks:
+            logger.info(
+                "No tracks from Lidarr for album %s, using iTunes fallback",
+                album_id,
+            )
+            tracks = get_itunes_tracks(artist_name, album_title)
+
+        album["tracks"] = tracks
 
         models.add_log(
             log_type="download_started",
@@ -361,11 +512,12 @@ def process_album_download(album_id, force=False):
             "cover_data": cover_data,
             "cover_url": download_process.get("cover_url", ""),
             "lidarr_album_path": lidarr_album_path,
+            "tag_fields": album_tag_fields(album),
         }
         download_process["tracks"] = [
             {
                 "track_title": t["title"],
-                "track_number": int(t.get("trackNumber", i + 1)),
+                "track_number": _track_number(t, i + 1),
                 "status": "pending",
                 "youtube_url": "",
                 "youtube_title": "",
@@ -382,8 +534,15 @@ def process_album_download(album_id, force=False):
         ) = _download_tracks(
             tracks_to_download, album_path, album, album_ctx,
         )
+        # Written here rather than by the fetch itself, so a fetch that
+        # outlives COVER_FETCH_TIMEOUT can't drop cover.jpg into a
+        # folder that has since been moved or removed.
+        _save_album_cover(album_path, _album_cover(album_ctx))
 
-        set_permissions(artist_path)
+        # Only this album's files are new; the rest of the artist tree
+        # was fixed up when its own albums were downloaded.
+        set_permissions(album_path)
+        set_permissions(artist_path, recursive=False)
 
         result = _handle_post_download(
             failed_tracks, succeeded_tracks,
@@ -421,13 +580,17 @@ def process_album_download(album_id, force=False):
             data={"name": "RefreshArtist", "artistId": artist_id},
         )
 
-        if lidarr_path and os.path.exists(artist_path):
+        # After a failed transfer the download folder may still hold
+        # files that never reached Lidarr, so it is left in place.
+        if import_path != album_path:
             try:
                 logger.info(
                     f"Cleaning up download folder: {artist_path}"
                 )
                 shutil.rmtree(artist_path)
                 logger.info("Download folder cleaned up successfully")
+            except FileNotFoundError:
+                pass
             except Exception as e:
                 logger.warning(
                     f"Failed to cleanup download folder: {e}"
@@ -461,14 +624,54 @@ def process_album_download(album_id, force=False):
         download_process["result_success"] = False
         return {"error": str(e)}
     finally:
-        with queue_lock:
-            download_process["active"] = False
-            download_process["tracks"] = []
-            download_process["current_track_index"] = -1
-            download_process["album_id"] = None
-            download_process["album_title"] = ""
-            download_process["artist_name"] = ""
-            download_process["cover_url"] = ""
+        # Imported tracks change Lidarr's missing counts.
+        invalidate_missing_albums()
+        release_download_slot()
+
+
+def _load_album_cover(album_path):
+    """Return the cover.jpg a previous attempt left in album_path.
+
+    Retrying an album's failed tracks reuses it instead of fetching
+    the artwork again. Returns None if there is none.
+    """
+    try:
+        with open(os.path.join(album_path, "cover.jpg"), "rb") as f:
+            return f.read() or None
+    except OSError:
+        return None
+
+
+def _save_album_cover(album_path, cover_data):
+    """Write the album's artwork to album_path as cover.jpg, if any."""
+    if not cover_data:
+        return
+    try:
+        with open(os.path.join(album_path, "cover.jpg"), "wb") as f:
+            f.write(cover_data)
+    except OSError as e:
+        logger.warning("Failed to write cover.jpg: %s", e)
+
+
+def _album_cover(album_ctx):
+    """Return the album's cover bytes, waiting for a pending fetch.
+
+    album_ctx["cover_data"] holds either the bytes (or None) or the
+    Future of a background get_album_artwork() call. The first caller
+    to wait stores the outcome back, so a slow or failed fetch costs
+    one COVER_FETCH_TIMEOUT per album rather than one per track.
+    """
+    with _album_cover_lock:
+        cover = album_ctx.get("cover_data")
+        if not isinstance(cover, Future):
+            return cover
+        try:
+            cover = cover.result(timeout=COVER_FETCH_TIMEOUT)
+        except Exception as e:
+            logger.warning("Album artwork fetch failed: %s", e)
+            cover = None
+        album_ctx["cover_data"] = cover
+        return cover
 
 
 def _filter_tracks(tracks, force, album_path):
@@ -477,24 +680,26 @@ def _filter_tracks(tracks, force, album_path):
     Skips tracks whose final file already exists on disk, regardless of
     configured audio format — once a track has been accepted in any
     supported format we don't want to re-download it just because the
-    user later changed the setting.
+    user later changed the setting. The album directory is listed once
+    rather than stat'ing every candidate name, which matters on network
+    mounts.
     """
+    existing = set()
+    if not force:
+        try:
+            with os.scandir(album_path) as entries:
+                existing = {entry.name for entry in entries}
+        except OSError:
+            pass
     tracks_to_download = []
     for t in tracks:
         if not force:
             if t.get("hasFile", False):
                 continue
-            try:
-                track_num = int(t.get("trackNumber", 0))
-            except (ValueError, TypeError):
-                track_num = 0
-            track_title = t["title"]
-            sanitized_track = sanitize_filename(track_title)
-            base = os.path.join(
-                album_path, f"{track_num:02d} - {sanitized_track}"
-            )
+            track_num = _track_number(t, 0)
+            base = f"{track_num:02d} - {sanitize_filename(t['title'])}"
             if any(
-                os.path.exists(base + ext)
+                base + ext in existing
                 for ext in (".mp3", ".m4a", ".opus")
             ):
                 continue
@@ -502,6 +707,14 @@ def _filter_tracks(tracks, force, album_path):
     return tracks_to_download
 
 
+def _track_number(track, default):
+    """Return the track's integer number, or ``default`` if unusable."""
+    try:
+        return int(track.get("trackNumber", default))
+    except (ValueError, TypeError):
+        return default
+
+
 def _cleanup_temp_files(temp_file):
     """Remove temp download files for all common extensions."""
     for ext in [".mp3", ".webm", ".m4a", ".opus", ".part", ""]:
@@ -517,6 +730,7 @@ def _cleanup_temp_files(temp_file):
 
 def _download_candidate_threaded(
     candidate, attempt_temp, progress_hook, skip_check, track_state,
+    config=None,
 ):
     """Download a candidate in a background thread with skip support.
 
@@ -532,6 +746,7 @@ def _download_candidate_threaded(
                 cand, tmp,
                 progress_hook=progress_hook,
                 skip_check=skip_check,
+                config=config,
             )
         except TrackSkippedException:
             dl_error_box[0] = "skipped"
@@ -618,15 +833,14 @@ def _build_candidate_attempt(
 def _accept_track_file(
     src_file, track_num, sanitized_track, dl_result, fp_data,
     *, track_state, track_title, album_path, album_ctx,
-    candidate_attempts=None,
+    candidate_attempts=None, xml_metadata=True,
 ):
     """Accept a downloaded file: XML metadata, move, record in DB.
 
     Returns:
         Tuple of (file_size_bytes, track_download_id or None).
     """
-    cfg = load_config()
-    if cfg.get("xml_metadata_enabled", True):
+    if xml_metadata:
         logger.info("Creating XML metadata file...")
         create_xml_metadata(
             album_path, album_ctx["artist_name"],
@@ -643,7 +857,9 @@ def _accept_track_file(
         file_size = os.path.getsize(src_file)
     except OSError:
         file_size = 0
-    shutil.move(src_file, final_file)
+    # The temp file lives in album_path, so this is a same-directory
+    # rename: one atomic syscall, no shutil fallback logic.
+    os.replace(src_file, final_file)
     track_state["status"] = "done"
 
     try:
@@ -755,6 +971,21 @@ def _record_track_failure(
                 break
 
 
+def _track_worker_count(config, track_count):
+    """Number of track download workers for an album.
+
+    Clamps ``concurrent_tracks`` (which may arrive as a string from a
+    hand-edited config file) to 1..MAX_CONCURRENT_TRACKS and never
+    starts more workers than there are tracks.
+    """
+    try:
+        wanted = int(config.get("concurrent_tracks", 2))
+    except (TypeError, ValueError):
+        wanted = 2
+    wanted = max(1, min(MAX_CONCURRENT_TRACKS, wanted))
+    return max(1, min(wanted, track_count))
+
+
 def _download_tracks(
     tracks_to_download, album_path, album, album_ctx,
 ):
@@ -769,17 +1000,15 @@ def _download_tracks(
         album: Full album data dict from Lidarr.
         album_ctx: Dict with keys: artist_name, album_title, album_id,
             album_mbid, artist_mbid, cover_data, cover_url,
-            lidarr_album_path.
+            lidarr_album_path. cover_data may be a Future (see
+            _album_cover).
 
     Returns:
         Tuple of (failed_tracks list, total_downloaded_size int).
     """
-    from concurrent.futures import ThreadPoolExecutor, as_completed
-
     artist_name = album_ctx["artist_name"]
     album_title = album_ctx["album_title"]
     album_id = album_ctx["album_id"]
-    cover_data = album_ctx["cover_data"]
 
     failed_tracks = []
     succeeded_tracks = []
@@ -787,10 +1016,33 @@ def _download_tracks(
     verify_stats = _new_verify_stats()
     _results_lock = threading.Lock()
 
+    # Read once per album: settings saved mid-album apply from the next
+    # album on, instead of every track re-reading the config.
     config = load_config()
-    concurrent_tracks = max(
-        1, min(5, config.get("concurrent_tracks", 2)),
+    concurrent_tracks = _track_worker_count(
+        config, len(tracks_to_download),
     )
+    xml_metadata = config.get("xml_metadata_enabled", True)
+    # load_config() already validates and clamps min_match_score; this
+    # just guards against tests/callers that bypass it.
+    try:
+        min_match_score = float(config.get("min_match_score", 0.8))
+    except (TypeError, ValueError):
+        min_match_score = 0.8
+
+    # Each worker thread keeps one search YoutubeDL for the whole album;
+    # instances are not thread-safe, so they are never shared.
+    search_ydls = []
+    _worker_local = threading.local()
+
+    def _worker_search_ydl():
+        ydl = getattr(_worker_local, "search_ydl", None)
+        if ydl is None:
+            ydl = new_search_ydl(config)
+            _worker_local.search_ydl = ydl
+            with _results_lock:
+                search_ydls.append(ydl)
+        return ydl
 
     def _process_single_track(idx, track):
         nonlocal total_downloaded_size
@@ -798,10 +1050,8 @@ def _download_tracks(
         track_state = download_process["tracks"][idx]
         download_process["current_track_index"] = idx
         track_title = track.get("title", f"Track {idx + 1}")
-        try:
-            track_num = int(track.get("trackNumber", idx + 1))
-        except (ValueError, TypeError):
-            track_num = idx + 1
+        # Parsed once when the album's track states were built.
+        track_num = track_state["track_number"]
         track_duration_ms = track.get("duration")
         expected_recording_id = track.get("foreignRecordingId")
         sanitized_track = sanitize_filename(track_title)
@@ -835,6 +1085,7 @@ def _download_tracks(
             f"{artist_name} {track_title} official audio",
             track_title, track_duration_ms,
             skip_check=_skip_check, banned_urls=banned_url_set,
+            search_ydl=_worker_search_ydl(), config=config,
         )
 
         if not candidates:
@@ -851,24 +1102,17 @@ def _download_tracks(
             )
             return
 
-        cfg_loop = load_config()
-        # load_config() already validates and clamps min_match_score; this
-        # just guards against tests/callers that bypass it.
-        try:
-            min_match_score = float(cfg_loop.get("min_match_score", 0.8))
-        except (TypeError, ValueError):
-            min_match_score = 0.8
         will_verify = bool(
-            cfg_loop.get("acoustid_enabled", True)
-            and cfg_loop.get("acoustid_api_key", "")
+            config.get("acoustid_enabled", True)
+            and config.get("acoustid_api_key", "")
             and expected_recording_id
         )
         # Reason verification is unavailable, used in rejection messages so
         # users can tell why the score gate is being enforced.
         if not will_verify:
-            if not cfg_loop.get("acoustid_enabled", True):
+            if not config.get("acoustid_enabled", True):
                 no_verify_reason = "AcoustID disabled"
-            elif not cfg_loop.get("acoustid_api_key", ""):
+            elif not config.get("acoustid_api_key", ""):
                 no_verify_reason = "AcoustID API key not set"
             elif not expected_recording_id:
                 no_verify_reason = "no MusicBrainz recording id"
@@ -921,7 +1165,7 @@ def _download_tracks(
 
             dl_out = _download_candidate_threaded(
                 candidate, attempt_temp, progress_hook,
-                _skip_check, track_state,
+                _skip_check, track_state, config=config,
             )
             if dl_out is None:
                 candidate_attempts_buf.append(
@@ -947,23 +1191,19 @@ def _download_tracks(
             track_state["youtube_title"] = dl_result.get(
                 "youtube_title", "",
             )
-            tag_audio(actual_file, track, album, cover_data)
-
-            cfg = load_config()
-            should_verify = (
-                cfg.get("acoustid_enabled", True)
-                and cfg.get("acoustid_api_key", "")
-                and expected_recording_id
+            tag_audio(
+                actual_file, track, album, _album_cover(album_ctx),
+                album_ctx.get("tag_fields"),
             )
 
             fp_data = {}
 
-            if should_verify:
+            if will_verify:
                 track_state["status"] = "verifying"
                 vresult = verify_fingerprint(
                     actual_file,
                     expected_recording_id,
-                    cfg["acoustid_api_key"],
+                    config["acoustid_api_key"],
                 )
 
                 if vresult is None:
@@ -1068,8 +1308,8 @@ def _download_tracks(
                     _cleanup_temp_files(attempt_temp)
                     continue
             else:
-                if cfg.get("acoustid_enabled", True):
-                    api_key = cfg.get("acoustid_api_key", "")
+                if config.get("acoustid_enabled", True):
+                    api_key = config.get("acoustid_api_key", "")
                     if api_key:
                         track_state["status"] = "fingerprinting"
                         fp_result = fingerprint_track(
@@ -1094,6 +1334,7 @@ def _download_tracks(
                 album_path=album_path,
                 album_ctx=album_ctx,
                 candidate_attempts=candidate_attempts_buf,
+                xml_metadata=xml_metadata,
             )
             with _results_lock:
                 total_downloaded_size += file_size
@@ -1153,6 +1394,7 @@ def _download_tracks(
                     best_unverified_candidate, fallback_temp,
                     progress_hook=progress_hook,
                     skip_check=_skip_check,
+                    config=config,
                 )
                 if fb_result.get("skipped"):
                     _cleanup_temp_files(fallback_temp)
@@ -1179,7 +1421,10 @@ def _download_tracks(
                     track_state["youtube_title"] = fb_result.get(
                         "youtube_title", "",
                     )
-                    tag_audio(fb_file, track, album, cover_data)
+                    tag_audio(
+                        fb_file, track, album, _album_cover(album_ctx),
+                        album_ctx.get("tag_fields"),
+                    )
                     file_size, td_id = _accept_track_file(
                         fb_file, track_num, sanitized_track,
                         fb_result, {},
@@ -1190,6 +1435,7 @@ def _download_tracks(
                         candidate_attempts=(
                             candidate_attempts_buf
                         ),
+                        xml_metadata=xml_metadata,
                     )
                     with _results_lock:
                         total_downloaded_size += file_size
@@ -1261,20 +1507,39 @@ def _download_tracks(
                 candidate_attempts=candidate_attempts_buf,
             )
 
-    with ThreadPoolExecutor(max_workers=concurrent_tracks) as executor:
-        futures = {
-            executor.submit(_process_single_track, idx, track): idx
-            for idx, track in enumerate(tracks_to_download)
-        }
-        for future in as_completed(futures):
-            if download_process["stop"]:
-                executor.shutdown(wait=False, cancel_futures=True)
-                logger.warning("Download stopped by user")
-                break
-            try:
-                future.result()
-            except Exception as e:
-                logger.warning("Track worker exception: %s", e)
+    try:
+        with ThreadPoolExecutor(max_workers=concurrent_tracks) as executor:
+            futures = {
+                executor.submit(_process_single_track, idx, track): idx
+                for idx, track in enumerate(tracks_to_download)
+            }
+            pending = set(futures)
+            while pending:
+                # Wake up periodically so a stop request cancels queued
+                # tracks even while every worker is mid-download.
+                done, pending = wait(
+                    pending, timeout=TRACK_STOP_POLL_INTERVAL,
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.warning("Track worker exception: %s", e)
+                if download_process["stop"] and pending:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    # Tracks that never reached a worker would otherwise
+                    # be reported as "pending" forever.
+                    for future in pending:
+                        if future.cancelled():
+                            download_process["tracks"][futures[future]][
+                                "status"
+                            ] = "skipped"
+                    logger.warning("Download stopped by user")
+                    break
+    finally:
+        for ydl in search_ydls:
+            ydl.close()
 
     return (
         failed_tracks, succeeded_tracks, total_downloaded_size,
@@ -1388,6 +1653,41 @@ def _verify_summary_lines(verify_stats, verified_total):
     return field_value, md2_lines
 
 
+def _log_track_failures(album_id, album_title, artist_name, failed_tracks):
+    """Write one track_failure log per failed track.
+
+    All rows go in one transaction. If that fails (say, the database
+    is locked), fall back to one insert per track so the rest are
+    still recorded.
+    """
+    entries = [
+        {
+            "log_type": "track_failure",
+            "album_id": album_id,
+            "album_title": album_title,
+            "artist_name": artist_name,
+            "details": ft["reason"],
+            "track_title": ft["title"],
+            "track_number": ft["track_num"],
+            "track_download_id": ft.get("track_download_id"),
+        }
+        for ft in failed_tracks
+    ]
+    try:
+        models.add_logs(entries)
+        return
+    except sqlite3.Error:
+        logger.debug("Batched track_failure logs failed", exc_info=True)
+    for i, entry in enumerate(entries):
+        try:
+            models.add_log(**entry, seq=i)
+        except sqlite3.Error:
+            logger.warning(
+                "Failed to log track_failure for '%s'",
+                entry["track_title"], exc_info=True,
+            )
+
+
 def _handle_post_download(
     failed_tracks, succeeded_tracks, tracks_to_download,
     album_id, album_title, artist_name, total_downloaded_size,
@@ -1469,25 +1769,9 @@ def _handle_post_download(
                     " failed to download"
                 ),
             )
-            for ft in failed_tracks:
-                try:
-                    models.add_log(
-                        log_type="track_failure",
-                        album_id=album_id,
-                        album_title=album_title,
-                        artist_name=artist_name,
-                        details=ft["reason"],
-                        track_title=ft["title"],
-                        track_number=ft["track_num"],
-                        track_download_id=ft.get(
-                            "track_download_id",
-                        ),
-                    )
-                except Exception:
-                    logger.warning(
-                        "Failed to log track_failure for '%s'",
-                        ft["title"], exc_info=True,
-                    )
+            _log_track_failures(
+                album_id, album_title, artist_name, failed_tracks,
+            )
             download_process["result_success"] = False
             return {"error": "All tracks failed to download"}
 
@@ -1544,25 +1828,9 @@ def _handle_post_download(
             ),
             total_file_size=total_downloaded_size,
         )
-        for ft in failed_tracks:
-            try:
-                models.add_log(
-                    log_type="track_failure",
-                    album_id=album_id,
-                    album_title=album_title,
-                    artist_name=artist_name,
-                    details=ft["reason"],
-                    track_title=ft["title"],
-                    track_number=ft["track_num"],
-                    track_download_id=ft.get(
-                        "track_download_id",
-                    ),
-                )
-            except Exception:
-                logger.warning(
-                    "Failed to log track_failure for '%s'",
-                    ft["title"], exc_info=True,
-                )
+        _log_track_failures(
+            album_id, album_title, artist_name, failed_tracks,
+        )
     else:
         models.add_log(
             log_type="download_success",
@@ -1633,13 +1901,58 @@ def _handle_post_download(
     return None
 
 
+def _transfer_file(src, dst):
+    """Move ``src`` to ``dst``, copying when they are on different devices.
+
+    A same-filesystem move is a rename and moves no data. Across
+    devices the file is copied and the original is left for the
+    download-folder cleanup.
+    """
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        _copy_file(src, dst)
+
+
+def _copy_file(src, dst):
+    """Copy ``src`` to ``dst`` with metadata, zero-copy where possible."""
+    if hasattr(os, "sendfile"):
+        # shutil.copy2 already copies in-kernel via sendfile here.
+        shutil.copy2(src, dst)
+        return
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        shutil.copyfileobj(fsrc, fdst, LIDARR_COPY_BUFSIZE)
+    shutil.copystat(src, dst)
+
+
+def _undo_transfers(names, album_path, lidarr_album_path):
+    """Return transferred files from the Lidarr folder to album_path.
+
+    A cross-device transfer copied the file and left the original in
+    place, so only the copy is removed.
+    """
+    for name in names:
+        src = os.path.join(album_path, name)
+        dst = os.path.join(lidarr_album_path, name)
+        try:
+            if os.path.lexists(src):
+                os.remove(dst)
+            else:
+                os.replace(dst, src)
+        except OSError as e:
+            logger.error("Could not move back %s: %s", name, e)
+
+
 def _copy_to_lidarr(
     lidarr_path, album_path, sanitized_artist, album_folder_name,
 ):
-    """Copy downloaded files to Lidarr music folder if configured.
+    """Move downloaded files to Lidarr music folder if configured.
 
     Returns:
-        Tuple of (import_path, lidarr_album_path).
+        Tuple of (import_path, lidarr_album_path). ``import_path`` is
+        ``album_path`` when nothing was transferred.
     """
     lidarr_album_path = ""
     if lidarr_path:
@@ -1651,11 +1964,10 @@ def _copy_to_lidarr(
                 "LIDARR_PATH matches DOWNLOAD_PATH."
                 " Skipping move to prevent data loss."
             )
-            lidarr_path = ""
-        else:
-            logger.info(
-                f"Moving files to Lidarr music folder: {lidarr_path}"
-            )
+            return album_path, lidarr_album_path
+        logger.info(
+            f"Moving files to Lidarr music folder: {lidarr_path}"
+        )
         lidarr_artist_path = os.path.join(
             lidarr_path, sanitized_artist
         )
@@ -1665,22 +1977,53 @@ def _copy_to_lidarr(
 
         try:
             os.makedirs(lidarr_album_path, exist_ok=True)
-            for item in os.listdir(album_path):
-                src = os.path.join(album_path, item)
-                dst = os.path.join(lidarr_album_path, item)
-                if os.path.isfile(src):
-                    shutil.copy2(src, dst)
-                    logger.info(f"  Copied: {item}")
-            set_permissions(lidarr_artist_path)
-            logger.info("Files copied to Lidarr folder successfully")
+            with os.scandir(album_path) as entries:
+                names = [
+                    entry.name for entry in entries
+                    if entry.is_file(follow_symlinks=False)
+                ]
+            failures = []
+            moved = []
+            workers = max(1, min(LIDARR_TRANSFER_WORKERS, len(names)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    name: pool.submit(
+                        _transfer_file,
+                        os.path.join(album_path, name),
+                        os.path.join(lidarr_album_path, name),
+                    )
+                    for name in names
+                }
+                for name, future in futures.items():
+                    try:
+                        future.result()
+                        moved.append(name)
+                        logger.info(f"  Moved: {name}")
+                    except OSError as e:
+                        failures.append(f"{name}: {e}")
+            if failures:
+                # Import from one complete folder: put back what moved
+                # so album_path (and a later retry) still sees every
+                # track.
+                _undo_transfers(moved, album_path, lidarr_album_path)
+                raise OSError(
+                    f"{len(failures)} file(s) not transferred: "
+                    + "; ".join(failures)
+                )
+            # The files were fixed up in album_path before the move and
+            # keep their mode (rename, or copy2), so only the folders
+            # that may have just been created need it.
+            set_permissions(lidarr_album_path, recursive=False)
+            set_permissions(lidarr_artist_path, recursive=False)
+            logger.info("Files moved to Lidarr folder successfully")
             return lidarr_album_path, lidarr_album_path
         except Exception as e:
             logger.error(
-                "Error copying files to Lidarr folder: %s",
+                "Error moving files to Lidarr folder: %s",
                 e, exc_info=True,
             )
             send_notifications(
-                f"Copy to Lidarr failed: {e}",
+                f"Move to Lidarr failed: {e}",
                 log_type="album_error",
             )
             return album_path, lidarr_album_path
@@ -1745,22 +2088,29 @@ def _log_import_result(
         )
 
 
+def wake_queue_processor():
+    """Make process_download_queue check the queue immediately."""
+    _queue_wake.set()
+
+
 def process_download_queue():
     """Continuously process the download queue in a loop.
 
-    Pops the next album from the queue and starts a download thread.
-    Sleeps 2 seconds between checks.
+    Claims the download slot for the next queued album and starts a
+    download thread, then sleeps until wake_queue_processor() is called
+    (or QUEUE_POLL_INTERVAL passes).
     """
     while True:
+        # Clear before checking so a wakeup that lands mid-check is kept.
+        _queue_wake.clear()
         try:
-            if not download_process["active"]:
-                next_album_id = models.pop_next_from_queue()
-                if next_album_id is not None:
-                    threading.Thread(
-                        target=process_album_download,
-                        args=(next_album_id, False),
-                        daemon=True,
-                    ).start()
+            next_album_id = _claim_next_queued_album()
+            if next_album_id is not None:
+                threading.Thread(
+                    target=_run_album_download,
+                    args=(next_album_id, False),
+                    daemon=True,
+                ).start()
         except Exception as e:
             logger.warning(f"Queue processor error: {e}")
-        time.sleep(2)
+        _queue_wake.wait(QUEUE_POLL_INTERVAL)
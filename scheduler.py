@@ -5,18 +5,29 @@ them to the download queue.
 """
 
 import logging
+import threading
 import time
 
-import schedule
-
 import models
 from config import load_config
 from lidarr import get_missing_albums
 from notifications import send_notifications
-from processing import download_process
+from processing import download_process, wake_queue_processor
 
 logger = logging.getLogger(__name__)
 
+# Config keys that change when the next check is due; saving any of
+# them must go through setup_scheduler() to take effect.
+SCHEDULER_CONFIG_KEYS = frozenset({"scheduler_enabled", "scheduler_interval"})
+
+# Monotonic deadline of the next scheduled_check(), or None when the
+# scheduler is disabled. setup_scheduler() sets _wake so run_scheduler()
+# re-reads it immediately instead of sleeping out the old interval.
+_next_run = None
+_interval_seconds = 0
+_state_lock = threading.Lock()
+_wake = threading.Event()
+
 
 def scheduled_check():
     """Check Lidarr for new missing albums and optionally queue them."""
@@ -67,8 +78,8 @@ def scheduled_check():
                 "color": 0x3498DB,
             },
         )
-        for album in new_albums:
-            models.enqueue_album(album["id"])
+        models.enqueue_albums(album["id"] for album in new_albums)
+        wake_queue_processor()
     else:
         logger.info(
             f"Scheduler: Found {len(new_albums)} missing albums"
@@ -89,17 +100,47 @@ def scheduled_check():
         )
 
 
+def _seconds_until_next_run():
+    """Seconds to sleep before the next check, or None if disabled."""
+    with _state_lock:
+        if _next_run is None:
+            return None
+        return max(0.0, _next_run - time.monotonic())
+
+
+def _claim_due_run():
+    """Advance the deadline if a check is due; return True if it was."""
+    global _next_run
+    with _state_lock:
+        if _next_run is None or _next_run > time.monotonic():
+            return False
+        _next_run = time.monotonic() + _interval_seconds
+        return True
+
+
 def run_scheduler():
-    """Run the schedule loop forever, checking every 10 seconds."""
+    """Run scheduled checks forever, sleeping until the next one is due."""
     while True:
-        schedule.run_pending()
-        time.sleep(10)
+        if _wake.wait(_seconds_until_next_run()):
+            _wake.clear()
+            continue
+        if not _claim_due_run():
+            continue
+        try:
+            scheduled_check()
+        except Exception:
+            logger.exception("Scheduled check failed")
 
 
 def setup_scheduler():
     """Configure the scheduler based on current config settings."""
+    global _next_run, _interval_seconds
     config = load_config()
-    schedule.clear()
-    if config.get("scheduler_enabled"):
-        interval = int(config.get("scheduler_interval", 60))
-        schedule.every(interval).minutes.do(scheduled_check)
+    with _state_lock:
+        if config.get("scheduler_enabled"):
+            interval = int(config.get("scheduler_interval", 60))
+            _interval_seconds = interval * 60
+            _next_run = time.monotonic() + _interval_seconds
+        else:
+            _next_run = None
+    _wake.set()
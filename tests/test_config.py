@@ -1,5 +1,6 @@
 import json
 import os
+from unittest.mock import patch
 
 import pytest
 
@@ -201,6 +202,17 @@ def test_min_match_score_invalid_in_file_falls_back(temp_config):
     assert cfg["min_match_score"] == 0.8
 
 
+def test_mp3_quality_default_and_normalization(temp_config, monkeypatch):
+    """mp3_quality defaults to 320 and accepts v0 case-insensitively."""
+    assert config.load_config()["mp3_quality"] == "320"
+    with open(temp_config, "w") as f:
+        json.dump({"mp3_quality": "v0"}, f)
+    assert config.load_config()["mp3_quality"] == "V0"
+    with open(temp_config, "w") as f:
+        json.dump({"mp3_quality": "128k"}, f)
+    assert config.load_config()["mp3_quality"] == "320"
+
+
 def test_save_config_creates_directory(tmp_path, monkeypatch):
     """save_config creates parent directories if they don't exist."""
     nested = str(tmp_path / "nested" / "dir" / "config.json")
@@ -208,3 +220,62 @@ def test_save_config_creates_directory(tmp_path, monkeypatch):
     cfg = config.load_config()
     config.save_config(cfg)
     assert os.path.exists(nested)
+
+
+def test_load_config_cached_until_file_changes(temp_config):
+    """Repeated loads reuse the parsed file until it is rewritten."""
+    with open(temp_config, "w") as f:
+        json.dump({"lidarr_url": "http://first:8686"}, f)
+    assert config.load_config()["lidarr_url"] == "http://first:8686"
+    with patch("config.orjson.loads") as mock_load:
+        assert config.load_config()["lidarr_url"] == "http://first:8686"
+        mock_load.assert_not_called()
+    with open(temp_config, "w") as f:
+        json.dump({"lidarr_url": "http://second-host:8686"}, f)
+    assert config.load_config()["lidarr_url"] == "http://second-host:8686"
+
+
+def test_load_config_returns_independent_copies(temp_config):
+    """Mutating a returned config must not leak into later loads."""
+    cfg = config.load_config()
+    cfg["forbidden_words"].append("polka")
+    cfg["lidarr_url"] = "http://mutated"
+    fresh = config.load_config()
+    assert "polka" not in fresh["forbidden_words"]
+    assert fresh["lidarr_url"] == ""
+
+
+def test_load_config_copies_nested_file_values(temp_config):
+    """Lists and dicts read from config.json are detached per call too."""
+    with open(temp_config, "w") as f:
+        json.dump({"telegram_log_types": ["album_error"]}, f)
+    first = config.load_config()
+    first["telegram_log_types"].append("manual_download")
+    assert config.load_config()["telegram_log_types"] == ["album_error"]
+
+
+def test_save_config_refreshes_cache(temp_config):
+    """save_config makes the next load see the new values."""
+    config.load_config()
+    with patch("config._config_file_signature", return_value="same"):
+        config.load_config()
+        config.save_config({"lidarr_url": "http://saved"})
+        assert config.load_config()["lidarr_url"] == "http://saved"
+
+
+def test_saved_file_is_indented_json(temp_config):
+    config.save_config({"lidarr_url": "http://saved", "concurrent_tracks": 3})
+    with open(temp_config) as f:
+        text = f.read()
+    assert json.loads(text) == {
+        "lidarr_url": "http://saved", "concurrent_tracks": 3,
+    }
+    assert '\n  "lidarr_url": "http://saved"' in text
+
+
+def test_load_after_save_skips_parse(temp_config):
+    """The write primes the cache, so the next load does not re-parse."""
+    config.save_config({"lidarr_url": "http://primed"})
+    with patch("config.orjson.loads") as mock_load:
+        assert config.load_config()["lidarr_url"] == "http://primed"
+        mock_load.assert_not_called()
@@ -35,7 +35,7 @@ def test_init_db_sets_schema_version(temp_db):
         " ORDER BY version DESC LIMIT 1"
     ).fetchone()
     conn.close()
-    assert row[0] == 5
+    assert row[0] == 6
 
 
 def test_init_db_idempotent(temp_db):
@@ -44,8 +44,8 @@ def test_init_db_idempotent(temp_db):
     conn = sqlite3.connect(temp_db)
     rows = conn.execute("SELECT COUNT(*) FROM schema_version").fetchone()
     conn.close()
-    # V1 insert + V2..V5 migrations = 5 rows
-    assert rows[0] == 5
+    # V1 insert + V2..V6 migrations = 6 rows
+    assert rows[0] == 6
 
 
 def test_get_db_returns_connection(temp_db):
@@ -56,6 +56,14 @@ def test_get_db_returns_connection(temp_db):
     assert result[0] == 1
 
 
+def test_get_db_uses_wal_with_normal_sync(temp_db):
+    init_db()
+    conn = get_db()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    # 1 == NORMAL
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+
 def test_init_db_drops_legacy_tables(temp_db):
     """Pre-versioned databases (no schema_version) get tables replaced."""
     conn = sqlite3.connect(temp_db)
@@ -185,7 +193,7 @@ def test_migrate_v1_to_v2_creates_track_downloads(temp_db):
         "SELECT version FROM schema_version"
         " ORDER BY version DESC LIMIT 1"
     ).fetchone()
-    assert row[0] == 5
+    assert row[0] == 6
     conn.close()
 
 
@@ -337,7 +345,7 @@ def test_migrate_v2_to_v3_adds_acoustid_columns(temp_db):
         "SELECT version FROM schema_version"
         " ORDER BY version DESC LIMIT 1"
     ).fetchone()
-    assert row[0] == 5
+    assert row[0] == 6
     conn.close()
 
 
@@ -416,7 +424,7 @@ def test_schema_version_is_4(temp_db):
         " ORDER BY version DESC LIMIT 1"
     ).fetchone()
     conn.close()
-    assert row[0] == 5
+    assert row[0] == 6
 
 
 # --- V4 to V5 Migration ---
@@ -492,3 +500,20 @@ def test_v5_migration_preserves_existing_logs(temp_db):
     assert row[1] is None
     assert row[2] is None
     conn.close()
+
+
+# --- V5 to V6 Migration ---
+
+
+def test_v6_migration_indexes_logs_by_type(temp_db):
+    init_db()
+    conn = sqlite3.connect(temp_db)
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM download_logs"
+        " WHERE type = ? ORDER BY timestamp DESC LIMIT 50",
+        ("album_error",),
+    ).fetchall()
+    conn.close()
+    detail = " ".join(row[-1] for row in plan)
+    assert "idx_logs_type_timestamp" in detail
+    assert "TEMP B-TREE" not in detail
@@ -1,20 +1,62 @@
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
+import pytest
+
+import downloader
 from downloader import (
     _check_forbidden,
+    _forbidden_pattern,
     _is_official_channel,
     _title_similarity,
+    build_ydl_audio_opts,
     download_track_youtube,
     download_youtube_candidate,
     search_youtube_candidates,
 )
 
 
+@pytest.fixture(autouse=True)
+def _empty_download_pool():
+    downloader.close_download_pool()
+    yield
+    downloader.close_download_pool()
+
+
+class TestBuildYdlAudioOpts:
+    def test_mp3_defaults_to_cbr_320(self):
+        pp = build_ydl_audio_opts("mp3")["postprocessors"][0]
+        assert pp["preferredquality"] == "320"
+
+    def test_mp3_v0_uses_vbr_level(self):
+        pp = build_ydl_audio_opts("mp3", "V0")["postprocessors"][0]
+        assert pp["preferredquality"] == "0"
+
+    def test_quality_ignored_for_passthrough_formats(self):
+        opts = build_ydl_audio_opts("opus", "V0")
+        assert "preferredquality" not in opts["postprocessors"][0]
+
+    @pytest.mark.parametrize("fmt,codec", [
+        ("m4a", "bestaudio[acodec^=mp4a]"),
+        ("opus", "bestaudio[acodec=opus]"),
+    ])
+    def test_passthrough_prefers_matching_codec(self, fmt, codec):
+        selector = build_ydl_audio_opts(fmt)["format"]
+        assert selector.split("/")[0] == codec
+        assert selector.endswith("/bestaudio/best")
+
+
 class TestTitleSimilarity:
     def test_exact_match(self):
         score = _title_similarity("Artist Track", "Track", "Artist")
         assert score > 0.8
 
+    def test_repeated_titles_are_memoized(self):
+        _title_similarity.cache_clear()
+        first = _title_similarity("Artist - Track (Audio)", "Track", "Artist")
+        again = _title_similarity("Artist - Track (Audio)", "Track", "Artist")
+        assert first == again
+        assert _title_similarity.cache_info().hits == 1
+
     def test_low_similarity(self):
         score = _title_similarity(
             "Completely Different", "Track", "Artist"
@@ -129,6 +171,39 @@ class TestCheckForbidden:
         result = _check_forbidden("any title", "any title", [])
         assert result is None
 
+    def test_pattern_compiled_once_per_word_list(self):
+        _forbidden_pattern.cache_clear()
+        for title in ("song live", "song remix", "song"):
+            _check_forbidden(title, "song", ["live", "remix"])
+        info = _forbidden_pattern.cache_info()
+        assert info.misses == 1
+        assert info.hits == 2
+
+    def test_track_title_scanned_once_per_track(self):
+        from downloader import _allowed_terms
+
+        _allowed_terms.cache_clear()
+        for title in ("live remix", "remix live", "live"):
+            assert _check_forbidden(
+                title, "song (live)", ["live", "remix"]
+            ) == ("remix" if "remix" in title else None)
+        assert _allowed_terms.cache_info().misses == 1
+
+    def test_allowed_word_does_not_mask_other_hits(self):
+        result = _check_forbidden(
+            "live remix", "song (live)", ["live", "remix"]
+        )
+        assert result == "remix"
+
+    def test_longer_term_wins_over_its_prefix(self):
+        result = _check_forbidden(
+            "song sped up", "song", ["sped", "sped up"]
+        )
+        assert result == "sped up"
+
+    def test_empty_strings_ignored(self):
+        assert _check_forbidden("any title", "other", ["", "remix"]) is None
+
 
 class TestDownloadTrackYoutubeReturnType:
     """download_track_youtube returns metadata dict, not True/string."""
@@ -177,6 +252,125 @@ class TestDownloadTrackYoutubeReturnType:
         assert "error_message" in result
 
 
+class TestSearchYdlReuse:
+    @patch("downloader.yt_dlp.YoutubeDL")
+    @patch("downloader.load_config")
+    def test_supplied_instance_is_used_and_left_open(
+        self, mock_config, mock_ydl_class
+    ):
+        from unittest.mock import MagicMock
+
+        from downloader import search_youtube_candidates
+
+        mock_config.return_value = {
+            "forbidden_words": [], "duration_tolerance": 10,
+        }
+        shared = MagicMock()
+        shared.extract_info.return_value = {"entries": [{
+            "title": "Artist - Track", "url": "vid", "duration": 200,
+            "channel": "Artist", "view_count": 10,
+        }]}
+        result = search_youtube_candidates(
+            "Artist Track official audio", "Track",
+            expected_duration_ms=200000, search_ydl=shared,
+        )
+        assert [c["url"] for c in result] == ["vid"]
+        mock_ydl_class.assert_not_called()
+        shared.close.assert_not_called()
+
+    @patch("downloader.load_config")
+    def test_supplied_config_is_not_reloaded(self, mock_config):
+        shared = MagicMock()
+        shared.extract_info.return_value = {"entries": []}
+        search_youtube_candidates(
+            "Artist Track official audio", "Track",
+            search_ydl=shared, config={"forbidden_words": []},
+        )
+        mock_config.assert_not_called()
+
+
+class TestUnavailableEntryFiltering:
+    @staticmethod
+    def _search(entries, cookies=""):
+        from unittest.mock import MagicMock
+
+        ydl = MagicMock()
+        ydl.extract_info.return_value = {"entries": entries}
+        with patch("downloader.load_config", return_value={
+            "forbidden_words": [], "duration_tolerance": 10,
+            "yt_cookies_file": cookies,
+        }):
+            return search_youtube_candidates(
+                "Artist Track official audio", "Track",
+                expected_duration_ms=200000, search_ydl=ydl,
+            )
+
+    @staticmethod
+    def _entry(url, **extra):
+        return {
+            "title": "Artist - Track", "url": url, "duration": 200,
+            "channel": "Artist", "view_count": 10, **extra,
+        }
+
+    def test_skips_private_live_and_login_gated_entries(self):
+        result = self._search([
+            None,
+            self._entry("private", availability="private"),
+            self._entry("live", live_status="is_live"),
+            self._entry("members", availability="subscriber_only"),
+            self._entry("adult", age_limit=18),
+            self._entry("ok", availability="public", live_status="was_live"),
+        ])
+        assert [c["url"] for c in result] == ["ok"]
+
+    def test_keeps_login_gated_entries_with_cookies(self):
+        result = self._search([
+            self._entry("private", availability="private"),
+            self._entry("adult", age_limit=18),
+            self._entry("members", availability="needs_auth"),
+        ], cookies="/config/cookies.txt")
+        assert sorted(c["url"] for c in result) == ["adult", "members"]
+
+    def test_entries_without_url_are_not_scored(self):
+        with patch("downloader._title_similarity") as mock_sim:
+            mock_sim.return_value = 1.0
+            result = self._search([
+                self._entry(None), self._entry(""), self._entry("ok"),
+            ])
+        assert [c["url"] for c in result] == ["ok"]
+        assert mock_sim.call_count == 1
+
+
+class TestDurationWindow:
+    @staticmethod
+    def _search(durations, expected_duration_ms):
+        from unittest.mock import MagicMock
+
+        ydl = MagicMock()
+        ydl.extract_info.return_value = {"entries": [
+            {"title": "Artist - Track", "url": str(d), "duration": d,
+             "channel": "Artist", "view_count": 10}
+            for d in durations
+        ]}
+        with patch("downloader.load_config", return_value={
+            "forbidden_words": [], "duration_tolerance": 10,
+        }):
+            result = search_youtube_candidates(
+                "Artist Track official audio", "Track",
+                expected_duration_ms=expected_duration_ms, search_ydl=ydl,
+            )
+        return sorted(int(c["url"]) for c in result)
+
+    def test_expected_duration_bounds_by_tolerance(self):
+        assert self._search([189, 190, 210, 211], 200000) == [190, 210]
+
+    def test_expected_duration_keeps_minimum_floor(self):
+        assert self._search([10, 14, 15, 18], 5000) == [15]
+
+    def test_without_expected_duration_uses_wide_window(self):
+        assert self._search([14, 15, 7200, 7201], None) == [15, 7200]
+
+
 class TestBannedUrlFiltering:
     @patch("downloader.yt_dlp.YoutubeDL")
     @patch("downloader.load_config")
@@ -290,7 +484,7 @@ class TestBannedUrlFiltering:
             banned_urls=None,
         )
         # With no bans, the candidate should reach the download phase
-        assert mock_ydl.download.called
+        assert mock_ydl_class.return_value.download.called
 
 
 class TestSkipCheck:
@@ -449,12 +643,43 @@ class TestSearchYoutubeCandidates:
         assert candidates == []
 
 
+    @patch("downloader.yt_dlp.YoutubeDL")
+    @patch("downloader.load_config")
+    def test_fallback_queries_share_one_instance(
+        self, mock_config, mock_ydl_class,
+    ):
+        mock_config.return_value = {
+            "forbidden_words": [],
+            "duration_tolerance": 10,
+            "yt_player_client": "android",
+        }
+        mock_ydl = mock_ydl_class.return_value.__enter__.return_value
+        mock_ydl.extract_info.return_value = {"entries": []}
+        search_youtube_candidates("Artist Track official audio", "Track")
+        assert mock_ydl.extract_info.call_count > 1
+        assert mock_ydl_class.call_count == 1
+
+    @patch("downloader.load_config")
+    def test_skip_check_stops_between_fallbacks(self, mock_config):
+        mock_config.return_value = {
+            "forbidden_words": [], "duration_tolerance": 10,
+        }
+        shared = MagicMock()
+        shared.extract_info.return_value = {"entries": []}
+        checks = iter([False, False, True])
+        assert search_youtube_candidates(
+            "Artist Track official audio", "Track",
+            skip_check=lambda: next(checks), search_ydl=shared,
+        ) == []
+        assert shared.extract_info.call_count == 1
+
+
 class TestDownloadYoutubeCandidate:
     @patch("downloader.yt_dlp.YoutubeDL")
     @patch("downloader.load_config")
     def test_success_returns_result(self, mock_config, mock_ydl_class):
         mock_config.return_value = {"yt_player_client": "android"}
-        mock_ydl = mock_ydl_class.return_value.__enter__.return_value
+        mock_ydl = mock_ydl_class.return_value
         mock_ydl.download.return_value = 0
         candidate = {
             "url": "test_url",
@@ -471,7 +696,7 @@ class TestDownloadYoutubeCandidate:
     @patch("downloader.load_config")
     def test_download_failure_returns_error(self, mock_config, mock_ydl_class):
         mock_config.return_value = {"yt_player_client": "android"}
-        mock_ydl = mock_ydl_class.return_value.__enter__.return_value
+        mock_ydl = mock_ydl_class.return_value
         mock_ydl.download.side_effect = Exception("Network error")
         candidate = {
             "url": "test_url",
@@ -496,3 +721,73 @@ class TestDownloadYoutubeCandidate:
             candidate, "/tmp/output", skip_check=lambda: True
         )
         assert result.get("skipped") is True
+
+
+class TestDownloaderPool:
+    CANDIDATE = {"url": "u", "title": "T", "duration": 200, "score": 0.9}
+
+    @patch("downloader.yt_dlp.YoutubeDL")
+    @patch("downloader.load_config", return_value={"yt_player_client": "web"})
+    def test_reuses_instance_with_per_download_path_and_hook(
+        self, mock_config, mock_ydl_class
+    ):
+        ydl = mock_ydl_class.return_value
+        ydl.params = {"outtmpl": {}}
+        seen = []
+
+        def fake_download(urls):
+            opts = mock_ydl_class.call_args.args[0]
+            opts["progress_hooks"][0]({"status": "downloading"})
+            seen.append(ydl.params["outtmpl"]["default"])
+        ydl.download.side_effect = fake_download
+
+        hook_a, hook_b = [], []
+        download_youtube_candidate(self.CANDIDATE, "/tmp/a", hook_a.append)
+        download_youtube_candidate(self.CANDIDATE, "/tmp/b", hook_b.append)
+
+        assert mock_ydl_class.call_count == 1
+        assert seen == ["/tmp/a.%(ext)s", "/tmp/b.%(ext)s"]
+        assert len(hook_a) == 1 and len(hook_b) == 1
+        ydl.close.assert_not_called()
+
+    @patch("downloader.yt_dlp.YoutubeDL")
+    @patch("downloader.load_config", return_value={"yt_player_client": "web"})
+    def test_failed_instance_is_closed_not_reused(
+        self, mock_config, mock_ydl_class
+    ):
+        ydl = mock_ydl_class.return_value
+        ydl.download.side_effect = [Exception("boom")] * 3 + [0]
+        download_youtube_candidate(self.CANDIDATE, "/tmp/a")
+        assert ydl.close.call_count == 3
+        assert mock_ydl_class.call_count == 3
+        download_youtube_candidate(self.CANDIDATE, "/tmp/b")
+        assert mock_ydl_class.call_count == 4
+
+    @patch("downloader.yt_dlp.YoutubeDL")
+    def test_changed_settings_get_their_own_instance(self, mock_ydl_class):
+        first, second = MagicMock(), MagicMock()
+        mock_ydl_class.side_effect = [first, second]
+        old = {"yt_player_client": "web", "yt_retries": 10}
+        new = {"yt_player_client": "web", "yt_retries": 3}
+        download_youtube_candidate(self.CANDIDATE, "/tmp/a", config=old)
+        download_youtube_candidate(self.CANDIDATE, "/tmp/b", config=new)
+        download_youtube_candidate(self.CANDIDATE, "/tmp/c", config=new)
+        first.download.assert_called_once()
+        assert second.download.call_count == 2
+        assert mock_ydl_class.call_args.args[0]["retries"] == 3
+
+    @patch("downloader.MAX_DOWNLOADER_KEYS", 1)
+    @patch("downloader.yt_dlp.YoutubeDL")
+    def test_oldest_settings_retired_past_key_limit(self, mock_ydl_class):
+        first, second = MagicMock(), MagicMock()
+        mock_ydl_class.side_effect = [first, second]
+        download_youtube_candidate(
+            self.CANDIDATE, "/tmp/a",
+            config={"yt_player_client": "web", "yt_retries": 10},
+        )
+        download_youtube_candidate(
+            self.CANDIDATE, "/tmp/b",
+            config={"yt_player_client": "web", "yt_retries": 3},
+        )
+        first.close.assert_called_once()
+        second.close.assert_not_called()
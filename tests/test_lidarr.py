@@ -1,24 +1,36 @@
 """Tests for lidarr.py — Lidarr API wrapper and release helpers."""
 
+import time
 from unittest.mock import patch, MagicMock
 
 import pytest
+import requests
 
 import lidarr
+import utils
+
+
+@pytest.fixture(autouse=True)
+def _clear_missing_cache():
+    lidarr.invalidate_missing_albums()
+    lidarr._reset_lidarr_endpoint()
+    yield
+    lidarr.invalidate_missing_albums()
+    lidarr._reset_lidarr_endpoint()
 
 
 # --- lidarr_request ---
 
 
 @patch("lidarr.load_config")
-@patch("lidarr.requests.get")
+@patch("lidarr.http_session.get")
 def test_lidarr_request_get(mock_get, mock_cfg):
     mock_cfg.return_value = {
         "lidarr_url": "http://lidarr:8686",
         "lidarr_api_key": "key123",
     }
     mock_get.return_value = MagicMock(
-        status_code=200, json=lambda: {"version": "2.0"}
+        status_code=200, content=b'{"version": "2.0"}'
     )
     result = lidarr.lidarr_request("system/status")
     assert result["version"] == "2.0"
@@ -31,14 +43,14 @@ def test_lidarr_request_get(mock_get, mock_cfg):
 
 
 @patch("lidarr.load_config")
-@patch("lidarr.requests.post")
+@patch("lidarr.http_session.post")
 def test_lidarr_request_post(mock_post, mock_cfg):
     mock_cfg.return_value = {
         "lidarr_url": "http://lidarr:8686",
         "lidarr_api_key": "key123",
     }
     mock_post.return_value = MagicMock(
-        status_code=200, json=lambda: {"success": True}
+        status_code=200, content=b'{"success": true}'
     )
     result = lidarr.lidarr_request(
         "command", method="POST", data={"name": "RefreshArtist"}
@@ -52,15 +64,20 @@ def test_lidarr_request_post(mock_post, mock_cfg):
     )
 
 
+def test_lidarr_request_rejects_unsupported_method():
+    with pytest.raises(ValueError):
+        lidarr.lidarr_request("album/1", method="DELETE")
+
+
 @patch("lidarr.load_config")
-@patch("lidarr.requests.get")
+@patch("lidarr.http_session.get")
 def test_lidarr_request_with_params(mock_get, mock_cfg):
     mock_cfg.return_value = {
         "lidarr_url": "http://lidarr:8686",
         "lidarr_api_key": "key123",
     }
     mock_get.return_value = MagicMock(
-        status_code=200, json=lambda: {"records": []}
+        status_code=200, content=b'{"records": []}'
     )
     result = lidarr.lidarr_request(
         "wanted/missing", params={"page": 1}
@@ -75,32 +92,107 @@ def test_lidarr_request_with_params(mock_get, mock_cfg):
 
 
 @patch("lidarr.load_config")
-@patch("lidarr.requests.get")
+@patch("lidarr.http_session.get")
 def test_lidarr_request_error(mock_get, mock_cfg):
     mock_cfg.return_value = {
         "lidarr_url": "http://lidarr:8686",
         "lidarr_api_key": "key123",
     }
-    mock_get.side_effect = Exception("connection failed")
+    mock_get.side_effect = requests.exceptions.ConnectionError(
+        "connection failed"
+    )
     result = lidarr.lidarr_request("system/status")
     assert "error" in result
     assert "connection failed" in result["error"]
 
 
 @patch("lidarr.load_config")
-@patch("lidarr.requests.get")
+@patch("lidarr.http_session.get")
 def test_lidarr_request_http_error(mock_get, mock_cfg):
     mock_cfg.return_value = {
         "lidarr_url": "http://lidarr:8686",
         "lidarr_api_key": "key123",
     }
     mock_response = MagicMock()
-    mock_response.raise_for_status.side_effect = Exception("404 Not Found")
+    mock_response.raise_for_status.side_effect = (
+        requests.exceptions.HTTPError("404 Not Found")
+    )
     mock_get.return_value = mock_response
     result = lidarr.lidarr_request("bad/endpoint")
     assert "error" in result
 
 
+@patch("lidarr.load_config")
+@patch("lidarr.http_session.get")
+def test_lidarr_request_invalid_json(mock_get, mock_cfg):
+    mock_cfg.return_value = {
+        "lidarr_url": "http://lidarr:8686",
+        "lidarr_api_key": "key123",
+    }
+    mock_get.return_value = MagicMock(content=b"<html>login</html>")
+    result = lidarr.lidarr_request("system/status")
+    assert "Invalid response" in result["error"]
+
+
+@patch("lidarr.load_config")
+@patch("lidarr.http_session.get")
+def test_lidarr_request_programming_errors_propagate(mock_get, mock_cfg):
+    mock_cfg.return_value = {
+        "lidarr_url": "http://lidarr:8686",
+        "lidarr_api_key": "key123",
+    }
+    mock_get.side_effect = TypeError("bad call")
+    with pytest.raises(TypeError):
+        lidarr.lidarr_request("system/status")
+
+
+@patch("lidarr.config_signature")
+@patch("lidarr.load_config")
+@patch("lidarr.http_session.get")
+def test_lidarr_request_reuses_endpoint_until_config_changes(
+    mock_get, mock_cfg, mock_sig
+):
+    mock_sig.return_value = ("config.json", 1, 10)
+    mock_cfg.return_value = {
+        "lidarr_url": "http://lidarr:8686",
+        "lidarr_api_key": "key123",
+    }
+    mock_get.return_value = MagicMock(content=b"{}")
+    lidarr.lidarr_request("system/status")
+    lidarr.lidarr_request("album")
+    assert mock_cfg.call_count == 1
+
+    mock_sig.return_value = ("config.json", 2, 10)
+    mock_cfg.return_value = {
+        "lidarr_url": "http://other:8686",
+        "lidarr_api_key": "key456",
+    }
+    lidarr.lidarr_request("album")
+    assert mock_cfg.call_count == 2
+    mock_get.assert_called_with(
+        "http://other:8686/api/v1/album",
+        headers={"X-Api-Key": "key456"},
+        params=None,
+        timeout=30,
+    )
+
+
+# --- get_albums ---
+
+
+@patch("lidarr.lidarr_request")
+def test_get_albums_single_request(mock_req):
+    mock_req.return_value = [{"id": 1}, {"id": 2}]
+    assert lidarr.get_albums([1, 2]) == [{"id": 1}, {"id": 2}]
+    mock_req.assert_called_once_with("album", params={"albumIds": [1, 2]})
+
+
+@patch("lidarr.lidarr_request")
+def test_get_albums_empty_skips_request(mock_req):
+    assert lidarr.get_albums([]) == []
+    mock_req.assert_not_called()
+
+
 # --- get_missing_albums ---
 
 
@@ -158,6 +250,46 @@ def test_get_missing_albums_exception_returns_empty(mock_req):
     assert result == []
 
 
+@patch("lidarr.lidarr_request")
+def test_get_missing_albums_cached_until_invalidated(mock_req):
+    mock_req.return_value = {"records": [{"id": 1}], "totalRecords": 1}
+    first = lidarr.get_missing_albums()
+    assert lidarr.get_missing_albums() is first
+    assert mock_req.call_count == 1
+    lidarr.invalidate_missing_albums()
+    lidarr.get_missing_albums()
+    assert mock_req.call_count == 2
+
+
+@patch("lidarr.lidarr_request")
+def test_get_missing_albums_error_not_cached(mock_req):
+    mock_req.side_effect = [
+        {"error": "down"},
+        {"records": [{"id": 1}], "totalRecords": 1},
+    ]
+    assert lidarr.get_missing_albums() == []
+    assert len(lidarr.get_missing_albums()) == 1
+
+
+@patch("lidarr.lidarr_request")
+def test_get_missing_albums_serves_stale_list_on_error(
+    mock_req, monkeypatch,
+):
+    mock_req.side_effect = [
+        {"records": [{"id": 1}], "totalRecords": 1},
+        {"error": "down"},
+        Exception("unexpected"),
+    ]
+    now = time.monotonic()
+    monkeypatch.setattr(utils.time, "monotonic", lambda: now)
+    first = lidarr.get_missing_albums()
+    expired = now + lidarr.MISSING_ALBUMS_TTL + 1
+    monkeypatch.setattr(utils.time, "monotonic", lambda: expired)
+    assert lidarr.get_missing_albums() is first
+    assert lidarr.get_missing_albums() is first
+    assert mock_req.call_count == 3
+
+
 @patch("lidarr.lidarr_request")
 def test_get_missing_albums_no_statistics(mock_req):
     mock_req.return_value = {
@@ -229,3 +361,39 @@ def test_get_monitored_release_empty():
 
 def test_get_monitored_release_no_releases_key():
     assert lidarr.get_monitored_release({}) is None
+
+
+# --- lidarr_get_many ---
+
+
+@patch("lidarr.lidarr_request")
+def test_lidarr_get_many_preserves_order(mock_req):
+    mock_req.side_effect = lambda endpoint: {"endpoint": endpoint}
+    result = lidarr.lidarr_get_many(["album/1", "track?albumId=1"])
+    assert result == [
+        {"endpoint": "album/1"},
+        {"endpoint": "track?albumId=1"},
+    ]
+    assert mock_req.call_count == 2
+
+
+@patch("lidarr.lidarr_request")
+def test_lidarr_get_many_single_endpoint_runs_inline(mock_req):
+    mock_req.return_value = {"version": "2.0"}
+    assert lidarr.lidarr_get_many(["system/status"]) == [{"version": "2.0"}]
+    assert lidarr.lidarr_get_many([]) == []
+
+
+def test_get_album_cover_url_picks_cover_image():
+    album = {"images": [
+        {"coverType": "disc", "remoteUrl": "http://img/disc.jpg"},
+        {"coverType": "cover", "remoteUrl": "http://img/cover.jpg"},
+    ]}
+    assert lidarr.get_album_cover_url(album) == "http://img/cover.jpg"
+
+
+def test_get_album_cover_url_without_cover():
+    assert lidarr.get_album_cover_url({}) == ""
+    assert lidarr.get_album_cover_url(
+        {"images": [{"coverType": "cover"}]}
+    ) == ""
@@ -8,6 +8,13 @@ import pytest
 import metadata
 
 
+@pytest.fixture(autouse=True)
+def _no_itunes_throttle(monkeypatch):
+    """Disable iTunes request spacing and caching between tests."""
+    monkeypatch.setattr(metadata, "ITUNES_MIN_INTERVAL", 0)
+    metadata._itunes_cache.clear()
+
+
 class TestCreateXmlMetadata:
     def test_creates_xml_file(self, tmp_path):
         result = metadata.create_xml_metadata(
@@ -60,9 +67,25 @@ class TestCreateXmlMetadata:
         )
         assert (tmp_path / "09 - Nine.xml").exists()
 
+    def test_full_document_layout(self, tmp_path):
+        for num, title in ((1, "One"), (2, "Two")):
+            metadata.create_xml_metadata(
+                str(tmp_path), "A&B", "LP", num, title, album_id="rel-1",
+            )
+        assert (tmp_path / "02 - Two.xml").read_text() == (
+            "<song>\n"
+            "  <title>Two</title>\n"
+            "  <artist>A&amp;B</artist>\n"
+            "  <performingartist>A&amp;B</performingartist>\n"
+            "  <albumartist>A&amp;B</albumartist>\n"
+            "  <album>LP</album>\n"
+            "  <musicbrainzalbumid>rel-1</musicbrainzalbumid>\n"
+            "</song>"
+        )
+
 
 class TestGetItunesTracks:
-    @patch("metadata.requests.get")
+    @patch("metadata.http_session.get")
     def test_returns_tracks(self, mock_get):
         mock_get.side_effect = [
             MagicMock(
@@ -95,21 +118,134 @@ class TestGetItunesTracks:
         assert tracks[0]["trackNumber"] == 1
         assert tracks[1]["title"] == "Song2"
 
-    @patch("metadata.requests.get")
+    @patch("metadata.http_session.get")
     def test_returns_empty_on_no_results(self, mock_get):
         mock_get.return_value = MagicMock(
             json=lambda: {"resultCount": 0, "results": []}
         )
         assert metadata.get_itunes_tracks("Unknown", "Album") == []
 
-    @patch("metadata.requests.get")
+    @patch("metadata.http_session.get")
     def test_returns_empty_on_exception(self, mock_get):
         mock_get.side_effect = Exception("network error")
         assert metadata.get_itunes_tracks("Artist", "Album") == []
 
 
+class TestItunesCache:
+    @patch("metadata.http_session.get")
+    def test_tracks_and_artwork_share_one_search(self, mock_get):
+        search = MagicMock(json=lambda: {
+            "resultCount": 1,
+            "results": [{
+                "collectionId": 5,
+                "artistName": "Artist",
+                "artworkUrl100": "http://img/100x100bb.jpg",
+            }],
+        })
+        lookup = MagicMock(json=lambda: {"results": [{}, {
+            "trackNumber": 1, "trackName": "Song",
+        }]})
+        mock_get.side_effect = [search, lookup, _image_response(b"art")]
+        assert metadata.get_itunes_tracks("Artist", "Album")
+        assert metadata.get_itunes_artwork("Artist", "Album") == b"art"
+        assert metadata.get_itunes_tracks("Artist", "Album")
+        assert mock_get.call_count == 3
+
+    @patch("metadata.http_session.get")
+    def test_concurrent_misses_share_one_request(self, mock_get):
+        import threading
+        import time
+
+        def slow_search(*args, **kwargs):
+            time.sleep(0.05)
+            return MagicMock(json=lambda: {"resultCount": 0, "results": []})
+        mock_get.side_effect = slow_search
+        threads = [
+            threading.Thread(
+                target=metadata.get_itunes_tracks, args=("Artist", "Album"),
+            )
+            for _ in range(3)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert mock_get.call_count == 1
+
+    @patch("metadata.http_session.get")
+    def test_errors_are_not_cached(self, mock_get):
+        mock_get.side_effect = [
+            Exception("timeout"),
+            MagicMock(json=lambda: {"resultCount": 0, "results": []}),
+        ]
+        assert metadata.get_itunes_tracks("Artist", "Album") == []
+        assert metadata.get_itunes_tracks("Artist", "Album") == []
+        assert mock_get.call_count == 2
+
+    @patch("metadata.http_session.get")
+    def test_http_error_status_is_not_cached(self, mock_get):
+        import requests
+
+        throttled = MagicMock(json=lambda: {"errorMessage": "slow down"})
+        throttled.raise_for_status.side_effect = requests.HTTPError("429")
+        mock_get.side_effect = [
+            throttled,
+            MagicMock(json=lambda: {"resultCount": 0, "results": []}),
+        ]
+        assert metadata.get_itunes_tracks("Artist", "Album") == []
+        assert metadata.get_itunes_tracks("Artist", "Album") == []
+        assert mock_get.call_count == 2
+
+    @patch("metadata.http_session.get")
+    def test_other_albums_do_not_wait_on_a_slow_fetch(self, mock_get):
+        import threading
+
+        release = threading.Event()
+        empty = {"resultCount": 0, "results": []}
+
+        def search(url, params, timeout):
+            if "slow" in params["term"]:
+                release.wait(2)
+            return MagicMock(json=lambda: empty)
+
+        mock_get.side_effect = search
+        slow = threading.Thread(
+            target=metadata.get_itunes_tracks, args=("Slow", "Album"),
+        )
+        slow.start()
+        try:
+            assert metadata.get_itunes_tracks("Fast", "Album") == []
+            assert not release.is_set()
+        finally:
+            release.set()
+            slow.join()
+        assert metadata._itunes_key_locks == {}
+
+    @patch("metadata.http_session.get")
+    def test_case_and_spacing_variants_share_entry(self, mock_get):
+        mock_get.return_value = MagicMock(
+            json=lambda: {"resultCount": 0, "results": []}
+        )
+        metadata.get_itunes_tracks("The  Artist", "Album ")
+        metadata.get_itunes_tracks("the artist", "ALBUM")
+        assert mock_get.call_count == 1
+        assert mock_get.call_args.kwargs["params"]["term"] == (
+            "the artist album"
+        )
+
+
+class TestItunesThrottle:
+    def test_spaces_consecutive_calls(self, monkeypatch):
+        monkeypatch.setattr(metadata, "ITUNES_MIN_INTERVAL", 0.05)
+        sleeps = []
+        monkeypatch.setattr(metadata.time, "sleep", sleeps.append)
+        metadata._itunes_throttle()
+        metadata._itunes_throttle()
+        assert sleeps and 0 < sleeps[-1] <= 0.05
+
+
 class TestGetItunesArtwork:
-    @patch("metadata.requests.get")
+    @patch("metadata.http_session.get")
     def test_returns_artwork_data(self, mock_get):
         mock_get.side_effect = [
             MagicMock(
@@ -120,12 +256,12 @@ class TestGetItunesArtwork:
                     ],
                 }
             ),
-            MagicMock(content=b"image_data"),
+            _image_response(b"image_data"),
         ]
         result = metadata.get_itunes_artwork("Artist", "Album")
         assert result == b"image_data"
 
-    @patch("metadata.requests.get")
+    @patch("metadata.http_session.get")
     def test_replaces_resolution_in_url(self, mock_get):
         mock_get.side_effect = [
             MagicMock(
@@ -136,26 +272,57 @@ class TestGetItunesArtwork:
                     ],
                 }
             ),
-            MagicMock(content=b"hires"),
+            _image_response(b"hires"),
         ]
         metadata.get_itunes_artwork("Artist", "Album")
         second_call_url = mock_get.call_args_list[1][0][0]
-        assert "3000x3000" in second_call_url
-        assert "100x100" not in second_call_url
+        assert "1000x1000bb" in second_call_url
+        assert "/100x100" not in second_call_url
 
-    @patch("metadata.requests.get")
+    @patch("metadata.http_session.get")
     def test_returns_none_on_no_results(self, mock_get):
         mock_get.return_value = MagicMock(
             json=lambda: {"resultCount": 0, "results": []}
         )
         assert metadata.get_itunes_artwork("Artist", "Album") is None
 
-    @patch("metadata.requests.get")
+    @patch("metadata.http_session.get")
     def test_returns_none_on_exception(self, mock_get):
         mock_get.side_effect = Exception("timeout")
         assert metadata.get_itunes_artwork("Artist", "Album") is None
 
 
+class TestGetAlbumArtwork:
+    @patch("metadata.get_itunes_artwork", return_value=None)
+    @patch("metadata.http_session.get")
+    def test_falls_back_to_lidarr_url(self, mock_get, mock_itunes):
+        mock_get.return_value = _image_response(b"lidarr")
+        assert metadata.get_album_artwork("A", "B", "http://cover") == (
+            b"lidarr"
+        )
+        mock_get.assert_called_once_with(
+            "http://cover", timeout=15, stream=True,
+        )
+
+    @patch("metadata.get_itunes_artwork", return_value=None)
+    @patch("metadata.http_session.get")
+    def test_oversized_image_discarded(self, mock_get, mock_itunes,
+                                       monkeypatch):
+        monkeypatch.setattr(metadata, "MAX_ARTWORK_BYTES", 4)
+        mock_get.return_value = _image_response(b"abc", b"def")
+        assert metadata.get_album_artwork("A", "B", "http://cover") is None
+
+    @patch("metadata.get_itunes_artwork", return_value=None)
+    @patch("metadata.http_session.get")
+    def test_declared_oversized_image_not_read(self, mock_get, mock_itunes,
+                                               monkeypatch):
+        monkeypatch.setattr(metadata, "MAX_ARTWORK_BYTES", 4)
+        resp = _image_response(b"abcdef", headers={"Content-Length": "6"})
+        mock_get.return_value = resp
+        assert metadata.get_album_artwork("A", "B", "http://cover") is None
+        resp.iter_content.assert_not_called()
+
+
 class TestTagMp3:
     @patch("metadata.get_monitored_release")
     def test_tags_mp3_file(self, mock_release, tmp_path):
@@ -220,6 +387,117 @@ class TestTagMp3:
         assert len(apic_frames) == 1
         assert apic_frames[0].data == b"fake_cover"
 
+    @patch("metadata.get_monitored_release", return_value=None)
+    def test_existing_tag_skips_mpeg_parse(self, mock_release, tmp_path):
+        """Files that already carry an ID3 header are not re-parsed as MP3."""
+        from mutagen.id3 import ID3, TSSE
+
+        mp3_path = _create_minimal_mp3(tmp_path / "tagged.mp3")
+        existing = ID3()
+        existing.add(TSSE(encoding=3, text="Lavf"))
+        existing.save(str(mp3_path))
+
+        album_info = {
+            "title": "Album",
+            "artist": {"artistName": "Artist"},
+            "releaseDate": "2023",
+            "trackCount": 1,
+        }
+        with patch("metadata.MP3") as mock_mp3:
+            assert metadata.tag_mp3(
+                str(mp3_path), {"title": "Song", "trackNumber": 1},
+                album_info, None,
+            ) is True
+            mock_mp3.assert_not_called()
+        assert str(ID3(str(mp3_path))["TIT2"]) == "Song"
+
+    @patch("metadata.get_monitored_release", return_value=None)
+    def test_untagged_file_gets_fresh_v23_tag(self, mock_release, tmp_path):
+        """A bare ffmpeg output is validated once and tagged from scratch."""
+        from mutagen.id3 import ID3
+        from mutagen.mp3 import MP3
+
+        mp3_path = _create_minimal_mp3(tmp_path / "bare.mp3")
+        album_info = {
+            "title": "Album",
+            "artist": {"artistName": "Artist"},
+            "releaseDate": "2023",
+            "trackCount": 1,
+        }
+        with patch("metadata.MP3", wraps=MP3) as mock_mp3:
+            assert metadata.tag_mp3(
+                str(mp3_path), {"title": "Song", "trackNumber": 1},
+                album_info, None,
+            ) is True
+        mock_mp3.assert_called_once_with(str(mp3_path))
+        tags = ID3(str(mp3_path))
+        assert tags.version == (2, 3, 0)
+        assert str(tags["TIT2"]) == "Song"
+
+    @patch("metadata.get_monitored_release", return_value=None)
+    def test_writes_file_once(self, mock_release, tmp_path):
+        """Tags are built in memory and saved with a single write."""
+        from mutagen.id3 import ID3
+
+        mp3_path = _create_minimal_mp3(tmp_path / "once.mp3")
+        album_info = {
+            "title": "Album",
+            "artist": {"artistName": "Artist"},
+            "releaseDate": "2023",
+            "trackCount": 1,
+        }
+        with patch.object(ID3, "save", autospec=True) as mock_save:
+            assert metadata.tag_mp3(
+                str(mp3_path), {"title": "Song", "trackNumber": 1},
+                album_info, b"img",
+            ) is True
+        mock_save.assert_called_once()
+        assert mock_save.call_args.kwargs == {"v2_version": 3}
+
+    @patch("metadata.get_monitored_release")
+    def test_uses_precomputed_album_fields(self, mock_release, tmp_path):
+        from mutagen.id3 import ID3
+
+        mp3_path = _create_minimal_mp3(tmp_path / "fields.mp3")
+        fields = {
+            "artist": "Ctx Artist",
+            "album": "Ctx Album",
+            "year": "1999",
+            "track_count": 4,
+            "musicbrainz": [("rel-1", "MusicBrainz Album Id")],
+        }
+        assert metadata.tag_mp3(
+            str(mp3_path), {"title": "Song", "trackNumber": 2},
+            {}, None, fields,
+        ) is True
+        mock_release.assert_not_called()
+        tags = ID3(str(mp3_path))
+        assert str(tags["TPE1"]) == "Ctx Artist"
+        assert str(tags["TRCK"]) == "2/4"
+        assert str(tags["TXXX:MusicBrainz Album Id"]) == "rel-1"
+
+    @patch("metadata.get_monitored_release", return_value=None)
+    def test_retag_replaces_frames_instead_of_merging(
+        self, mock_release, tmp_path
+    ):
+        from mutagen.id3 import ID3
+
+        mp3_path = _create_minimal_mp3(tmp_path / "retag.mp3")
+        album_info = {
+            "title": "Album",
+            "artist": {"artistName": "Artist"},
+            "releaseDate": "2023",
+            "trackCount": 1,
+        }
+        for title, cover in (("Old", b"old"), ("New", b"new")):
+            assert metadata.tag_mp3(
+                str(mp3_path), {"title": title, "trackNumber": 1},
+                album_info, cover,
+            ) is True
+        tags = ID3(str(mp3_path))
+        assert tags["TIT2"].text == ["New"]
+        assert [f.data for f in tags.getall("APIC")] == [b"new"]
+
     def test_returns_false_on_invalid_file(self, tmp_path):
         bad_file = tmp_path / "not_mp3.txt"
         bad_file.write_text("not an mp3")
@@ -237,6 +515,39 @@ class TestTagMp3:
         assert result is False
 
 
+class TestAlbumTagFields:
+    def test_collects_album_level_values(self):
+        fields = metadata.album_tag_fields({
+            "title": "Album",
+            "artist": {"artistName": "Artist", "foreignArtistId": "art"},
+            "releaseDate": "2024-01-15",
+            "trackCount": 9,
+            "foreignAlbumId": "grp",
+            "releases": [{"monitored": True, "foreignReleaseId": "rel"}],
+        })
+        assert fields["artist"] == "Artist"
+        assert fields["year"] == "2024"
+        assert fields["track_count"] == 9
+        assert ("rel", "MusicBrainz Album Id") in fields["musicbrainz"]
+        assert ("grp", "MusicBrainz Album Release Group Id") in (
+            fields["musicbrainz"]
+        )
+
+    def test_no_releases_skips_musicbrainz(self):
+        fields = metadata.album_tag_fields({"title": "A", "artist": {}})
+        assert fields["musicbrainz"] is None
+        assert fields["year"] == ""
+
+
+def _image_response(*chunks, headers=None):
+    """Mock a streamed requests response yielding the given chunks."""
+    resp = MagicMock()
+    resp.__enter__.return_value = resp
+    resp.headers = headers or {}
+    resp.iter_content.return_value = iter(chunks)
+    return resp
+
+
 def _create_minimal_mp3(path):
     """Create a minimal valid MP3 file for testing."""
     from mutagen.mp3 import MP3
@@ -1,4 +1,6 @@
+import sqlite3
 import time
+from unittest.mock import patch
 
 import pytest
 
@@ -268,6 +270,35 @@ def test_add_log_track_level_id():
     assert "_1_3" in log_id
 
 
+def test_add_logs_inserts_all_in_one_transaction():
+    ids = models.add_logs([
+        {"log_type": "track_failure", "album_id": 1, "album_title": "A",
+         "artist_name": "B", "details": "x", "track_number": n}
+        for n in (1, 2)
+    ])
+    assert [i.split("_", 2)[2] for i in ids] == ["1_0", "2_1"]
+    assert models.get_logs(log_type="track_failure")["total"] == 2
+
+
+def test_add_logs_ids_unique_when_track_numbers_repeat():
+    # Disc 1 and disc 2 both have a track 1.
+    entry = {"log_type": "track_failure", "album_id": 1,
+             "album_title": "A", "artist_name": "B", "track_number": 1}
+    ids = models.add_logs([entry, entry])
+    assert len(set(ids)) == 2
+    assert models.get_logs()["total"] == 2
+
+
+def test_add_logs_writes_nothing_on_duplicate_id():
+    entry = {"log_type": "track_failure", "album_id": 1,
+             "album_title": "A", "artist_name": "B", "track_number": 1}
+    with patch("models.time.time", return_value=1000.0):
+        models.add_log(**entry, seq=1)
+        with pytest.raises(sqlite3.IntegrityError):
+            models.add_logs([entry, entry])
+    assert models.get_logs()["total"] == 1
+
+
 def test_get_logs_filter_by_type():
     models.add_log("download_success", 1, "A", "A", details="ok")
     models.add_log("album_error", 2, "B", "B", details="fail")
@@ -354,6 +385,24 @@ def test_enqueue_duplicate_ignored():
     assert len(models.get_queue()) == 1
 
 
+def test_enqueue_albums_appends_new_ids_once():
+    models.enqueue_album(10)
+    assert models.enqueue_albums([20, 10, 30, 20]) == 2
+    queue = models.get_queue()
+    assert [row["album_id"] for row in queue] == [10, 20, 30]
+    assert [row["position"] for row in queue] == [1, 2, 3]
+    assert models.enqueue_albums([10, 30]) == 0
+
+
+def test_pop_and_dequeue_leave_order_intact():
+    models.enqueue_albums([10, 20, 30, 40])
+    assert models.pop_next_from_queue() == 10
+    models.dequeue_album(30)
+    models.enqueue_album(50)
+    assert [row["album_id"] for row in models.get_queue()] == [20, 40, 50]
+    assert models.pop_next_from_queue() == 20
+
+
 def test_dequeue_album():
     models.enqueue_album(10)
     models.enqueue_album(20)
@@ -654,6 +703,41 @@ class TestCandidateAttempts:
         rows = models.get_candidate_attempts(td_id)
         assert len(rows) == 0
 
+    def test_get_candidate_attempts_for_downloads_groups_by_id(self):
+        td_ids = [
+            models.add_track_download(
+                album_id=1, album_title="A", artist_name="A",
+                track_title=f"T{n}", track_number=n, success=True,
+                error_message="", youtube_url="", youtube_title="",
+                match_score=0.0, duration_seconds=0,
+                album_path="", lidarr_album_path="", cover_url="",
+            )
+            for n in (1, 2)
+        ]
+        for td_id, ts in zip(td_ids, (2000.0, 1000.0)):
+            models.flush_candidate_attempts(td_id, [{
+                "youtube_url": f"https://yt/{td_id}",
+                "youtube_title": "C",
+                "match_score": 0.9,
+                "duration_seconds": 200,
+                "outcome": CandidateOutcome.MISMATCH,
+                "acoustid_matched_id": "",
+                "acoustid_matched_title": "",
+                "acoustid_score": 0.0,
+                "expected_recording_id": "",
+                "error_message": "",
+                "timestamp": ts,
+            }])
+        result = models.get_candidate_attempts_for_downloads(
+            [*td_ids, 999],
+        )
+        assert [r["youtube_url"] for r in result[td_ids[0]]] == [
+            f"https://yt/{td_ids[0]}",
+        ]
+        assert len(result[td_ids[1]]) == 1
+        assert result[999] == []
+        assert models.get_candidate_attempts_for_downloads([]) == {}
+
     def test_get_candidate_attempts_ordered_by_timestamp(self):
         td_id = models.add_track_download(
             album_id=1, album_title="A", artist_name="A",
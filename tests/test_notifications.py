@@ -1,5 +1,6 @@
 """Tests for notifications module — Telegram and Discord webhooks."""
 
+import threading
 from unittest.mock import patch, MagicMock
 
 import pytest
@@ -7,6 +8,14 @@ import pytest
 import notifications
 
 
+@pytest.fixture(autouse=True)
+def _deliver_inline(monkeypatch):
+    """Deliver on the calling thread so tests can assert on the post."""
+    monkeypatch.setattr(
+        notifications, "_enqueue", lambda func, *args: func(*args),
+    )
+
+
 @pytest.fixture
 def mock_config():
     return {
@@ -23,7 +32,7 @@ def mock_config():
 # --- send_telegram ---
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_telegram_sends_message(mock_cfg, mock_post, mock_config):
     mock_cfg.return_value = mock_config
@@ -35,7 +44,7 @@ def test_send_telegram_sends_message(mock_cfg, mock_post, mock_config):
     assert payload["chat_id"] == "chat456"
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_telegram_filters_log_type(
     mock_cfg, mock_post, mock_config
@@ -45,7 +54,7 @@ def test_send_telegram_filters_log_type(
     mock_post.assert_not_called()
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_telegram_no_log_type_sends(
     mock_cfg, mock_post, mock_config
@@ -56,7 +65,7 @@ def test_send_telegram_no_log_type_sends(
     mock_post.assert_called_once()
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_telegram_disabled(mock_cfg, mock_post, mock_config):
     mock_config["telegram_enabled"] = False
@@ -65,7 +74,7 @@ def test_send_telegram_disabled(mock_cfg, mock_post, mock_config):
     mock_post.assert_not_called()
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_telegram_missing_token(mock_cfg, mock_post, mock_config):
     mock_config["telegram_bot_token"] = ""
@@ -74,7 +83,7 @@ def test_send_telegram_missing_token(mock_cfg, mock_post, mock_config):
     mock_post.assert_not_called()
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_telegram_missing_chat_id(mock_cfg, mock_post, mock_config):
     mock_config["telegram_chat_id"] = ""
@@ -83,7 +92,7 @@ def test_send_telegram_missing_chat_id(mock_cfg, mock_post, mock_config):
     mock_post.assert_not_called()
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_telegram_exception_logged(
     mock_cfg, mock_post, mock_config, caplog
@@ -94,7 +103,7 @@ def test_send_telegram_exception_logged(
     assert "Telegram notification failed" in caplog.text
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_telegram_non_200_logged(
     mock_cfg, mock_post, mock_config, caplog
@@ -112,7 +121,7 @@ def test_send_telegram_non_200_logged(
     assert "bad photo url" in caplog.text
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_discord_non_2xx_logged(
     mock_cfg, mock_post, mock_config, caplog
@@ -129,7 +138,7 @@ def test_send_discord_non_2xx_logged(
 # --- send_discord ---
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_discord_sends_plain_message(
     mock_cfg, mock_post, mock_config
@@ -142,7 +151,7 @@ def test_send_discord_sends_plain_message(
     assert payload["content"] == "plain msg"
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_discord_sends_embed(mock_cfg, mock_post, mock_config):
     mock_cfg.return_value = mock_config
@@ -162,7 +171,7 @@ def test_send_discord_sends_embed(mock_cfg, mock_post, mock_config):
     assert payload["embeds"][0]["color"] == 0xFF0000
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_discord_embed_with_thumbnail(
     mock_cfg, mock_post, mock_config
@@ -181,7 +190,7 @@ def test_send_discord_embed_with_thumbnail(
     assert payload["embeds"][0]["thumbnail"]["url"] == embed["thumbnail"]
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_discord_embed_with_fields(
     mock_cfg, mock_post, mock_config
@@ -197,7 +206,7 @@ def test_send_discord_embed_with_fields(
     assert payload["embeds"][0]["fields"] == fields
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_discord_filters_log_type(
     mock_cfg, mock_post, mock_config
@@ -207,7 +216,7 @@ def test_send_discord_filters_log_type(
     mock_post.assert_not_called()
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_discord_disabled(mock_cfg, mock_post, mock_config):
     mock_config["discord_enabled"] = False
@@ -216,7 +225,7 @@ def test_send_discord_disabled(mock_cfg, mock_post, mock_config):
     mock_post.assert_not_called()
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_discord_no_webhook_url(mock_cfg, mock_post, mock_config):
     mock_config["discord_webhook_url"] = ""
@@ -225,7 +234,7 @@ def test_send_discord_no_webhook_url(mock_cfg, mock_post, mock_config):
     mock_post.assert_not_called()
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_discord_no_log_type_sends(
     mock_cfg, mock_post, mock_config
@@ -235,7 +244,7 @@ def test_send_discord_no_log_type_sends(
     mock_post.assert_called_once()
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_discord_exception_logged(
     mock_cfg, mock_post, mock_config, caplog
@@ -249,7 +258,7 @@ def test_send_discord_exception_logged(
 # --- send_notifications ---
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_notifications_calls_both(
     mock_cfg, mock_post, mock_config
@@ -259,7 +268,17 @@ def test_send_notifications_calls_both(
     assert mock_post.call_count == 2
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
+@patch("notifications.load_config")
+def test_send_notifications_loads_config_once(
+    mock_cfg, mock_post, mock_config
+):
+    mock_cfg.return_value = mock_config
+    notifications.send_notifications("msg", log_type="album_error")
+    mock_cfg.assert_called_once_with()
+
+
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_notifications_passes_embed(
     mock_cfg, mock_post, mock_config
@@ -279,7 +298,7 @@ def test_send_notifications_passes_embed(
     assert "embeds" in payload
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_notifications_filtered_sends_none(
     mock_cfg, mock_post, mock_config
@@ -333,7 +352,7 @@ def test_build_musicbrainz_link_empty():
 # --- Telegram sendPhoto path ---
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_telegram_uses_sendphoto_when_photo_url(
     mock_cfg, mock_post, mock_config
@@ -354,7 +373,7 @@ def test_send_telegram_uses_sendphoto_when_photo_url(
     assert payload["parse_mode"] == "MarkdownV2"
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_telegram_uses_sendmessage_without_photo(
     mock_cfg, mock_post, mock_config
@@ -371,7 +390,7 @@ def test_send_telegram_uses_sendmessage_without_photo(
     assert payload["parse_mode"] == "MarkdownV2"
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_telegram_truncates_long_caption(
     mock_cfg, mock_post, mock_config
@@ -386,7 +405,7 @@ def test_send_telegram_truncates_long_caption(
     assert len(payload["caption"]) <= 1024
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_telegram_disable_notification_passthrough(
     mock_cfg, mock_post, mock_config
@@ -402,7 +421,7 @@ def test_send_telegram_disable_notification_passthrough(
 # --- send_notifications routes telegram-specific body ---
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_notifications_uses_telegram_message_when_provided(
     mock_cfg, mock_post, mock_config
@@ -423,7 +442,7 @@ def test_send_notifications_uses_telegram_message_when_provided(
     assert tg_payload["photo"] == "https://i/c.jpg"
 
 
-@patch("notifications.requests.post")
+@patch("notifications.http_session.post")
 @patch("notifications.load_config")
 def test_send_discord_embed_with_url(mock_cfg, mock_post, mock_config):
     mock_cfg.return_value = mock_config
@@ -433,3 +452,82 @@ def test_send_discord_embed_with_url(mock_cfg, mock_post, mock_config):
     )
     payload = mock_post.call_args.kwargs["json"]
     assert payload["embeds"][0]["url"] == "http://l/album/x"
+
+
+# --- background delivery ---
+
+
+@patch("notifications.http_session.post")
+@patch("notifications.load_config")
+def test_delivery_happens_off_the_calling_thread(
+    mock_cfg, mock_post, mock_config, monkeypatch
+):
+    monkeypatch.undo()
+    mock_cfg.return_value = mock_config
+    delivered = threading.Event()
+    caller = threading.current_thread()
+    threads = []
+
+    def fake_post(*args, **kwargs):
+        threads.append(threading.current_thread())
+        delivered.set()
+        return MagicMock(status_code=200)
+
+    mock_post.side_effect = fake_post
+    notifications.send_telegram("msg", log_type="album_error")
+    assert delivered.wait(2)
+    assert threads[0] is not caller
+    assert threads[0].daemon
+
+
+def _tg(text, **extra):
+    payload = {"chat_id": "c", "text": text, "disable_notification": False}
+    payload.update(extra)
+    return (notifications._post_telegram, ("https://tg/sendMessage", payload))
+
+
+def test_coalesce_merges_consecutive_plain_messages():
+    merged = notifications._coalesce_telegram([_tg("one"), _tg("two")])
+    assert len(merged) == 1
+    assert merged[0][1][1]["text"] == "one\n\ntwo"
+
+
+def test_coalesce_keeps_incompatible_messages_apart():
+    discord = (notifications._post_discord, ("https://discord", {}))
+    photo = (notifications._post_telegram, (
+        "https://tg/sendPhoto", {"chat_id": "c", "caption": "cap"},
+    ))
+    batch = [
+        _tg("a"), _tg("b", parse_mode="MarkdownV2"), discord, _tg("c"),
+        photo, _tg("x" * notifications._TELEGRAM_TEXT_LIMIT), _tg("d"),
+    ]
+    assert len(notifications._coalesce_telegram(batch)) == len(batch)
+
+
+def test_flush_waits_for_queued_deliveries(monkeypatch):
+    monkeypatch.undo()
+    delivered = []
+    notifications._enqueue(delivered.append, "sent")
+    assert notifications.flush_notifications(timeout=2)
+    assert delivered == ["sent"]
+
+
+def test_batch_posts_telegram_and_discord_concurrently(monkeypatch):
+    both_in_flight = threading.Barrier(2, timeout=2)
+    calls = []
+
+    def post(channel):
+        def fake(*args):
+            both_in_flight.wait()
+            calls.append(channel)
+        return fake
+
+    monkeypatch.setattr(notifications, "_post_telegram", post("telegram"))
+    monkeypatch.setattr(notifications, "_post_discord", post("discord"))
+    notifications._deliver_batch([
+        (notifications._post_telegram, ("https://tg", {})),
+        (notifications._post_discord, ("https://discord", {})),
+        (calls.append, ("flushed",)),
+    ])
+    assert sorted(calls[:2]) == ["discord", "telegram"]
+    assert calls[2] == "flushed"
@@ -7,6 +7,7 @@ import pytest
 
 import db
 import models
+import utils
 from models import CandidateOutcome
 
 
@@ -35,6 +36,18 @@ def _make_album_ctx(**overrides):
     return ctx
 
 
+def _track_states(tracks):
+    """Build the pending download_process["tracks"] entries for tracks."""
+    return [
+        {"track_title": t["title"],
+         "track_number": int(t["trackNumber"]),
+         "status": "pending", "youtube_url": "", "youtube_title": "",
+         "progress_percent": "", "progress_speed": "",
+         "error_message": "", "skip": False}
+        for t in tracks
+    ]
+
+
 class TestDownloadTracks:
     """_download_tracks calls add_track_download per track."""
 
@@ -79,13 +92,7 @@ class TestDownloadTracks:
         mock_dl_candidate.side_effect = fake_download
 
         download_process["stop"] = False
-        download_process["tracks"] = [
-            {"track_title": track["title"],
-             "track_number": int(track["trackNumber"]),
-             "status": "pending", "youtube_url": "", "youtube_title": "",
-             "progress_percent": "", "progress_speed": "",
-             "error_message": "", "skip": False},
-        ]
+        download_process["tracks"] = _track_states([track])
         download_process["current_track_index"] = -1
 
         album_ctx = _make_album_ctx(
@@ -103,6 +110,8 @@ class TestDownloadTracks:
         assert tracks[0]["youtube_url"] == (
             "https://youtube.com/watch?v=abc"
         )
+        # Config is read once per album, not again per track/candidate.
+        mock_config.assert_called_once_with()
         download_process["tracks"] = []
         download_process["current_track_index"] = -1
 
@@ -136,13 +145,7 @@ class TestDownloadTracks:
         }
 
         download_process["stop"] = False
-        download_process["tracks"] = [
-            {"track_title": track["title"],
-             "track_number": int(track["trackNumber"]),
-             "status": "pending", "youtube_url": "", "youtube_title": "",
-             "progress_percent": "", "progress_speed": "",
-             "error_message": "", "skip": False},
-        ]
+        download_process["tracks"] = _track_states([track])
         download_process["current_track_index"] = -1
 
         failed, _, size, _stats = _download_tracks(
@@ -157,6 +160,497 @@ class TestDownloadTracks:
         download_process["tracks"] = []
         download_process["current_track_index"] = -1
 
+    @patch("processing.search_youtube_candidates")
+    @patch("processing.load_config", return_value={
+        "xml_metadata_enabled": False,
+        "acoustid_enabled": False,
+        "concurrent_tracks": 2,
+    })
+    def test_tracks_download_in_parallel(
+        self, mock_config, mock_search, tmp_path,
+    ):
+        """Both workers must be searching at once to pass the barrier."""
+        import threading
+
+        from processing import _download_tracks, download_process
+
+        barrier = threading.Barrier(2, timeout=5)
+
+        def fake_search(*args, **kwargs):
+            barrier.wait()
+            return []
+        mock_search.side_effect = fake_search
+
+        tracks = [
+            {"title": f"T{n}", "trackNumber": n, "duration": 1000}
+            for n in (1, 2)
+        ]
+        download_process["stop"] = False
+        download_process["tracks"] = _track_states(tracks)
+        try:
+            failed, _, _, _ = _download_tracks(
+                tracks, str(tmp_path), {"tracks": tracks},
+                _make_album_ctx(),
+            )
+            assert not barrier.broken
+            assert len(failed) == 2
+        finally:
+            download_process["tracks"] = []
+            download_process["current_track_index"] = -1
+
+    @patch("processing.search_youtube_candidates")
+    @patch("processing.load_config", return_value={
+        "xml_metadata_enabled": False,
+        "acoustid_enabled": False,
+        "concurrent_tracks": 1,
+    })
+    @patch("processing.TRACK_STOP_POLL_INTERVAL", 0.05)
+    def test_stop_marks_remaining_tracks_skipped(
+        self, mock_config, mock_search, tmp_path,
+    ):
+        """A stop while the only worker is busy cancels the queued tracks."""
+        import time
+
+        from processing import _download_tracks, download_process
+
+        def stop_during_search(*args, **kwargs):
+            download_process["stop"] = True
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                if download_process["tracks"][2]["status"] == "skipped":
+                    break
+                time.sleep(0.01)
+            return []
+        mock_search.side_effect = stop_during_search
+
+        tracks = [
+            {"title": f"T{n}", "trackNumber": n, "duration": 1000}
+            for n in (1, 2, 3)
+        ]
+        download_process["stop"] = False
+        download_process["tracks"] = _track_states(tracks)
+        try:
+            _download_tracks(
+                tracks, str(tmp_path), {"tracks": tracks},
+                _make_album_ctx(),
+            )
+            assert mock_search.call_count == 1
+            assert [
+                t["status"] for t in download_process["tracks"][1:]
+            ] == ["skipped", "skipped"]
+        finally:
+            download_process["stop"] = False
+            download_process["tracks"] = []
+            download_process["current_track_index"] = -1
+
+
+class TestTrackWorkerCount:
+    def test_clamps_to_maximum(self):
+        from processing import MAX_CONCURRENT_TRACKS, _track_worker_count
+        assert _track_worker_count(
+            {"concurrent_tracks": 50}, 20,
+        ) == MAX_CONCURRENT_TRACKS
+
+    def test_never_exceeds_track_count(self):
+        from processing import _track_worker_count
+        assert _track_worker_count({"concurrent_tracks": 4}, 2) == 2
+        assert _track_worker_count({"concurrent_tracks": 4}, 0) == 1
+
+    def test_coerces_string_and_invalid_values(self):
+        from processing import _track_worker_count
+        assert _track_worker_count({"concurrent_tracks": "3"}, 10) == 3
+        assert _track_worker_count({"concurrent_tracks": "x"}, 10) == 2
+        assert _track_worker_count({"concurrent_tracks": 0}, 10) == 1
+
+
+class TestFilterTracks:
+    TRACKS = [
+        {"title": "One", "trackNumber": 1},
+        {"title": "Two", "trackNumber": 2},
+        {"title": "Three", "trackNumber": 3, "hasFile": True},
+    ]
+
+    def test_skips_existing_files_in_any_format(self, tmp_path):
+        from processing import _filter_tracks
+        (tmp_path / "01 - One.opus").write_bytes(b"x")
+        result = _filter_tracks(self.TRACKS, False, str(tmp_path))
+        assert [t["title"] for t in result] == ["Two"]
+
+    def test_missing_album_dir_keeps_all_without_files(self, tmp_path):
+        from processing import _filter_tracks
+        result = _filter_tracks(
+            self.TRACKS, False, str(tmp_path / "missing"),
+        )
+        assert [t["title"] for t in result] == ["One", "Two"]
+
+    def test_force_keeps_everything(self, tmp_path):
+        from processing import _filter_tracks
+        (tmp_path / "01 - One.mp3").write_bytes(b"x")
+        assert _filter_tracks(self.TRACKS, True, str(tmp_path)) == (
+            self.TRACKS
+        )
+
+
+class TestTrackNumber:
+    def test_parses_numeric_strings(self):
+        from processing import _track_number
+        assert _track_number({"trackNumber": "07"}, 1) == 7
+
+    @pytest.mark.parametrize("track", [{}, {"trackNumber": "A1"},
+                                       {"trackNumber": None}])
+    def test_falls_back_to_default(self, track):
+        from processing import _track_number
+        assert _track_number(track, 3) == 3
+
+
+class TestAcceptTrackFile:
+    def test_renames_in_place_without_copying(self, tmp_path):
+        from processing import _accept_track_file
+        src = tmp_path / "temp_01_abcd.m4a"
+        src.write_bytes(b"audio")
+        track_state = {"status": "tagging"}
+        with patch("processing.os.replace", wraps=os.replace) as replace, \
+                patch("processing.shutil") as mock_shutil:
+            size, _ = _accept_track_file(
+                str(src), 1, "Song", {}, {},
+                track_state=track_state, track_title="Song",
+                album_path=str(tmp_path), album_ctx=_make_album_ctx(),
+                xml_metadata=False,
+            )
+        final = tmp_path / "01 - Song.m4a"
+        replace.assert_called_once_with(str(src), str(final))
+        assert not mock_shutil.method_calls
+        assert size == 5
+        assert final.read_bytes() == b"audio"
+        assert track_state["status"] == "done"
+
+
+class TestCopyToLidarr:
+    @staticmethod
+    def _album(tmp_path):
+        album = tmp_path / "downloads" / "Artist" / "Album"
+        album.mkdir(parents=True)
+        (album / "01 - Song.mp3").write_bytes(b"audio")
+        return album
+
+    def test_same_device_moves_files(self, tmp_path):
+        from processing import _copy_to_lidarr
+        album = self._album(tmp_path)
+        with patch("processing.shutil") as mock_shutil:
+            import_path, lidarr_album = _copy_to_lidarr(
+                str(tmp_path / "music"), str(album), "Artist", "Album",
+            )
+        assert import_path == lidarr_album
+        assert not mock_shutil.method_calls
+        assert not (album / "01 - Song.mp3").exists()
+        moved = tmp_path / "music" / "Artist" / "Album" / "01 - Song.mp3"
+        assert moved.read_bytes() == b"audio"
+
+    def test_same_device_transfer_keeps_the_inode(self, tmp_path):
+        from processing import _copy_to_lidarr
+        album = self._album(tmp_path)
+        inode = os.stat(str(album / "01 - Song.mp3")).st_ino
+        _, lidarr_album = _copy_to_lidarr(
+            str(tmp_path / "music"), str(album), "Artist", "Album",
+        )
+        moved = os.path.join(lidarr_album, "01 - Song.mp3")
+        assert os.stat(moved).st_ino == inode
+        assert os.stat(moved).st_nlink == 1
+
+    def test_only_new_folders_get_permissions_fixed(
+        self, tmp_path, monkeypatch
+    ):
+        from processing import _copy_to_lidarr
+        monkeypatch.setenv("UMASK", "022")
+        album = self._album(tmp_path)
+        os.chmod(str(album / "01 - Song.mp3"), 0o644)
+        with patch("processing.set_permissions",
+                   wraps=utils.set_permissions) as mock_perms:
+            _, lidarr_album = _copy_to_lidarr(
+                str(tmp_path / "music"), str(album), "Artist", "Album",
+            )
+        assert all(
+            c.kwargs == {"recursive": False}
+            for c in mock_perms.call_args_list
+        )
+        assert os.stat(lidarr_album).st_mode & 0o777 == 0o755
+        moved = os.path.join(lidarr_album, "01 - Song.mp3")
+        assert os.stat(moved).st_mode & 0o777 == 0o644
+
+    def test_subdirectories_and_symlinks_stay_behind(self, tmp_path):
+        from processing import _copy_to_lidarr
+        album = self._album(tmp_path)
+        (album / "scratch").mkdir()
+        (album / "link.mp3").symlink_to(album / "01 - Song.mp3")
+        _, lidarr_album = _copy_to_lidarr(
+            str(tmp_path / "music"), str(album), "Artist", "Album",
+        )
+        assert sorted(os.listdir(lidarr_album)) == ["01 - Song.mp3"]
+
+    def test_cross_device_falls_back_to_copy(self, tmp_path):
+        import errno
+        from processing import _copy_to_lidarr
+        album = self._album(tmp_path)
+        with patch("processing.os.replace",
+                   side_effect=OSError(errno.EXDEV, "cross-device")):
+            import_path, lidarr_album = _copy_to_lidarr(
+                str(tmp_path / "music"), str(album), "Artist", "Album",
+            )
+        assert import_path == lidarr_album
+        assert (album / "01 - Song.mp3").exists()
+        copied = tmp_path / "music" / "Artist" / "Album" / "01 - Song.mp3"
+        assert copied.read_bytes() == b"audio"
+
+    def test_one_failed_file_does_not_stop_the_rest(self, tmp_path):
+        from processing import _copy_to_lidarr
+        album = self._album(tmp_path)
+        (album / "02 - Bad.mp3").write_bytes(b"audio")
+        (album / "03 - Song.mp3").write_bytes(b"audio")
+        real_replace = os.replace
+
+        def flaky_replace(src, dst):
+            if "Bad" in src:
+                raise PermissionError("denied")
+            return real_replace(src, dst)
+
+        with patch("processing.os.replace", side_effect=flaky_replace), \
+                patch("processing.send_notifications") as mock_notify:
+            import_path, lidarr_album = _copy_to_lidarr(
+                str(tmp_path / "music"), str(album), "Artist", "Album",
+            )
+        assert import_path == str(album)
+        assert os.listdir(lidarr_album) == []
+        assert sorted(os.listdir(album)) == [
+            "01 - Song.mp3", "02 - Bad.mp3", "03 - Song.mp3",
+        ]
+        assert "02 - Bad.mp3" in mock_notify.call_args.args[0]
+
+    def test_failed_cross_device_copy_removes_the_copies(self, tmp_path):
+        import errno
+        from processing import _copy_to_lidarr
+        album = self._album(tmp_path)
+        (album / "02 - Bad.mp3").write_bytes(b"audio")
+
+        def copy_or_fail(src, dst):
+            if "Bad" in src:
+                raise PermissionError("denied")
+            (tmp_path / "music" / "Artist" / "Album" / "01 - Song.mp3"
+             ).write_bytes(b"audio")
+
+        with patch("processing.os.replace",
+                   side_effect=OSError(errno.EXDEV, "cross-device")), \
+                patch("processing._copy_file", side_effect=copy_or_fail), \
+                patch("processing.send_notifications"):
+            import_path, lidarr_album = _copy_to_lidarr(
+                str(tmp_path / "music"), str(album), "Artist", "Album",
+            )
+        assert import_path == str(album)
+        assert os.listdir(lidarr_album) == []
+        assert sorted(os.listdir(album)) == ["01 - Song.mp3", "02 - Bad.mp3"]
+
+    def test_copy_without_sendfile_uses_large_buffer(
+        self, tmp_path, monkeypatch
+    ):
+        import shutil
+        from processing import LIDARR_COPY_BUFSIZE, _copy_file
+        monkeypatch.delattr(os, "sendfile", raising=False)
+        src = tmp_path / "src.mp3"
+        src.write_bytes(b"audio")
+        os.utime(str(src), (1000000000, 1000000000))
+        dst = tmp_path / "dst.mp3"
+        with patch("processing.shutil.copyfileobj",
+                   wraps=shutil.copyfileobj) as copyfileobj:
+            _copy_file(str(src), str(dst))
+        assert copyfileobj.call_args.args[2] == LIDARR_COPY_BUFSIZE
+        assert dst.read_bytes() == b"audio"
+        assert os.stat(str(dst)).st_mtime == 1000000000
+
+    def test_lidarr_path_equal_to_download_dir_is_left_alone(
+        self, tmp_path
+    ):
+        from processing import _copy_to_lidarr
+        album = self._album(tmp_path)
+        downloads = str(tmp_path / "downloads")
+        with patch("processing.DOWNLOAD_DIR", downloads):
+            import_path, _ = _copy_to_lidarr(
+                downloads, str(album), "Artist", "Album",
+            )
+        assert import_path == str(album)
+        assert (album / "01 - Song.mp3").exists()
+
+
+class TestAlbumCover:
+    def test_plain_bytes_returned_as_is(self):
+        from processing import _album_cover
+        assert _album_cover({"cover_data": b"img"}) == b"img"
+        assert _album_cover({"cover_data": None}) is None
+
+    def test_waits_for_pending_fetch(self):
+        from concurrent.futures import Future
+        from processing import _album_cover
+        future = Future()
+        future.set_result(b"img")
+        assert _album_cover({"cover_data": future}) == b"img"
+
+    def test_failed_fetch_yields_none(self):
+        from concurrent.futures import Future
+        from processing import _album_cover
+        future = Future()
+        future.set_exception(RuntimeError("boom"))
+        assert _album_cover({"cover_data": future}) is None
+
+    def test_timed_out_fetch_is_waited_for_once(self):
+        from concurrent.futures import Future
+        from processing import _album_cover
+        album_ctx = {"cover_data": Future()}
+        with patch("processing.COVER_FETCH_TIMEOUT", 0):
+            assert _album_cover(album_ctx) is None
+        # Later tracks get the stored outcome instead of waiting again.
+        assert album_ctx["cover_data"] is None
+        assert _album_cover(album_ctx) is None
+
+    def test_save_writes_cover_file(self, tmp_path):
+        from processing import _save_album_cover
+        _save_album_cover(str(tmp_path), b"jpeg")
+        assert (tmp_path / "cover.jpg").read_bytes() == b"jpeg"
+
+    def test_retry_reuses_saved_cover(self, tmp_path):
+        from processing import _load_album_cover, _save_album_cover
+        assert _load_album_cover(str(tmp_path)) is None
+        _save_album_cover(str(tmp_path), b"jpeg")
+        assert _load_album_cover(str(tmp_path)) == b"jpeg"
+
+    def test_save_without_artwork_writes_nothing(self, tmp_path):
+        from processing import _save_album_cover
+        _save_album_cover(str(tmp_path / "gone"), None)
+        assert not (tmp_path / "gone").exists()
+
+
+class TestDownloadSlot:
+    @pytest.fixture(autouse=True)
+    def _release_slot(self):
+        from processing import download_process
+        yield
+        download_process["active"] = False
+        download_process["album_id"] = None
+        download_process["tracks"] = []
+        download_process["current_track_index"] = -1
+
+    def test_second_claim_is_refused(self):
+        from processing import claim_download_slot, download_process
+        assert claim_download_slot(7, album_title="Seven") is True
+        assert download_process["album_title"] == "Seven"
+        assert claim_download_slot(8) is False
+        assert download_process["album_id"] == 7
+
+    def test_waiting_claim_takes_slot_once_released(self):
+        import threading
+        from processing import (
+            claim_download_slot, download_process, release_download_slot,
+        )
+        claim_download_slot(7)
+        claimed = []
+        waiter = threading.Thread(
+            target=lambda: claimed.append(claim_download_slot(8, timeout=5)),
+        )
+        waiter.start()
+        with patch("processing.wake_queue_processor"):
+            release_download_slot()
+        waiter.join(5)
+        assert claimed == [True]
+        assert download_process["album_id"] == 8
+
+    def test_release_resets_slot_state(self):
+        from processing import (
+            claim_download_slot, download_process, release_download_slot,
+        )
+        claim_download_slot(
+            7, album_title="Seven", tracks=[{"track_title": "T"}],
+        )
+        with patch("processing.wake_queue_processor") as mock_wake:
+            release_download_slot()
+        mock_wake.assert_called_once()
+        assert download_process["active"] is False
+        assert download_process["album_id"] is None
+        assert download_process["album_title"] == ""
+        assert download_process["tracks"] == []
+
+    def test_waiting_claim_times_out(self):
+        from processing import claim_download_slot, download_process
+        claim_download_slot(7)
+        assert claim_download_slot(8, timeout=0.05) is False
+        assert download_process["album_id"] == 7
+
+    def test_busy_slot_leaves_queue_untouched(self):
+        from processing import _claim_next_queued_album, claim_download_slot
+        models.enqueue_album(11)
+        claim_download_slot(7)
+        assert _claim_next_queued_album() is None
+        assert [row["album_id"] for row in models.get_queue()] == [11]
+
+    def test_frozen_slot_refuses_every_claim(self):
+        from processing import (
+            _claim_next_queued_album, claim_download_slot,
+            freeze_download_slot, unfreeze_download_slot,
+        )
+        models.enqueue_album(11)
+        assert freeze_download_slot() is True
+        try:
+            assert claim_download_slot(7) is False
+            assert _claim_next_queued_album() is None
+            assert [row["album_id"] for row in models.get_queue()] == [11]
+        finally:
+            with patch("processing.wake_queue_processor"):
+                unfreeze_download_slot()
+        assert claim_download_slot(7) is True
+
+    def test_freeze_waits_for_active_download(self):
+        import threading
+        from processing import (
+            claim_download_slot, freeze_download_slot,
+            release_download_slot, unfreeze_download_slot,
+        )
+        claim_download_slot(7)
+        assert freeze_download_slot() is False
+        frozen = []
+        waiter = threading.Thread(
+            target=lambda: frozen.append(freeze_download_slot(timeout=5)),
+        )
+        waiter.start()
+        with patch("processing.wake_queue_processor"):
+            release_download_slot()
+            waiter.join(5)
+            assert frozen == [True]
+            assert claim_download_slot(8) is False
+            unfreeze_download_slot()
+
+    def test_pops_and_claims_next_album(self):
+        from processing import _claim_next_queued_album, download_process
+        models.enqueue_album(11)
+        assert _claim_next_queued_album() == 11
+        assert download_process["active"] is True
+        assert download_process["album_id"] == 11
+        assert models.get_queue() == []
+
+    def test_status_snapshot_is_detached(self):
+        from processing import download_process, get_download_status
+        download_process["tracks"] = [{"status": "searching"}]
+        snapshot = get_download_status()
+        snapshot["tracks"][0]["status"] = "done"
+        snapshot["tracks"].append({})
+        assert download_process["tracks"] == [{"status": "searching"}]
+
+
+class TestQueueWake:
+    @patch("processing.lidarr_get_many")
+    def test_finished_download_wakes_queue(self, mock_get_many):
+        import processing
+        mock_get_many.return_value = [{"error": "down"}, []]
+        processing._queue_wake.clear()
+        assert processing.process_album_download(5) == {"error": "down"}
+        assert processing._queue_wake.is_set()
+        assert processing.download_process["active"] is False
+
 
 class TestTrackStateModel:
     """download_process tracks list and TrackSkippedException."""
@@ -27,9 +27,10 @@ def client(tmp_path, monkeypatch):
     monkeypatch.setenv("LIDARR_URL", "http://localhost:8686")
     monkeypatch.setenv("LIDARR_API_KEY", "test-key")
 
-    from app import app
+    from app import app, tracks_cache
 
     app.config["TESTING"] = True  # nosemgrep
+    tracks_cache.clear()
     with app.test_client() as c:
         yield c
 
@@ -260,6 +261,12 @@ class TestQueueRoutes:
         assert data["success"] is True
         assert data["queue_length"] == 1
 
+    def test_add_to_queue_wakes_processor(self, client):
+        with patch("app.wake_queue_processor") as mock_wake:
+            client.post("/api/download/queue", json={"album_id": 42})
+            client.post("/api/download/queue", json={"album_id": 42})
+        mock_wake.assert_called_once_with()
+
     def test_add_duplicate_to_queue(self, client):
         client.post(
             "/api/download/queue",
@@ -328,6 +335,43 @@ class TestQueueRoutes:
         assert resp.status_code == 200
         assert data["added"] == 0
 
+    def test_stream_fetches_albums_without_queue_lock(self, client):
+        import models
+        from processing import queue_lock
+
+        models.enqueue_album(7)
+        models.enqueue_album(8)
+        lock_held = []
+
+        def fake_albums(album_ids):
+            lock_held.append(queue_lock.locked())
+            return {
+                album_id: {"id": album_id, "title": "Album", "images": []}
+                for album_id in album_ids
+            }
+
+        with patch("app._get_albums_cached", side_effect=fake_albums):
+            resp = client.get("/api/download/stream", buffered=False)
+            first = next(resp.response)
+            resp.close()
+        payload = json.loads(first.decode().removeprefix("data: "))
+        assert [album["id"] for album in payload["queue"]] == [7, 8]
+        assert "active" in payload["status"]
+        # One bulk lookup per tick, made without queue_lock.
+        assert lock_held == [False]
+
+
+    def test_stream_sends_unchanged_state_only_once(self, client):
+        with patch("app.time.sleep"), \
+                patch("app.SSE_KEEPALIVE_INTERVAL", 0), \
+                patch("app.get_download_status",
+                      return_value={"active": False}):
+            resp = client.get("/api/download/stream", buffered=False)
+            chunks = [next(resp.response) for _ in range(3)]
+            resp.close()
+        assert chunks[0].startswith(b"data: ")
+        assert chunks[1:] == [b": keepalive\n\n"] * 2
+
 
 class TestDownloadRoute:
     def test_download_enqueues(self, client):
@@ -357,6 +401,15 @@ class TestDownloadRoute:
             assert resp.status_code == 200
             assert resp.get_json()["active"] is False
 
+    def test_status_revalidates_with_etag(self, client):
+        first = client.get("/api/download/status")
+        assert first.headers["Cache-Control"] == "no-cache"
+        again = client.get(
+            "/api/download/status",
+            headers={"If-None-Match": first.headers["ETag"]},
+        )
+        assert again.status_code == 304
+
 
 class TestConfigRoutes:
     def test_get_config(self, client):
@@ -377,6 +430,19 @@ class TestConfigRoutes:
         resp2 = client.get("/api/config")
         assert resp2.get_json()["scheduler_interval"] == 120
 
+    def test_set_config_reschedules_on_interval_change(self, client):
+        with patch("app.setup_scheduler") as mock_setup, \
+                patch("app.check_rate_limit", return_value=True):
+            client.post("/api/config", json={"duration_tolerance": 5})
+            mock_setup.assert_not_called()
+            client.post("/api/config", json={"scheduler_interval": 15})
+            mock_setup.assert_called_once()
+            # The settings page resends unchanged scheduler fields.
+            client.post("/api/config", json={
+                "scheduler_interval": "15", "telegram_chat_id": "42",
+            })
+        mock_setup.assert_called_once()
+
     def test_set_config_rejects_unknown_keys(self, client):
         resp = client.post(
             "/api/config",
@@ -405,6 +471,14 @@ class TestConfigRoutes:
         assert data["applied"] == 1
         assert data["skipped"] == 1
 
+    def test_config_import_reschedules(self, client):
+        with patch("app.setup_scheduler") as mock_setup, \
+                patch("app.check_rate_limit", return_value=True):
+            client.post(
+                "/api/config/import", json={"scheduler_enabled": True},
+            )
+        mock_setup.assert_called_once()
+
 
 class TestTemplateRoutes:
     def test_index(self, client):
@@ -545,10 +619,8 @@ class TestQueueTracksRoute:
             {"title": "iTunes Track", "trackNumber": 1},
         ]
         from app import album_cache
-        import time as time_mod
-        album_cache[123] = (
-            {"title": "Album", "artist": {"artistName": "Artist"}},
-            time_mod.time(),
+        album_cache.set(
+            123, {"title": "Album", "artist": {"artistName": "Artist"}},
         )
         try:
             resp = client.get("/api/download/queue/123/tracks")
@@ -573,23 +645,44 @@ class TestQueueTracksRoute:
 class TestQueueTrackCount:
     """Queue endpoint includes track_count."""
 
-    @patch("app.lidarr_request")
+    @patch("app.get_albums")
     @patch("app.models.get_queue")
-    def test_queue_includes_track_count(self, mock_queue, mock_lidarr, client):
+    def test_queue_includes_track_count(self, mock_queue, mock_albums, client):
         mock_queue.return_value = [{"album_id": 123}]
-        mock_lidarr.side_effect = lambda path, **kw: (
-            {"title": "Album", "artist": {"artistName": "Art"},
+        mock_albums.return_value = [
+            {"id": 123, "title": "Album", "artist": {"artistName": "Art"},
              "images": [{"coverType": "cover", "remoteUrl": "http://img"}],
-             "statistics": {"trackCount": 10}}
-            if "album/" in path else
-            [{"title": "T%d" % i, "trackNumber": i, "hasFile": False}
-             for i in range(1, 11)]
-        )
-        resp = client.get("/api/download/queue")
+             "statistics": {"trackCount": 10}},
+        ]
+        from app import album_cache
+        album_cache.pop(123, None)
+        try:
+            resp = client.get("/api/download/queue")
+        finally:
+            album_cache.pop(123, None)
         assert resp.status_code == 200
         data = resp.get_json()
         assert len(data) == 1
         assert data[0].get("track_count") == 10
+        assert data[0].get("cover") == "http://img"
+
+    @patch("app.get_albums")
+    @patch("app.models.get_queue")
+    def test_queue_fetches_albums_in_one_call(
+        self, mock_queue, mock_albums, client,
+    ):
+        mock_queue.return_value = [{"album_id": 201}, {"album_id": 202}]
+        mock_albums.return_value = [
+            {"id": 201, "title": "One"}, {"id": 202, "title": "Two"},
+        ]
+        from app import album_cache
+        try:
+            resp = client.get("/api/download/queue")
+        finally:
+            album_cache.pop(201, None)
+            album_cache.pop(202, None)
+        assert [a["title"] for a in resp.get_json()] == ["One", "Two"]
+        mock_albums.assert_called_once_with([201, 202])
 
 
 class TestMiscRoutes:
@@ -613,18 +706,202 @@ class TestMiscRoutes:
             assert data["status"] == "error"
             assert "Connection refused" in data["message"]
 
-    def test_missing_albums(self, client):
+    def test_missing_albums(self, client, monkeypatch):
+        monkeypatch.setattr("app._missing_albums_payload", (None, b""))
         with patch("app.get_missing_albums", return_value=[]):
             resp = client.get("/api/missing-albums")
             assert resp.status_code == 200
             assert resp.get_json() == []
 
+    def test_missing_albums_etag_and_cache(self, client, monkeypatch):
+        import app as app_module
+        monkeypatch.setattr("app._missing_albums_payload", (None, b""))
+        provider = app_module.app.json
+        with patch("app.get_missing_albums", return_value=[{"id": 1}]), \
+                patch.object(
+                    provider, "dumps", wraps=provider.dumps,
+                ) as mock_dumps:
+            first = client.get("/api/missing-albums")
+            etag = first.headers["ETag"]
+            second = client.get(
+                "/api/missing-albums", headers={"If-None-Match": etag},
+            )
+        assert first.get_json() == [{"id": 1}]
+        max_age = f"max-age={app_module.MISSING_ALBUMS_TTL}"
+        assert max_age in first.headers["Cache-Control"]
+        assert second.status_code == 304
+        assert mock_dumps.call_count == 1
+
+    def test_missing_albums_reencoded_when_list_changes(
+        self, client, monkeypatch
+    ):
+        monkeypatch.setattr("app._missing_albums_payload", (None, b""))
+        with patch("app.get_missing_albums", return_value=[{"id": 1}]):
+            first = client.get("/api/missing-albums")
+        with patch("app.get_missing_albums", return_value=[{"id": 2}]):
+            second = client.get("/api/missing-albums")
+        assert second.get_json() == [{"id": 2}]
+        assert first.headers["ETag"] != second.headers["ETag"]
+
     def test_ytdlp_version(self, client):
         with patch("app.get_ytdlp_version", return_value="2024.01.01"):
             resp = client.get("/api/ytdlp/version")
             assert resp.get_json()["version"] == "2024.01.01"
 
 
+class TestJsonProvider:
+    def test_round_trips_through_orjson(self, client):
+        from app import app as flask_app
+        body = flask_app.json.dumps({"a": [1, "é"], 2: None})
+        assert flask_app.json.loads(body) == {"a": [1, "é"], "2": None}
+
+    def test_falls_back_to_flask_default(self, client):
+        from decimal import Decimal
+
+        from app import app as flask_app
+        body = flask_app.json.dumps({"d": Decimal("1.5")})
+        assert flask_app.json.loads(body) == {"d": "1.5"}
+
+
+class TestAlbumCache:
+    def test_serves_stale_album_when_lidarr_fails(self, client):
+        from app import _get_album_cached, album_cache
+        album_cache.set(77, {"title": "Cached"}, ttl=-1)
+        try:
+            with patch(
+                "app.lidarr_request", return_value={"error": "down"},
+            ):
+                assert _get_album_cached(77) == {"title": "Cached"}
+        finally:
+            album_cache.pop(77)
+
+    def test_error_returned_without_stale_entry(self, client):
+        from app import _get_album_cached
+        with patch(
+            "app.lidarr_request", return_value={"error": "down"},
+        ):
+            assert _get_album_cached(78) == {"error": "down"}
+
+
+class TestTracksCache:
+    def test_repeat_requests_hit_lidarr_once(self, client):
+        tracks = [{"title": "T", "trackNumber": 1, "hasFile": False}]
+        with patch("app.lidarr_request", return_value=tracks) as mock_req:
+            client.get("/api/download/queue/55/tracks")
+            resp = client.get("/api/download/queue/55/tracks")
+        assert resp.get_json()[0]["title"] == "T"
+        mock_req.assert_called_once_with("track?albumId=55")
+
+    def test_serves_stale_tracks_when_lidarr_fails(self, client):
+        from app import _get_tracks_cached, tracks_cache
+        tracks_cache.set(56, [{"title": "Cached"}], ttl=-1)
+        with patch("app.lidarr_request", return_value={"error": "down"}):
+            assert _get_tracks_cached(56) == [{"title": "Cached"}]
+            assert _get_tracks_cached(57) is None
+
+    def test_empty_list_not_cached(self, client):
+        from app import _get_tracks_cached
+        with patch("app.lidarr_request", side_effect=[[], [{"title": "T"}]]):
+            assert _get_tracks_cached(58) == []
+            assert _get_tracks_cached(58) == [{"title": "T"}]
+
+
+class TestAlbumsBulkRoute:
+    def test_fetches_misses_in_one_call(self, client):
+        from app import album_cache
+        album_cache.set(501, {"id": 501, "title": "Cached"})
+        try:
+            with patch(
+                "app.get_albums",
+                return_value=[{"id": 502, "title": "Fetched"}],
+            ) as mock_get:
+                resp = client.get("/api/albums/bulk?ids=502,501")
+            assert resp.status_code == 200
+            assert [a["title"] for a in resp.get_json()] == [
+                "Fetched", "Cached",
+            ]
+            mock_get.assert_called_once_with([502])
+        finally:
+            album_cache.pop(501)
+            album_cache.pop(502)
+
+    def test_rejects_non_integer_ids(self, client):
+        resp = client.get("/api/albums/bulk?ids=1,abc")
+        assert resp.status_code == 400
+
+
+class TestRestart:
+    def test_signals_gunicorn_master_instead_of_exec(self, monkeypatch):
+        import signal
+
+        import app as app_module
+        monkeypatch.setattr(app_module, "_gunicorn_master_pid", 4321)
+        with patch("app.os.kill") as mock_kill, \
+                patch("app.os.execv") as mock_execv:
+            app_module._exec_restart()
+        mock_kill.assert_called_once_with(4321, signal.SIGHUP)
+        mock_execv.assert_not_called()
+
+    def test_exec_restart_closes_download_pool_first(self, monkeypatch):
+        from unittest.mock import MagicMock
+
+        import app as app_module
+        monkeypatch.setattr(app_module, "_gunicorn_master_pid", None)
+        calls = MagicMock()
+        with patch("app.close_download_pool", calls.close), \
+                patch("app.os.closerange"), \
+                patch("app.os.execv", calls.execv):
+            app_module._exec_restart()
+        assert [c[0] for c in calls.mock_calls] == ["close", "execv"]
+
+    def test_restart_refused_while_downloading(self, client):
+        from processing import claim_download_slot, release_download_slot
+        claim_download_slot(7)
+        try:
+            with patch("app.threading.Thread") as mock_thread:
+                resp = client.post("/api/restart")
+        finally:
+            release_download_slot()
+        assert resp.get_json()["success"] is False
+        mock_thread.assert_not_called()
+
+    def test_restart_stops_new_downloads_starting(self, client):
+        from processing import claim_download_slot, unfreeze_download_slot
+        with patch("app.threading.Thread") as mock_thread:
+            resp = client.post("/api/restart")
+        try:
+            assert resp.get_json()["success"] is True
+            mock_thread.assert_called_once()
+            assert claim_download_slot(7) is False
+        finally:
+            unfreeze_download_slot()
+
+    def test_failed_signal_lifts_the_freeze(self, monkeypatch):
+        import app as app_module
+        from processing import (
+            claim_download_slot, freeze_download_slot,
+            release_download_slot,
+        )
+        monkeypatch.setattr(app_module, "_gunicorn_master_pid", 4321)
+        freeze_download_slot()
+        with patch("app.os.kill", side_effect=ProcessLookupError):
+            app_module._exec_restart()
+        assert claim_download_slot(7) is True
+        release_download_slot()
+
+    def test_background_services_start_once(self, monkeypatch):
+        import app as app_module
+        monkeypatch.setattr(app_module, "_services_started", False)
+        monkeypatch.setattr(app_module, "_gunicorn_master_pid", None)
+        with patch("app.setup_scheduler") as mock_setup, \
+                patch("app.threading.Thread") as mock_thread:
+            app_module.start_background_services(gunicorn_master_pid=99)
+            app_module.start_background_services(gunicorn_master_pid=99)
+        mock_setup.assert_called_once()
+        assert mock_thread.call_count == 3
+        assert app_module._gunicorn_master_pid == 99
+
+
 class TestDeleteTrackRoute:
     def test_delete_track_marks_deleted(self, client, tmp_path):
         import models
@@ -1100,6 +1377,28 @@ class TestYoutubeStreamValidation:
         resp = client.get("/api/youtube/stream")
         assert resp.status_code == 400
 
+    def test_reuses_cached_stream_url(self, client):
+        import app as app_module
+
+        url = "https://www.youtube.com/watch?v=abc12345678"
+        audio_url = "https://rr1.googlevideo.com/videoplayback?id=1"
+        app_module._audio_stream_cache.set(
+            app_module._validate_youtube_url(url),
+            {"audio_url": audio_url, "http_headers": {}},
+        )
+        try:
+            with patch("yt_dlp.YoutubeDL") as mock_ydl, \
+                    patch("app._proxy_audio_stream",
+                          return_value="audio") as mock_proxy:
+                resp = client.get(
+                    "/api/youtube/stream", query_string={"url": url}
+                )
+        finally:
+            app_module._audio_stream_cache.clear()
+        assert resp.data == b"audio"
+        mock_ydl.assert_not_called()
+        assert mock_proxy.call_args[0][0] == audio_url
+
 
 class TestSafeStreamUrl:
     """Tests for _is_safe_stream_url CDN allowlist."""
@@ -1197,6 +1496,11 @@ class TestValidateYoutubeUrl:
         result = _validate_youtube_url("dQw4w9WgXcQ")
         assert result == "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
 
+    def test_rejects_bare_id_with_trailing_newline(self):
+        from app import _validate_youtube_url
+
+        assert _validate_youtube_url("dQw4w9WgXcQ\n") is None
+
     def test_rejects_non_youtube(self):
         from app import _validate_youtube_url
 
@@ -1635,3 +1939,22 @@ class TestNotifyManualDownload:
         embed = kwargs["embed_data"]
         assert "url" not in embed
         assert not [f for f in embed["fields"] if f["name"] == "YouTube"]
+
+
+class TestRefreshLidarrArtist:
+    def test_drops_cached_album_state_before_refresh(self):
+        import app as app_module
+
+        app_module.album_cache.set(7, {"id": 7, "title": "Old"})
+        app_module.tracks_cache.set(7, [{"hasFile": False}])
+        with patch("app.lidarr_request", return_value={}) as mock_lidarr, \
+                patch("app.invalidate_missing_albums") as mock_missing:
+            app_module._refresh_lidarr_artist(
+                {"id": 7, "artist": {"id": 3}}, "Song",
+            )
+        assert app_module.album_cache.get(7) is None
+        assert app_module.tracks_cache.get(7) is None
+        mock_missing.assert_called_once()
+        assert mock_lidarr.call_args.kwargs["data"] == {
+            "name": "RefreshArtist", "artistId": 3,
+        }
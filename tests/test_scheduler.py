@@ -0,0 +1,58 @@
+"""Tests for scheduler.py — interval timing and scheduled checks."""
+
+from unittest.mock import patch
+
+import pytest
+
+import scheduler
+
+
+@pytest.fixture(autouse=True)
+def reset_scheduler_state(monkeypatch):
+    monkeypatch.setattr(scheduler, "_next_run", None)
+    monkeypatch.setattr(scheduler, "_interval_seconds", 0)
+    scheduler._wake.clear()
+    yield
+    scheduler._wake.clear()
+
+
+# --- setup_scheduler ---
+
+
+@patch("scheduler.load_config")
+def test_setup_enabled_sets_deadline(mock_cfg):
+    mock_cfg.return_value = {
+        "scheduler_enabled": True, "scheduler_interval": 30,
+    }
+    scheduler.setup_scheduler()
+    remaining = scheduler._seconds_until_next_run()
+    assert 30 * 60 - 5 < remaining <= 30 * 60
+    assert scheduler._wake.is_set()
+
+
+@patch("scheduler.load_config")
+def test_setup_disabled_clears_deadline(mock_cfg):
+    mock_cfg.return_value = {"scheduler_enabled": False}
+    scheduler.setup_scheduler()
+    assert scheduler._seconds_until_next_run() is None
+    assert scheduler._wake.is_set()
+
+
+# --- _claim_due_run ---
+
+
+def test_claim_due_run_only_when_deadline_passed(monkeypatch):
+    monkeypatch.setattr(scheduler, "_interval_seconds", 60)
+    monkeypatch.setattr(
+        scheduler, "_next_run", scheduler.time.monotonic() + 100,
+    )
+    assert scheduler._claim_due_run() is False
+    monkeypatch.setattr(
+        scheduler, "_next_run", scheduler.time.monotonic() - 1,
+    )
+    assert scheduler._claim_due_run() is True
+    assert 55 < scheduler._seconds_until_next_run() <= 60
+
+
+def test_claim_due_run_disabled():
+    assert scheduler._claim_due_run() is False
@@ -1,5 +1,7 @@
 import os
+import threading
 import time
+from collections import deque
 
 import pytest
 
@@ -31,6 +33,12 @@ class TestSanitizeFilename:
     def test_double_dots_in_middle(self):
         assert utils.sanitize_filename("foo..bar") == "foobar"
 
+    def test_repeated_names_are_memoized(self):
+        utils.sanitize_filename.cache_clear()
+        utils.sanitize_filename("Some Artist")
+        utils.sanitize_filename("Some Artist")
+        assert utils.sanitize_filename.cache_info().hits == 1
+
 
 class TestFormatBytes:
     def test_zero(self):
@@ -87,8 +95,28 @@ class TestCheckRateLimit:
         assert utils.check_rate_limit("b", store, window=60, max_requests=3)
 
     def test_expired_requests_cleared(self):
-        store = {"k": [time.time() - 10]}
+        store = {"k": deque([time.time() - 10])}
         assert utils.check_rate_limit("k", store, window=2, max_requests=1)
+        assert len(store["k"]) == 1
+
+    def test_concurrent_callers_never_exceed_limit(self):
+        store = {}
+        allowed = []
+        start = threading.Barrier(8)
+
+        def hit():
+            start.wait()
+            for _ in range(50):
+                allowed.append(utils.check_rate_limit(
+                    "k", store, window=60, max_requests=100,
+                ))
+
+        threads = [threading.Thread(target=hit) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert allowed.count(True) == 100
 
 
 class TestGetUmask:
@@ -133,5 +161,133 @@ class TestSetPermissions:
         assert dir_mode == 0o775
         assert file_mode == 0o664
 
+    @pytest.mark.parametrize("dir_fd", [True, False])
+    def test_nested_tree_with_and_without_dir_fd(
+        self, tmp_path, monkeypatch, dir_fd
+    ):
+        monkeypatch.setenv("UMASK", "022")
+        monkeypatch.setattr(
+            utils, "_CHMOD_DIR_FD", dir_fd and utils._CHMOD_DIR_FD
+        )
+        disc = tmp_path / "artist" / "album" / "CD2"
+        disc.mkdir(parents=True)
+        (disc / "01 - track.mp3").write_text("data")
+        os.chmod(str(disc), 0o700)
+        utils.set_permissions(str(tmp_path / "artist"))
+        assert os.stat(str(disc)).st_mode & 0o777 == 0o755
+        track_mode = os.stat(str(disc / "01 - track.mp3")).st_mode
+        assert track_mode & 0o777 == 0o644
+
+    def test_non_recursive_leaves_contents_alone(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("UMASK", "022")
+        d = tmp_path / "artist"
+        (d / "old album").mkdir(parents=True)
+        os.chmod(str(d), 0o700)
+        os.chmod(str(d / "old album"), 0o700)
+        utils.set_permissions(str(d), recursive=False)
+        assert os.stat(str(d)).st_mode & 0o777 == 0o755
+        assert os.stat(str(d / "old album")).st_mode & 0o777 == 0o700
+
+    def test_skips_chmod_when_mode_matches(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("UMASK", "022")
+        d = tmp_path / "album"
+        d.mkdir()
+        (d / "done.mp3").write_text("data")
+        (d / "new.mp3").write_text("data")
+        os.chmod(str(d), 0o755)
+        os.chmod(str(d / "done.mp3"), 0o644)
+        os.chmod(str(d / "new.mp3"), 0o600)
+        calls = []
+        real_chmod = os.chmod
+        monkeypatch.setattr(
+            utils.os, "chmod",
+            lambda p, *a, **kw: calls.append(p) or real_chmod(p, *a, **kw),
+        )
+        utils.set_permissions(str(d))
+        assert [os.path.basename(p) for p in calls] == ["new.mp3"]
+
     def test_nonexistent_path_no_error(self):
         utils.set_permissions("/nonexistent/path/that/does/not/exist")
+
+
+class TestHttpSession:
+    def test_sets_default_user_agent(self):
+        session = utils._build_http_session()
+        assert session.headers["User-Agent"] == utils.HTTP_USER_AGENT
+
+    def test_mounts_pooled_adapter_with_retries(self):
+        session = utils._build_http_session()
+        adapter = session.get_adapter("https://example.com")
+        assert adapter._pool_maxsize == utils.HTTP_POOL_MAXSIZE
+        assert adapter.max_retries.total == utils.HTTP_RETRY_TOTAL
+        assert session.get_adapter("http://example.com") is adapter
+
+    def test_read_timeouts_are_not_retried(self):
+        session = utils._build_http_session()
+        retry = session.get_adapter("https://example.com").max_retries
+        assert retry.read == 0
+        assert retry.connect is None
+
+    def test_post_is_not_retried(self):
+        session = utils._build_http_session()
+        retry = session.get_adapter("https://example.com").max_retries
+        assert "GET" in retry.allowed_methods
+        assert "POST" not in retry.allowed_methods
+
+
+class TestTTLCache:
+    def test_get_returns_fresh_value(self):
+        cache = utils.TTLCache(ttl=60)
+        cache.set("k", {"a": 1})
+        assert cache.get("k") == {"a": 1}
+
+    def test_missing_key_returns_default(self):
+        cache = utils.TTLCache()
+        assert cache.get("nope") is None
+        assert cache.get("nope", "fallback") == "fallback"
+
+    def test_expired_entry_only_available_as_stale(self, monkeypatch):
+        cache = utils.TTLCache(ttl=10)
+        now = time.monotonic()
+        monkeypatch.setattr(utils.time, "monotonic", lambda: now)
+        cache.set("k", "v")
+        monkeypatch.setattr(utils.time, "monotonic", lambda: now + 11)
+        assert cache.get("k") is None
+        assert cache.get_stale("k") == "v"
+
+    def test_per_entry_ttl_overrides_default(self, monkeypatch):
+        cache = utils.TTLCache(ttl=1000)
+        now = time.monotonic()
+        monkeypatch.setattr(utils.time, "monotonic", lambda: now)
+        cache.set("k", "v", ttl=5)
+        monkeypatch.setattr(utils.time, "monotonic", lambda: now + 6)
+        assert cache.get("k") is None
+
+    def test_evicts_least_recently_used(self):
+        cache = utils.TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert len(cache) == 2
+
+    def test_pop_and_clear(self):
+        cache = utils.TTLCache()
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.pop("a") == 1
+        assert cache.get("a") is None
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_outbound_modules_share_one_session(self):
+        import app
+        import fingerprint
+        import lidarr
+        import metadata
+        import notifications
+
+        for module in (app, fingerprint, lidarr, metadata, notifications):
+            assert module.http_session is utils.http_session
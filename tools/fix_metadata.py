@@ -34,6 +34,8 @@ except ImportError:
     print("Error: mutagen is required. Install with: pip install mutagen")
     sys.exit(1)
 
+session = requests.Session()
+
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -111,9 +113,9 @@ def lidarr_request(config, endpoint, method="GET", data=None):
     }
     try:
         if method == "GET":
-            r = requests.get(url, headers=headers, timeout=30)
+            r = session.get(url, headers=headers, timeout=30)
         elif method == "POST":
-            r = requests.post(url, headers=headers, json=data, timeout=30)
+            r = session.post(url, headers=headers, json=data, timeout=30)
         else:
             return {"error": f"Unsupported method: {method}"}
         r.raise_for_status()
@@ -22,6 +22,8 @@ from datetime import datetime
 
 import requests
 
+session = requests.Session()
+
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -94,7 +96,7 @@ def lidarr_request(config, endpoint):
     url = f"{config['lidarr_url']}/api/v1/{endpoint}"
     headers = {"X-Api-Key": config["lidarr_api_key"]}
     try:
-        r = requests.get(url, headers=headers, timeout=30)
+        r = session.get(url, headers=headers, timeout=30)
         r.raise_for_status()
         return r.json()
     except requests.exceptions.RequestException as e:
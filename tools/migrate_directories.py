@@ -23,6 +23,8 @@ import re
 import sys
 import requests
 
+session = requests.Session()
+
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -95,7 +97,7 @@ def lidarr_request(config, endpoint):
     url = f"{config['lidarr_url']}/api/v1/{endpoint}"
     headers = {"X-Api-Key": config["lidarr_api_key"]}
     try:
-        r = requests.get(url, headers=headers, timeout=30)
+        r = session.get(url, headers=headers, timeout=30)
         r.raise_for_status()
         return r.json()
     except Exception as e:
@@ -110,7 +112,7 @@ def lidarr_command(config, command_name, data=None):
     if data:
         payload.update(data)
     try:
-        r = requests.post(url, headers=headers, json=payload, timeout=30)
+        r = session.post(url, headers=headers, json=payload, timeout=30)
         r.raise_for_status()
         return r.json()
     except Exception as e:
@@ -195,15 +197,20 @@ def scan_directories(config):
     scan_path = config["scan_path"]
     directories = []
 
-    for artist_folder in os.listdir(scan_path):
-        artist_path = os.path.join(scan_path, artist_folder)
-        if not os.path.isdir(artist_path):
-            continue
+    # scandir's DirEntry.is_dir() uses the d_type from the directory
+    # listing, avoiding a stat() per artist and album entry.
+    with os.scandir(scan_path) as artist_entries:
+        artist_dirs = [e for e in artist_entries if e.is_dir()]
 
-        for album_folder in os.listdir(artist_path):
-            album_path = os.path.join(artist_path, album_folder)
-            if not os.path.isdir(album_path):
-                continue
+    for artist_entry in artist_dirs:
+        artist_folder = artist_entry.name
+        artist_path = artist_entry.path
+        with os.scandir(artist_path) as album_entries:
+            album_dirs = [e for e in album_entries if e.is_dir()]
+
+        for album_entry in album_dirs:
+            album_folder = album_entry.name
+            album_path = album_entry.path
 
             album_title, year, existing_type = parse_existing_folder_name(album_folder)
             directories.append(
@@ -44,6 +44,8 @@ RATE_LIMIT_INTERVAL = 0.34  # ~3 requests per second
 
 _last_request_time = 0.0
 
+session = requests.Session()
+
 
 DOTENV_KEYS = {"LIDARR_URL", "LIDARR_API_KEY", "ACOUSTID_API_KEY"}
 
@@ -164,7 +166,7 @@ def lidarr_request(config, endpoint):
     url = f"{config['lidarr_url']}/api/v1/{endpoint}"
     headers = {"X-Api-Key": config["lidarr_api_key"]}
     try:
-        r = requests.get(url, headers=headers, timeout=30)
+        r = session.get(url, headers=headers, timeout=30)
         r.raise_for_status()
         return r.json()
     except requests.exceptions.RequestException as e:
@@ -278,7 +280,7 @@ def lookup_acoustid(api_key, duration, fingerprint):
         "meta": "recordings",
     }
     try:
-        r = requests.get(ACOUSTID_API_URL, params=params, timeout=15)
+        r = session.get(ACOUSTID_API_URL, params=params, timeout=15)
         r.raise_for_status()
         data = r.json()
         if data.get("status") != "ok":
@@ -1,16 +1,73 @@
 """Shared utility functions for Lidarr YouTube Downloader."""
 
+import functools
 import logging
 import os
-import re
+import stat
+import threading
 import time
+from collections import OrderedDict, deque
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
+HTTP_POOL_CONNECTIONS = 8
+HTTP_POOL_MAXSIZE = 16
+HTTP_RETRY_TOTAL = 3
+HTTP_RETRY_BACKOFF = 0.5
+# Identifies the app to Lidarr, iTunes, PyPI and webhook endpoints
+# instead of the generic python-requests/x.y default.
+HTTP_USER_AGENT = "lidarr-yt-downloader"
+
+
+def _build_http_session():
+    """Build a requests session with pooled keep-alive connections.
 
+    Idempotent GETs are retried with exponential backoff on connection
+    errors and transient 429/5xx responses. Read timeouts are not
+    retried: a hung server would otherwise hold the caller for several
+    full timeouts. POSTs are never retried so Lidarr commands and
+    notifications are not sent twice.
+    """
+    retry = Retry(
+        total=HTTP_RETRY_TOTAL,
+        read=0,
+        backoff_factor=HTTP_RETRY_BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.headers["User-Agent"] = HTTP_USER_AGENT
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Shared across threads so Lidarr, iTunes, AcoustID and notification
+# calls reuse TCP/TLS connections instead of handshaking per request.
+http_session = _build_http_session()
+
+
+_INVALID_FILENAME_CHARS = str.maketrans("", "", '<>:"/\\|?*')
+
+
+@functools.lru_cache(maxsize=4096)
 def sanitize_filename(name):
-    """Remove special characters that are invalid in filenames."""
-    name = re.sub(r'[<>:"/\\|?*]', "", name)
+    """Remove special characters that are invalid in filenames.
+
+    Memoized: the same artist, album and track names are sanitized
+    repeatedly while an album is processed.
+    """
+    name = name.translate(_INVALID_FILENAME_CHARS)
     name = name.replace("..", "").replace("~", "")
     name = name.strip(". ")
     if not name:
@@ -29,12 +86,16 @@ def format_bytes(size_bytes):
     return f"{size_bytes:.1f} TB"
 
 
+# Request handlers run on gunicorn worker threads and share one store.
+_rate_limit_lock = threading.Lock()
+
+
 def check_rate_limit(key, store, window=2, max_requests=5):
     """Check whether a request is allowed under a sliding-window rate limit.
 
     Args:
         key: Identifier for the rate-limited resource.
-        store: Dict mapping keys to lists of timestamps.
+        store: Dict mapping keys to deques of timestamps, oldest first.
         window: Time window in seconds.
         max_requests: Maximum requests allowed within the window.
 
@@ -42,13 +103,74 @@ def check_rate_limit(key, store, window=2, max_requests=5):
         True if the request is allowed, False if rate-limited.
     """
     now = time.time()
-    if key not in store:
-        store[key] = []
-    store[key] = [t for t in store[key] if now - t < window]
-    if len(store[key]) >= max_requests:
-        return False
-    store[key].append(now)
-    return True
+    with _rate_limit_lock:
+        stamps = store.get(key)
+        if stamps is None:
+            stamps = store[key] = deque()
+        while stamps and now - stamps[0] >= window:
+            stamps.popleft()
+        if len(stamps) >= max_requests:
+            return False
+        stamps.append(now)
+        return True
+
+
+class TTLCache:
+    """Thread-safe in-process cache with per-entry expiry and LRU eviction.
+
+    Expired entries are kept until evicted so callers can fall back to
+    the last known value when the upstream service is unavailable.
+
+    Args:
+        maxsize: Maximum number of entries before the least recently
+            used one is evicted.
+        ttl: Default time-to-live in seconds.
+    """
+
+    def __init__(self, maxsize=256, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing/expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                return default
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def get_stale(self, key, default=None):
+        """Return the cached value for key even if it has expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            return default if entry is None else entry[0]
+
+    def set(self, key, value, ttl=None):
+        """Store value under key, expiring after ttl (or the default)."""
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """Remove key and return its value (expired or not)."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return default if entry is None else entry[0]
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
 
 
 def get_umask():
@@ -62,12 +184,32 @@ def get_umask():
         return 0o002
 
 
-def set_permissions(path):
+_CHMOD_DIR_FD = (
+    hasattr(os, "fwalk")
+    and os.chmod in os.supports_dir_fd
+    and os.stat in os.supports_dir_fd
+)
+
+
+def _chmod_if_needed(path, mode, dir_fd=None):
+    """chmod unless the mode already matches.
+
+    A stat is a cheap, client-cached lookup on network filesystems,
+    while every chmod is a metadata write round-trip to the server.
+    """
+    if stat.S_IMODE(os.stat(path, dir_fd=dir_fd).st_mode) != mode:
+        os.chmod(path, mode, dir_fd=dir_fd)
+
+
+def set_permissions(path, recursive=True):
     """Set permissions based on UMASK environment variable.
 
     Default UMASK=002 results in:
     - Directories: 775 (rwxrwxr-x)
     - Files: 664 (rw-rw-r--)
+
+    With recursive=False only the directory itself is changed, not its
+    contents. Entries that already have the right mode are left alone.
     """
     try:
         umask = get_umask()
@@ -75,13 +217,24 @@ def set_permissions(path):
         file_mode = 0o666 & ~umask
 
         if os.path.isdir(path):
-            os.chmod(path, dir_mode)
-            for root, dirs, files in os.walk(path):
-                for d in dirs:
-                    os.chmod(os.path.join(root, d), dir_mode)
-                for f in files:
-                    os.chmod(os.path.join(root, f), file_mode)
+            _chmod_if_needed(path, dir_mode)
+            if not recursive:
+                return
+            if _CHMOD_DIR_FD:
+                # chmod relative to each directory's fd skips the
+                # kernel re-resolving the full path for every entry.
+                for _root, dirs, files, root_fd in os.fwalk(path):
+                    for d in dirs:
+                        _chmod_if_needed(d, dir_mode, dir_fd=root_fd)
+                    for f in files:
+                        _chmod_if_needed(f, file_mode, dir_fd=root_fd)
+            else:
+                for root, dirs, files in os.walk(path):
+                    for d in dirs:
+                        _chmod_if_needed(os.path.join(root, d), dir_mode)
+                    for f in files:
+                        _chmod_if_needed(os.path.join(root, f), file_mode)
         else:
-            os.chmod(path, file_mode)
+            _chmod_if_needed(path, file_mode)
     except Exception as e:
         logger.debug(f"Failed to set permissions on {path}: {e}")